@@ -2,7 +2,7 @@
 대용량 업로드 최적화 API
 - 청크 단위 업로드
 - 배치 처리
-- 트랜잭션 최적화
+- 트랜잭션 최적화 (배치마다 쓰기 스레드에서 커밋 → 다른 업로드/수정과 잠금 경합 없음)
 """
 
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
@@ -19,6 +19,10 @@ from concurrent.futures import ThreadPoolExecutor
 
 from app.database import get_db
 from models import Ingredient
+from app.services.unit_price_service import UnitPriceService
+from keyset_pagination import SortOrder, decode_cursor, encode_cursor
+from count_cache import cached_count
+from db_writer import commit_session_async, get_writer
 
 router = APIRouter(prefix="/api/admin", tags=["bulk-upload"])
 
@@ -26,6 +30,28 @@ router = APIRouter(prefix="/api/admin", tags=["bulk-upload"])
 UPLOAD_CHUNKS = {}
 executor = ThreadPoolExecutor(max_workers=4)
 
+# ingredients-paginated 커서 정렬 (id 오름차순)
+ID_ORDER = SortOrder("id")
+
+# bulk-upload-optimized 배치 인서트 (sqlite3 이름 파라미터)
+BULK_INSERT_SQL = """
+    INSERT INTO ingredients (
+        "분류(대분류)", "기본식자재(세분류)", "고유코드", "식자재명",
+        "원산지", "게시유무", "규격", "단위", "면세", "선발주일",
+        "입고가", "판매가", "거래처명", "비고", "등록일"
+    ) VALUES (
+        :category, :subcategory, :code, :name,
+        :origin, :published, :spec, :unit, :tax, :preorder,
+        :purchase_price, :selling_price, :supplier, :memo, :created_at
+    )
+"""
+
+
+def _insert_batch(cursor, params: list) -> int:
+    """배치 인서트 (쓰기 스레드에서 실행)"""
+    cursor.executemany(BULK_INSERT_SQL, params)
+    return len(params)
+
 @router.post("/upload-chunk")
 async def upload_chunk(
     chunk: UploadFile = File(...),
@@ -113,23 +139,14 @@ async def process_bulk_data(file_data: bytes, file_name: str, db: Session):
                 }
                 batch_data.append(ingredient_data)
             
-            # 배치 인서트 (BULK INSERT 최적화)
+            # 배치 인서트 (BULK INSERT 최적화) - 배치마다 쓰기 스레드에서 커밋
             try:
                 # SQLAlchemy Core를 사용한 bulk_insert_mappings (더 빠름)
-                db.bulk_insert_mappings(Ingredient, batch_data)
-                
-                # 주기적으로 커밋 (메모리 관리)
-                if batch_end % 5000 == 0:
-                    db.commit()
-                    
+                await commit_session_async(db, lambda: db.bulk_insert_mappings(Ingredient, batch_data))
                 processed += len(batch_data)
                 
             except Exception as e:
                 errors.append(f"Batch {batch_start}-{batch_end}: {str(e)}")
-                db.rollback()
-        
-        # 최종 커밋
-        db.commit()
         
         return {
             "success": True,
@@ -187,29 +204,19 @@ def process_large_file(contents: bytes, filename: str, db: Session):
         # 딕셔너리 리스트로 변환
         records = df.to_dict('records')
         
-        # 트랜잭션 최적화: 모든 데이터를 한 번에 처리
+        # 트랜잭션 최적화: 배치마다 쓰기 스레드에서 executemany + 커밋
+        # (배치 사이에 다른 요청의 쓰기가 끼어들 수 있음)
         batch_size = 5000
         total_processed = 0
+        writer = get_writer()
         
         for i in range(0, len(records), batch_size):
             batch = records[i:i+batch_size]
             
             # Raw SQL 사용 (최고 성능)
-            insert_query = text("""
-                INSERT INTO ingredients (
-                    "분류(대분류)", "기본식자재(세분류)", "고유코드", "식자재명",
-                    "원산지", "게시유무", "규격", "단위", "면세", "선발주일",
-                    "입고가", "판매가", "거래처명", "비고", "등록일"
-                ) VALUES (
-                    :category, :subcategory, :code, :name,
-                    :origin, :published, :spec, :unit, :tax, :preorder,
-                    :purchase_price, :selling_price, :supplier, :memo, :created_at
-                )
-            """)
-            
-            # 배치 실행
+            params = []
             for record in batch:
-                db.execute(insert_query, {
+                params.append({
                     'category': record.get('분류(대분류)', ''),
                     'subcategory': record.get('기본식자재(세분류)', ''),
                     'code': record.get('고유코드', ''),
@@ -227,8 +234,10 @@ def process_large_file(contents: bytes, filename: str, db: Session):
                     'created_at': datetime.now()
                 })
             
-            db.commit()
-            total_processed += len(batch)
+            total_processed += writer.write(_insert_batch, params)
+        
+        # 단위당 단가/g당 단가는 저장 후 재계산기와 같은 방식으로 계산 (학습 패턴 + 계산 추적 컬럼)
+        UnitPriceService(db).refresh_unit_prices(record.get('고유코드') for record in records)
         
         return {
             "success": True,
@@ -247,39 +256,65 @@ def process_large_file(contents: bytes, filename: str, db: Session):
 async def get_ingredients_paginated(
     page: int = 1,
     limit: int = 1000,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """페이지네이션 최적화 API"""
+    """페이지네이션 최적화 API (cursor를 주면 OFFSET 없이 id 기준으로 이어서 조회)"""
     
     try:
-        # 전체 개수 (캐시 가능)
-        total_query = text("SELECT COUNT(*) FROM ingredients")
-        total = db.execute(total_query).scalar()
-        
-        # 오프셋 계산
-        offset = (page - 1) * limit
-        
-        # 인덱스를 활용한 빠른 페이지네이션
-        query = text("""
-            SELECT * FROM ingredients
-            ORDER BY id
-            LIMIT :limit OFFSET :offset
-        """)
+        # 전체 개수 (트리거가 유지하는 행 수 - COUNT(*) 없음)
+        total, _ = cached_count(db.connection().connection.cursor(), "FROM ingredients", [], [])
         
-        result = db.execute(query, {"limit": limit, "offset": offset})
+        if cursor:
+            # 커서 기준 조회 - 깊은 페이지도 id 인덱스 탐색 한 번
+            (boundary_id,), direction = decode_cursor(ID_ORDER, cursor)
+            if direction == "next":
+                query = text("SELECT * FROM ingredients WHERE id > :boundary_id ORDER BY id LIMIT :limit")
+            else:
+                query = text("SELECT * FROM ingredients WHERE id < :boundary_id ORDER BY id DESC LIMIT :limit")
+            result = db.execute(query, {"boundary_id": boundary_id, "limit": limit + 1})
+        else:
+            # 오프셋 계산
+            offset = (page - 1) * limit
+            
+            # 인덱스를 활용한 빠른 페이지네이션
+            query = text("""
+                SELECT * FROM ingredients
+                ORDER BY id
+                LIMIT :limit OFFSET :offset
+            """)
+            
+            result = db.execute(query, {"limit": limit, "offset": offset})
         
         # 결과를 딕셔너리로 변환
         columns = result.keys()
         ingredients = [dict(zip(columns, row)) for row in result]
         
+        if cursor:
+            has_more = len(ingredients) > limit
+            ingredients = ingredients[:limit]
+            if direction == "prev":
+                ingredients.reverse()
+            has_next = has_more if direction == "next" else True
+            has_prev = has_more if direction == "prev" else True
+        else:
+            has_next, has_prev = page * limit < total, page > 1
+        
+        next_cursor = encode_cursor(ID_ORDER, [ingredients[-1]["id"]], "next") if ingredients and has_next else None
+        prev_cursor = encode_cursor(ID_ORDER, [ingredients[0]["id"]], "prev") if ingredients and has_prev else None
+        
         return {
             "success": True,
-            "page": page,
+            "page": None if cursor else page,
             "limit": limit,
             "total": total,
             "total_pages": (total + limit - 1) // limit,
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor,
             "ingredients": ingredients
         }
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -9,7 +9,7 @@
 from fastapi import APIRouter, HTTPException, Depends, Request, Query, File, UploadFile
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func, or_, and_
+from sqlalchemy import func, or_, and_, text
 from typing import List, Optional
 from datetime import datetime
 from decimal import Decimal
@@ -22,6 +22,7 @@ import os
 from app.database import get_db
 from app.api.auth import get_current_user
 from models import Ingredient, IngredientUploadHistory, Supplier
+from ingredient_search import fts_match_sql, fts_query
 
 router = APIRouter(prefix="/api/admin", tags=["ingredients"])
 
@@ -117,30 +118,43 @@ async def get_ingredients_admin(
     try:
         query = db.query(Ingredient)
         
-        # 검색 조건
+        # 검색 조건 (3글자 이상은 ingredients_fts 전문 검색, 짧은 검색어는 LIKE)
         if search:
             # 통합 검색 (식자재명, 코드, 업체명)
-            search_term = f"%{search}%"
-            query = query.filter(
-                or_(
-                    Ingredient.ingredient_name.ilike(search_term),
-                    Ingredient.ingredient_code.ilike(search_term),
-                    Ingredient.supplier_name.ilike(search_term)
+            search_match = fts_query(search, ("ingredient_name", "ingredient_code", "supplier_name"))
+            if search_match:
+                query = query.filter(text(fts_match_sql("ingredients.id", ":search_match")).bindparams(search_match=search_match))
+            else:
+                search_term = f"%{search}%"
+                query = query.filter(
+                    or_(
+                        Ingredient.ingredient_name.ilike(search_term),
+                        Ingredient.ingredient_code.ilike(search_term),
+                        Ingredient.supplier_name.ilike(search_term)
+                    )
                 )
-            )
         
         # 개별 필드 검색
         if ingredientName:
-            name_term = f"%{ingredientName}%"
-            query = query.filter(Ingredient.ingredient_name.ilike(name_term))
+            name_match = fts_query(ingredientName, ("ingredient_name",))
+            if name_match:
+                query = query.filter(text(fts_match_sql("ingredients.id", ":name_match")).bindparams(name_match=name_match))
+            else:
+                query = query.filter(Ingredient.ingredient_name.ilike(f"%{ingredientName}%"))
             
         if ingredientCode:
-            code_term = f"%{ingredientCode}%"
-            query = query.filter(Ingredient.ingredient_code.ilike(code_term))
+            code_match = fts_query(ingredientCode, ("ingredient_code",))
+            if code_match:
+                query = query.filter(text(fts_match_sql("ingredients.id", ":code_match")).bindparams(code_match=code_match))
+            else:
+                query = query.filter(Ingredient.ingredient_code.ilike(f"%{ingredientCode}%"))
             
         if supplierName:
-            supplier_term = f"%{supplierName}%"
-            query = query.filter(Ingredient.supplier_name.ilike(supplier_term))
+            supplier_match = fts_query(supplierName, ("supplier_name",))
+            if supplier_match:
+                query = query.filter(text(fts_match_sql("ingredients.id", ":supplier_match")).bindparams(supplier_match=supplier_match))
+            else:
+                query = query.filter(Ingredient.supplier_name.ilike(f"%{supplierName}%"))
         
         if category:
             query = query.filter(Ingredient.category == category)
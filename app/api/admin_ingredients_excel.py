@@ -18,7 +18,10 @@ import os
 # 로컬 임포트
 from app.database import get_db
 from app.api.auth import get_current_user
+from app.services.unit_price_service import UnitPriceService
 from models import Ingredient, IngredientUploadHistory
+from db_executor import run_db
+from db_writer import commit_session_async
 
 router = APIRouter(prefix="/api/admin", tags=["ingredients-excel"])
 
@@ -235,7 +238,7 @@ async def upload_ingredients_excel(
             status='processing'
         )
         db.add(upload_history)
-        db.commit()
+        await commit_session_async(db)
         db.refresh(upload_history)
         
         processed_count = 0
@@ -408,7 +411,7 @@ async def upload_ingredients_excel(
                 # 배치 처리
                 if len(new_ingredients) >= batch_size:
                     db.add_all(new_ingredients)
-                    db.commit()
+                    await commit_session_async(db)
                     new_ingredients = []
                     
             except Exception as e:
@@ -419,7 +422,16 @@ async def upload_ingredients_excel(
         # 남은 데이터 처리
         if new_ingredients:
             db.add_all(new_ingredients)
-            db.commit()
+            await commit_session_async(db)
+        
+        # 단위당 단가/g당 단가 계산 (재계산기와 같은 행 단위 계산, DB 스레드에서 실행)
+        if '고유코드' in df.columns:
+            uploaded_codes = df['고유코드'].dropna().astype(str).str.strip()
+            try:
+                await run_db(UnitPriceService(db).refresh_unit_prices, uploaded_codes)
+            except Exception as price_error:
+                db.rollback()
+                error_details.append(f"단위당 단가 계산 오류: {str(price_error)}")
         
         # 오류 행 데이터 임시 파일로 저장 (다운로드용)
         if error_rows:
@@ -434,7 +446,7 @@ async def upload_ingredients_excel(
         upload_history.error_count = error_count
         upload_history.error_details = error_details[:100]  # 최대 100개 오류만 저장
         upload_history.status = 'completed'
-        db.commit()
+        await commit_session_async(db)
         
         return {
             "success": True,
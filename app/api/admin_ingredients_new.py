@@ -21,7 +21,11 @@ import os
 # 로컬 임포트
 from app.database import get_db
 from app.api.auth import get_current_user
+from app.services.unit_price_service import UnitPriceService
 from models import Ingredient, IngredientUploadHistory
+from ingredient_search import fts_match_sql, fts_query
+from db_executor import run_db
+from db_writer import commit_session_async
 
 router = APIRouter(prefix="/api/admin", tags=["ingredients"])
 
@@ -133,11 +137,21 @@ async def get_ingredients(
                 )
             )
             
+        # 코드/업체 검색은 ingredients_fts 전문 검색 (짧은 검색어는 LIKE)
+        # 식자재명 검색은 FTS에 없는 product_name도 함께 보므로 그대로 유지
         if code_search:
-            query = query.filter(Ingredient.ingredient_code.contains(code_search))
+            code_match = fts_query(code_search, ("ingredient_code",))
+            if code_match:
+                query = query.filter(text(fts_match_sql("ingredients.id", ":code_match")).bindparams(code_match=code_match))
+            else:
+                query = query.filter(Ingredient.ingredient_code.contains(code_search))
             
         if supplier:
-            query = query.filter(Ingredient.supplier_name.contains(supplier))
+            supplier_match = fts_query(supplier, ("supplier_name",))
+            if supplier_match:
+                query = query.filter(text(fts_match_sql("ingredients.id", ":supplier_match")).bindparams(supplier_match=supplier_match))
+            else:
+                query = query.filter(Ingredient.supplier_name.contains(supplier))
             
         if category:
             query = query.filter(
@@ -201,15 +215,12 @@ async def get_ingredients(
 async def get_suppliers_stats(db: Session = Depends(get_db)):
     """업체별 식자재 통계"""
     try:
-        # 업체별 식자재 수, 최근 업데이트 날짜 조회 (평균 가격 제거)
-        suppliers_stats = db.query(
-            Ingredient.supplier_name,
-            func.count(Ingredient.id).label('ingredient_count'),
-            func.max(Ingredient.updated_at).label('last_update')
-        ).filter(
-            Ingredient.is_active == True,
-            Ingredient.supplier_name.isnot(None)
-        ).group_by(Ingredient.supplier_name).all()
+        # 업체별 활성 식자재 수, 최근 업데이트 날짜 조회 (트리거로 유지되는 업체별 통계 테이블)
+        suppliers_stats = db.execute(text("""
+            SELECT supplier_name, active_count, last_updated_at
+            FROM ingredient_supplier_stats
+            WHERE active_count > 0
+        """)).fetchall()
         
         # 결과 포맷팅
         result = []
@@ -405,7 +416,7 @@ async def create_ingredient(ingredient_data: IngredientCreate, request: Request,
         )
         
         db.add(new_ingredient)
-        db.commit()
+        await commit_session_async(db)
         db.refresh(new_ingredient)
         
         return {
@@ -453,7 +464,7 @@ async def upload_ingredients_excel(
             status='processing'
         )
         db.add(upload_history)
-        db.commit()
+        await commit_session_async(db)
         db.refresh(upload_history)
         
         # 대용량 데이터 처리 최적화 (2만건 대응)
@@ -520,7 +531,7 @@ async def upload_ingredients_excel(
                 upload_history.processed_count = processed_count
                 upload_history.updated_count = updated_count
                 upload_history.error_count = error_count
-                db.commit()
+                await commit_session_async(db)
             try:
                 # 행 디버깅 (처음 3행만)
                 if index < 3:
@@ -685,8 +696,7 @@ async def upload_ingredients_excel(
                         print(f"[DEBUG] 첫 번째 아이템 내용: {new_ingredients[0] if new_ingredients else 'None'}")
                         
                         # 벌크 인서트로 성능 최적화
-                        db.bulk_insert_mappings(Ingredient, new_ingredients)
-                        db.commit()
+                        await commit_session_async(db, lambda: db.bulk_insert_mappings(Ingredient, new_ingredients))
                         print(f"[DEBUG] {len(new_ingredients)}개 신규 식자재 배치 저장 완료 (총 진행: {processed_count + updated_count}개)")
                         new_ingredients.clear()  # 메모리 해제
                         
@@ -713,8 +723,7 @@ async def upload_ingredients_excel(
                 print(f"[DEBUG] 마지막 배치 저장 시작: {len(new_ingredients)}개")
                 print(f"[DEBUG] 마지막 배치 첫 번째 아이템: {new_ingredients[0] if new_ingredients else 'None'}")
                 
-                db.bulk_insert_mappings(Ingredient, new_ingredients)
-                db.commit()
+                await commit_session_async(db, lambda: db.bulk_insert_mappings(Ingredient, new_ingredients))
                 print(f"[DEBUG] 마지막 {len(new_ingredients)}개 신규 식자재 배치 저장 완료")
             except Exception as batch_error:
                 db.rollback()
@@ -725,7 +734,7 @@ async def upload_ingredients_excel(
         # 업데이트된 식자재들 일괄 커밋
         if update_ingredients:
             try:
-                db.commit()
+                await commit_session_async(db)
                 print(f"[DEBUG] {len(update_ingredients)}개 식자재 업데이트 완료")
             except Exception as update_error:
                 db.rollback()
@@ -733,6 +742,14 @@ async def upload_ingredients_excel(
                 error_count += len(update_ingredients)
                 updated_count = 0
         
+        # 단위당 단가/g당 단가 계산 (재계산기와 같은 행 단위 계산, DB 스레드에서 실행)
+        try:
+            priced_count = await run_db(UnitPriceService(db).refresh_unit_prices, codes_in_excel)
+            print(f"[DEBUG] 단위당 단가 계산 완료: {priced_count}개")
+        except Exception as price_error:
+            db.rollback()
+            error_details.append(f"단위당 단가 계산 오류: {str(price_error)}")
+        
         # 업로드 히스토리 업데이트
         upload_history.processed_count = processed_count
         upload_history.updated_count = updated_count
@@ -747,7 +764,7 @@ async def upload_ingredients_excel(
                 json.dump(error_rows, f, ensure_ascii=False, default=str)
         upload_history.status = 'completed'
         
-        db.commit()
+        await commit_session_async(db)
         
         print(f"[DEBUG] 최종 결과:")
         print(f"  - 총 행 수: {len(df)}")
@@ -1068,7 +1085,7 @@ async def create_ingredient(
         )
         
         db.add(new_ingredient)
-        db.commit()
+        await commit_session_async(db)
         db.refresh(new_ingredient)
         
         return {
@@ -1123,7 +1140,7 @@ async def update_ingredient(
         
         ingredient.updated_at = datetime.now()
         
-        db.commit()
+        await commit_session_async(db)
         db.refresh(ingredient)
         
         return {
@@ -1154,7 +1171,7 @@ async def delete_ingredient(
         ingredient.is_active = False
         ingredient.updated_at = datetime.now()
         
-        db.commit()
+        await commit_session_async(db)
         
         return {
             "success": True,
@@ -9,6 +9,7 @@ from fastapi.responses import JSONResponse, FileResponse
 from sqlalchemy.orm import Session
 
 from app.database import get_db
+from db_executor import db_endpoint
 # 기존 imports (main.py에서 이동 필요)
 from models import User
 from pydantic import BaseModel
@@ -91,7 +92,8 @@ async def serve_login_page():
     return FileResponse("login.html")
 
 @router.post("/api/auth/login")
-async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+@db_endpoint
+def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     """사용자 로그인 API"""
     try:
         print(f"Login attempt for user: {login_data.username}")
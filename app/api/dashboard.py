@@ -11,7 +11,7 @@
 from fastapi import APIRouter, HTTPException, Depends, Request, Query, File, UploadFile
 from fastapi.responses import FileResponse, JSONResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import create_engine, text, func
+from sqlalchemy import create_engine, text
 from typing import List, Optional, Dict, Any
 from datetime import datetime, date, timedelta
 from decimal import Decimal
@@ -81,6 +81,7 @@ async def get_ingredients_list(
     """식재료 목록 조회 (직접 SQL 사용)"""
     try:
         import sqlite3
+        from ingredient_search import search_condition
         
         # 직접 SQL 쿼리 사용
         conn = sqlite3.connect('daham_meal.db')
@@ -98,8 +99,9 @@ async def get_ingredients_list(
         params = []
         
         if search:
-            sql += " AND ingredient_name LIKE ?"
-            params.append(f"%{search}%")
+            condition, condition_params = search_condition(search, ("ingredient_name",))
+            sql += f" AND {condition}"
+            params.extend(condition_params)
             
         if category:
             sql += " AND category = ?"
@@ -585,13 +587,16 @@ async def get_data_statistics(db: Session = Depends(get_db)):
             PurchaseOrder.order_date >= month_start
         ).count()
         
-        # 카테고리별 식재료 수
-        ingredient_categories = db.query(
-            Ingredient.category,
-            func.count(Ingredient.id).label('count')
-        ).group_by(Ingredient.category).all()
-        
+        # 카테고리별 식재료 수 (트리거로 유지되는 분류별 통계 테이블)
+        ingredient_categories = db.execute(text(
+            "SELECT category, ingredient_count FROM ingredient_category_stats"
+        )).fetchall()
+
         category_stats = {category: count for category, count in ingredient_categories}
+        # 분류가 없는 식재료 (통계 테이블에는 NULL 분류가 없음)
+        uncategorized = stats["ingredients"] - sum(category_stats.values())
+        if uncategorized > 0:
+            category_stats[None] = uncategorized
         
         extended_stats = {
             **stats,
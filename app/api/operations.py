@@ -19,6 +19,7 @@ from enum import Enum
 
 # 로컬 임포트
 from app.database import get_db, DATABASE_URL
+from db_executor import db_endpoint
 from app.api.auth import get_current_user
 from models import (
     PurchaseOrder, PurchaseOrderItem, ReceivingRecord, ReceivingItem,
@@ -576,7 +577,8 @@ async def create_preprocessing_master_data(db: Session = Depends(get_db)):
 # ==============================================================================
 
 @router.get("/api/meal-counts/timeline")
-async def get_meal_counts_timeline(
+@db_endpoint
+def get_meal_counts_timeline(
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
     site_id: Optional[int] = Query(None),
@@ -623,7 +625,8 @@ async def get_meal_counts_timeline(
         return {"success": False, "message": str(e)}
 
 @router.get("/api/meal-counts/templates/{tab_type}")
-async def get_meal_count_templates(tab_type: str, db: Session = Depends(get_db)):
+@db_endpoint
+def get_meal_count_templates(tab_type: str, db: Session = Depends(get_db)):
     """급식수 템플릿 조회"""
     try:
         templates = db.query(MealCountTemplate).filter(
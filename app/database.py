@@ -10,6 +10,8 @@ from sqlalchemy.orm import sessionmaker
 from typing import Generator
 import logging
 
+from query_stats import instrument_engine
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -44,6 +46,9 @@ def set_sqlite_pragma(dbapi_connection, connection_record):
     cursor.execute("PRAGMA cache_size=10000")
     cursor.close()
 
+# 문장별 실행 시간 집계 / 느린 쿼리 실행 계획 기록
+instrument_engine(engine)
+
 # 세션 팩토리
 SessionLocal = sessionmaker(
     autocommit=False,
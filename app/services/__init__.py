@@ -5,7 +5,9 @@
 - 데이터 무결성 보장
 """
 from .supplier_service import SupplierService
+from .unit_price_service import UnitPriceService
 
 __all__ = [
-    "SupplierService"
+    "SupplierService",
+    "UnitPriceService"
 ]
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""
+단위당 단가 서비스
+- 업로드된 식자재의 단위당 단가/g당 단가를 재계산기와 같은 방식으로 계산
+  (DB에 저장된 학습 패턴 + 계산 추적 컬럼 → 이후 재계산이 같은 값을 다시 쓰지 않음)
+- id별 배치 UPDATE로 저장 (쓰기 스레드에서 커밋)
+- 이미 파싱된 규격은 spec_parse_cache에서 한 번에 조회
+"""
+from typing import Iterable, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from spec_parse_cache import install_parse_store
+from unit_price_recalculator import CALC_INPUT_SQL, compute_updates, load_calculator, write_updates
+from db_writer import DATABASE_PATH, get_writer
+
+# SQLite 바인드 변수 제한(999) 이하로 나눠 조회
+CODE_QUERY_CHUNK = 900
+
+
+class UnitPriceService:
+    """단위당 단가 서비스 클래스"""
+
+    def __init__(self, db: Session, db_path: str = DATABASE_PATH):
+        """서비스 초기화"""
+        self.db = db
+        self.db_path = db_path
+
+    def _load_rows(self, codes: list) -> List[Tuple]:
+        """
+        고유코드 목록에 해당하는 식자재 행 (고유코드가 같은 행도 id별로 모두)
+
+        Returns:
+            [(id, 규격, 단위, 입고가, 계산 입력 값), ...] - 재계산기와 같은 형식
+        """
+        rows = []
+        for i in range(0, len(codes), CODE_QUERY_CHUNK):
+            chunk = codes[i:i + CODE_QUERY_CHUNK]
+            params = {f"c{j}": code for j, code in enumerate(chunk)}
+            placeholders = ", ".join(f":{name}" for name in params)
+            rows.extend(tuple(row) for row in self.db.execute(text(f"""
+                SELECT id, specification, unit, purchase_price, {CALC_INPUT_SQL}
+                FROM ingredients
+                WHERE ingredient_code IN ({placeholders})
+                ORDER BY id
+            """), params).fetchall())
+        return rows
+
+    def refresh_unit_prices(self, ingredient_codes: Iterable[str]) -> int:
+        """
+        업로드된 식자재들의 단위당 단가/g당 단가 계산 및 저장
+
+        저장된 (정리된) 규격 기준으로 계산하므로 업로드 후 호출합니다.
+
+        Args:
+            ingredient_codes: 고유코드 목록
+
+        Returns:
+            단가가 계산된 식자재 수
+        """
+        codes = list(dict.fromkeys(code for code in ingredient_codes if code))
+        if not codes:
+            return 0
+
+        install_parse_store(self.db_path)
+        rows = self._load_rows(codes)
+        if not rows:
+            return 0
+
+        calculator, calc_version = load_calculator(self.db_path)
+        updates, success_count = compute_updates(rows, calc_version, calculator.evaluate)
+        get_writer(self.db_path).write(write_updates, updates)
+        return success_count
@@ -0,0 +1,339 @@
+"""
+식자재 목록 열 단위 스냅샷 (분류/업체/단가 필터·정렬·페이징을 NumPy로 처리)
+- 숫자 컬럼은 NumPy 배열, 분류/업체는 사전 인코딩(코드 배열 + 값 목록)
+- 정렬 키별 오름차순 순열을 미리 계산 → 필터는 마스크, 내림차순은 순열을 뒤집어 사용
+- 결과는 현재 페이지의 id 목록과 전체 건수 - 표시할 컬럼은 id로 DB에서 조회
+- ingredients가 바뀌면 변경 카운터(count_cache) 버전이 올라가고, 조회는 이전 버전으로 응답하면서
+  백그라운드에서 다시 만듦 (트리거가 올리므로 모든 쓰기 경로가 반영됨, 연속된 쓰기는
+  REBUILD_INTERVAL_SECONDS 간격으로 묶어 한 번만 만듦 → 요청 스레드는 만드는 비용을 기다리지 않음)
+- 배열은 DB 옆 {db}.snapshot/v{버전}/ 에 .npy로 저장하고 메모리 맵으로 열어
+  같은 버전을 쓰는 워커들이 한 벌을 공유 (먼저 만든 워커의 파일을 다른 워커는 읽기만 함)
+
+정렬은 SQL(keyset_pagination.SortOrder)과 같은 순서입니다: 정렬 값이 같으면 id 순,
+NULL은 가장 작은 값 (단가 컬럼만 가장 큰 값), 내림차순은 id까지 모두 뒤집음.
+"""
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from count_cache import table_state
+from keyset_pagination import SortOrder, page_cursors
+
+DATABASE_PATH = os.getenv("DAHAM_DB_PATH", "daham_meal.db")
+
+# 정렬 키 → NULL을 가장 큰 값으로 취급하는지
+SORT_KEYS = {
+    "id": False,
+    "purchase_price": False,
+    "ingredient_name": False,
+    "price_per_unit": True,
+    "price_per_gram": True,
+}
+
+NUMERIC_COLUMNS = ("purchase_price", "price_per_unit", "price_per_gram")
+CATEGORICAL_COLUMNS = ("category", "supplier_name")
+
+# 필터 조회 시 정렬 순열을 처음 확인하는 구간 크기 (부족하면 두 배씩)
+SCAN_CHUNK_SIZE = 4096
+
+# 스냅샷을 다시 만드는 최소 간격 (재계산 배치처럼 쓰기가 이어지는 동안 매번 만들지 않음)
+REBUILD_INTERVAL_SECONDS = 2.0
+
+_snapshots: Dict[str, "CatalogSnapshot"] = {}
+_rebuilds: Dict[str, threading.Timer] = {}   # 예약/실행 중인 재생성
+_last_rebuild: Dict[str, float] = {}         # 마지막 재생성 시작 시각 (time.monotonic)
+_lock = threading.Lock()
+_build_lock = threading.Lock()
+
+
+def snapshot_dir(db_path: str) -> str:
+    return f"{os.path.abspath(db_path)}.snapshot"
+
+
+def _to_floats(values: Sequence) -> np.ndarray:
+    """숫자 컬럼 배열 (NULL/숫자가 아닌 값은 NaN)"""
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy(dtype=np.float64)
+
+
+def _encode(values: Sequence, sort: bool = False) -> Tuple[np.ndarray, List]:
+    """사전 인코딩 - (코드 배열, 값 목록), NULL은 -1 (sort=True면 코드가 값의 정렬 순위)"""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), sort=sort)
+    return codes.astype(np.int32), list(uniques)
+
+
+def _sort_permutation(ids: np.ndarray, key: np.ndarray) -> np.ndarray:
+    """(정렬 값, id) 오름차순 순열"""
+    return np.lexsort((ids, key)).astype(np.int32)
+
+
+def _read_catalog(db_path: str):
+    """변경 카운터 버전과 같은 시점의 식자재 컬럼 읽기"""
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN")
+        version, _ = table_state(cursor)
+        cursor.execute(f"""
+            SELECT id, ingredient_name, {", ".join(NUMERIC_COLUMNS + CATEGORICAL_COLUMNS)}
+            FROM ingredients
+            ORDER BY id
+        """)
+        rows = cursor.fetchall()
+        cursor.execute("COMMIT")
+    finally:
+        conn.close()
+    return version, rows
+
+
+def _build_arrays(rows: Sequence[tuple]) -> Tuple[Dict[str, np.ndarray], Dict[str, List]]:
+    columns = list(zip(*rows)) if rows else [[] for _ in range(2 + len(NUMERIC_COLUMNS) + len(CATEGORICAL_COLUMNS))]
+    ids = np.array(columns[0], dtype=np.int64)
+    names = columns[1]
+    arrays = {"id": ids}
+    for offset, name in enumerate(NUMERIC_COLUMNS, start=2):
+        arrays[name] = _to_floats(columns[offset])
+    dictionaries = {}
+    for offset, name in enumerate(CATEGORICAL_COLUMNS, start=2 + len(NUMERIC_COLUMNS)):
+        arrays[name], dictionaries[name] = _encode(columns[offset])
+
+    # 이름 정렬 순위 (SQLite BINARY 비교 = 파이썬 문자열 비교, NULL은 -1)
+    name_rank, _ = _encode([None if n is None else str(n) for n in names], sort=True)
+
+    sort_values = {"id": ids, "ingredient_name": name_rank}
+    for name in NUMERIC_COLUMNS:
+        fill = np.inf if SORT_KEYS[name] else -np.inf
+        sort_values[name] = np.where(np.isnan(arrays[name]), fill, arrays[name])
+    for key in SORT_KEYS:
+        arrays[f"order_{key}"] = _sort_permutation(ids, sort_values[key])
+    return arrays, dictionaries
+
+
+class CatalogSnapshot:
+    """한 버전의 식자재 열 단위 스냅샷 (읽기 전용)"""
+
+    def __init__(self, version: int, arrays: Dict[str, np.ndarray], dictionaries: Dict[str, List]):
+        self.version = version
+        self.arrays = arrays
+        self.codes = {name: {value: code for code, value in enumerate(values)}
+                      for name, values in dictionaries.items()}
+        self.size = len(arrays["id"])
+
+    def _mask(self, category: str = None, supplier: str = None,
+              min_unit_price: float = None, max_unit_price: float = None) -> Optional[np.ndarray]:
+        """필터 마스크 (조건이 없으면 None)"""
+        mask = None
+
+        def combine(condition):
+            nonlocal mask
+            mask = condition if mask is None else mask & condition
+
+        for column, value in (("category", category), ("supplier_name", supplier)):
+            if value:
+                code = self.codes[column].get(value)
+                if code is None:
+                    return np.zeros(self.size, dtype=bool)
+                combine(self.arrays[column] == code)
+        # NaN 비교는 항상 False → 단가 없는 행은 제외 (SQL 범위 조건과 같음)
+        if min_unit_price is not None:
+            combine(self.arrays["price_per_unit"] >= min_unit_price)
+        if max_unit_price is not None:
+            combine(self.arrays["price_per_unit"] <= max_unit_price)
+        return mask
+
+    def query(self, category: str = None, supplier: str = None,
+              min_unit_price: float = None, max_unit_price: float = None,
+              sort_by: str = None, sort_order: str = "asc", offset: int = 0, limit: int = 20) -> Tuple[List[int], int]:
+        """
+        필터/정렬/페이징
+
+        Returns:
+            (현재 페이지 id 목록, 전체 건수)
+        """
+        if sort_by in SORT_KEYS and sort_by != "id":
+            key, descending = sort_by, sort_order.lower() != "asc"
+        else:
+            key, descending = "id", True  # 기본 정렬
+
+        ordered = self.arrays[f"order_{key}"]
+        if descending:
+            ordered = ordered[::-1]
+        offset = max(offset, 0)
+        mask = self._mask(category, supplier, min_unit_price, max_unit_price)
+        if mask is None:
+            return self.arrays["id"][ordered[offset:offset + limit]].tolist(), self.size
+
+        # 정렬 순서대로 구간을 늘려 가며 필요한 만큼만 거름 (앞쪽 페이지는 일부만 확인)
+        needed = offset + limit
+        found, count, start, chunk_size = [], 0, 0, max(needed * 4, SCAN_CHUNK_SIZE)
+        while count < needed and start < self.size:
+            chunk = ordered[start:start + chunk_size]
+            hits = chunk[mask[chunk]]
+            found.append(hits)
+            count += len(hits)
+            start += chunk_size
+            chunk_size *= 2
+        page = np.concatenate(found)[offset:needed] if found else ordered[:0]
+        return self.arrays["id"][page].tolist(), int(np.count_nonzero(mask))
+
+    def stats(self) -> Dict:
+        return {
+            "version": self.version,
+            "rows": self.size,
+            "categories": len(self.codes["category"]),
+            "suppliers": len(self.codes["supplier_name"]),
+            "bytes": int(sum(array.nbytes for array in self.arrays.values())),
+        }
+
+
+def _save(directory: str, version: int, arrays: Dict[str, np.ndarray], dictionaries: Dict[str, List]) -> str:
+    """버전 디렉터리에 저장 (임시 디렉터리에 쓴 뒤 이름 변경 - 다른 워커가 먼저 만들었으면 그쪽 사용)"""
+    target = os.path.join(directory, f"v{version}")
+    temporary = f"{target}.tmp-{os.getpid()}-{threading.get_ident()}"
+    os.makedirs(temporary, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(os.path.join(temporary, f"{name}.npy"), array)
+    with open(os.path.join(temporary, "dictionaries.json"), "w", encoding="utf-8") as file:
+        json.dump(dictionaries, file, ensure_ascii=False)
+    try:
+        os.rename(temporary, target)
+    except OSError:
+        shutil.rmtree(temporary, ignore_errors=True)
+    return target
+
+
+def _load(directory: str, version: int) -> Optional[CatalogSnapshot]:
+    """저장된 버전을 메모리 맵으로 열기 (없으면 None)"""
+    target = os.path.join(directory, f"v{version}")
+    try:
+        with open(os.path.join(target, "dictionaries.json"), encoding="utf-8") as file:
+            dictionaries = json.load(file)
+        names = ["id", *NUMERIC_COLUMNS, *CATEGORICAL_COLUMNS, *(f"order_{key}" for key in SORT_KEYS)]
+        # np.memmap 하위 클래스 대신 같은 매핑을 보는 ndarray 뷰 (연산 결과가 memmap으로 감싸지지 않음)
+        arrays = {name: np.asarray(np.load(os.path.join(target, f"{name}.npy"), mmap_mode="r")) for name in names}
+    except (OSError, ValueError):
+        return None
+    return CatalogSnapshot(version, arrays, dictionaries)
+
+
+def _remove_old_versions(directory: str, keep: int):
+    """현재 버전이 아닌 스냅샷 삭제 (다른 워커가 열어 둔 파일은 닫을 때까지 유지됨)"""
+    try:
+        entries = os.listdir(directory)
+    except OSError:
+        return
+    for entry in entries:
+        if entry != f"v{keep}" and entry.startswith("v") and ".tmp-" not in entry:
+            shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+
+
+def build_snapshot(db_path: str = DATABASE_PATH) -> Optional[CatalogSnapshot]:
+    """현재 식자재로 스냅샷을 만들어 저장하고 메모리 맵으로 열기 (변경 카운터가 없으면 None)"""
+    start_time = time.time()
+    version, rows = _read_catalog(db_path)
+    if version is None:
+        return None
+
+    directory = snapshot_dir(db_path)
+    snapshot = _load(directory, version)
+    if snapshot is None:
+        arrays, dictionaries = _build_arrays(rows)
+        _save(directory, version, arrays, dictionaries)
+        snapshot = _load(directory, version) or CatalogSnapshot(version, arrays, dictionaries)
+        _remove_old_versions(directory, version)
+        print(f"식자재 스냅샷 생성: {snapshot.size:,}행 (버전 {version}, {time.time() - start_time:.2f}초)")
+    return snapshot
+
+
+def refresh_catalog_snapshot(db_path: str = DATABASE_PATH) -> Optional[CatalogSnapshot]:
+    """
+    현재 버전 스냅샷으로 교체 (다른 워커가 만든 같은 버전이 있으면 열기만 함)
+
+    서버 시작 시와 백그라운드 재생성에서 호출합니다. 요청 처리 중에는 호출하지 않습니다.
+    """
+    with _build_lock:
+        _last_rebuild[db_path] = time.monotonic()
+        snapshot = build_snapshot(db_path)
+        with _lock:
+            current = _snapshots.get(db_path)
+            if snapshot is not None and (current is None or current.version < snapshot.version):
+                _snapshots[db_path] = current = snapshot
+        return current
+
+
+def _rebuild(db_path: str):
+    try:
+        refresh_catalog_snapshot(db_path)
+    except Exception as e:
+        print(f"식자재 스냅샷 재생성 실패: {e}")
+    finally:
+        with _lock:
+            _rebuilds.pop(db_path, None)
+
+
+def _schedule_rebuild(db_path: str):
+    """백그라운드 재생성 예약 (이미 예약/실행 중이면 무시, 마지막 재생성 후 최소 간격 유지)"""
+    with _lock:
+        if db_path in _rebuilds:
+            return
+        delay = max(0.0, _last_rebuild.get(db_path, 0.0) + REBUILD_INTERVAL_SECONDS - time.monotonic())
+        timer = _rebuilds[db_path] = threading.Timer(delay, _rebuild, args=(db_path,))
+        timer.daemon = True
+        timer.start()
+
+
+def get_catalog_snapshot(cursor, db_path: str = DATABASE_PATH) -> Optional[CatalogSnapshot]:
+    """
+    조회에 쓸 스냅샷 (아직 만든 적이 없거나 변경 카운터가 없으면 None - 호출 측은 SQL로 조회)
+
+    현재 버전보다 오래되었으면 재생성을 예약하고 이전 버전을 그대로 반환합니다.
+    페이지 행은 id로 DB에서 읽으므로 값은 항상 최신이고, 재생성이 끝날 때까지 필터/정렬
+    순서만 직전 버전 기준입니다.
+
+    cursor: 버전 확인용 (요청에서 쓰는 연결)
+    """
+    version, _ = table_state(cursor)
+    if version is None:
+        return None
+    snapshot = _snapshots.get(db_path)
+    if snapshot is None or snapshot.version < version:
+        _schedule_rebuild(db_path)
+    return snapshot
+
+
+def fetch_snapshot_page(cursor, snapshot: CatalogSnapshot, columns_sql: str, order: SortOrder,
+                        category: str = None, supplier: str = None,
+                        min_unit_price: float = None, max_unit_price: float = None,
+                        sort_by: str = None, sort_order: str = "asc", offset: int = 0, limit: int = 20):
+    """
+    스냅샷으로 페이지 id를 구한 뒤 해당 행만 DB에서 조회
+
+    order는 같은 조건의 SQL 정렬 (다음/이전 커서를 SQL 커서 조회와 호환되게 만듦)
+
+    Returns:
+        (행 목록, next_cursor, prev_cursor, 전체 건수)
+    """
+    page_ids, total_count = snapshot.query(category, supplier, min_unit_price, max_unit_price,
+                                           sort_by, sort_order, offset, limit)
+    rows = []
+    if page_ids:
+        cursor.execute(f"""
+            SELECT {columns_sql}, {order.select_sql}
+            FROM ingredients
+            WHERE id IN (SELECT value FROM json_each(?))
+        """, (json.dumps(page_ids),))
+        by_id = {row[0]: row for row in cursor.fetchall()}
+        rows = [by_id[ingredient_id] for ingredient_id in page_ids if ingredient_id in by_id]
+
+    next_cursor, prev_cursor = page_cursors(order, rows, offset + len(page_ids) < total_count, offset > 0)
+    key_count = len(order.columns)
+    return [row[:-key_count] for row in rows], next_cursor, prev_cursor, total_count
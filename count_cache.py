@@ -0,0 +1,120 @@
+"""
+식자재 목록 전체 건수 캐시
+- 같은 검색 조건의 COUNT(*)는 테이블이 바뀌기 전까지 한 번만 실행
+- ingredients 변경은 트리거가 table_change_counters의 version을 올려 캐시를 무효화
+  (여러 uvicorn 워커가 같은 카운터를 보므로 프로세스 간에도 일관됨)
+- 전체 행 수는 트리거가 row_count로 유지 → 조건 없는 조회는 COUNT(*) 없이 즉시 반환
+- estimate=True면 캐시가 오래됐어도 바로 반환 (추정치 표시)
+
+검색 결과를 페이지 넘기며 볼 때 건수는 첫 페이지에서만 계산합니다.
+"""
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Sequence, Tuple
+
+COUNT_CACHE_SIZE = 1024
+
+_cache: "OrderedDict[tuple, Tuple[int, int]]" = OrderedDict()   # 키 → (version, 건수)
+_cache_lock = threading.Lock()
+_stats = {"hits": 0, "stale_hits": 0, "misses": 0}
+
+
+def ensure_change_counter(cursor):
+    """ingredients 변경 카운터 테이블/트리거 확인 및 생성"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS table_change_counters (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0,
+            row_count INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.execute("SELECT 1 FROM table_change_counters WHERE table_name = 'ingredients'")
+    if cursor.fetchone() is None:
+        cursor.execute("""
+            INSERT INTO table_change_counters (table_name, version, row_count)
+            SELECT 'ingredients', 0, COUNT(*) FROM ingredients
+        """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS ingredients_counter_insert AFTER INSERT ON ingredients BEGIN
+            UPDATE table_change_counters SET version = version + 1, row_count = row_count + 1
+            WHERE table_name = 'ingredients';
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS ingredients_counter_delete AFTER DELETE ON ingredients BEGIN
+            UPDATE table_change_counters SET version = version + 1, row_count = row_count - 1
+            WHERE table_name = 'ingredients';
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS ingredients_counter_update AFTER UPDATE ON ingredients BEGIN
+            UPDATE table_change_counters SET version = version + 1 WHERE table_name = 'ingredients';
+        END
+    """)
+
+
+def table_state(cursor) -> Tuple[int, int]:
+    """ingredients (변경 버전, 전체 행 수) - 카운터가 없으면 (None, None)"""
+    try:
+        cursor.execute("SELECT version, row_count FROM table_change_counters WHERE table_name = 'ingredients'")
+        row = cursor.fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    return (row[0], row[1]) if row else (None, None)
+
+
+def cached_count(cursor, from_sql: str, where_conditions: Sequence[str], params: Sequence,
+                 estimate: bool = False) -> Tuple[int, bool]:
+    """
+    조건에 맞는 전체 건수 (캐시 사용)
+
+    Args:
+        from_sql: FROM 절 ("FROM ingredients" + JOIN)
+        where_conditions/params: 검색 조건 (AND로 결합, 목록 조회와 같은 값)
+        estimate: 캐시가 오래됐어도 다시 세지 않고 마지막 값 반환
+
+    Returns:
+        (건수, 추정치 여부)
+    """
+    version, row_count = table_state(cursor)
+    from_sql = " ".join(from_sql.split())
+
+    # 조건 없는 전체 건수는 트리거가 유지하는 행 수
+    if version is not None and not where_conditions and from_sql == "FROM ingredients":
+        return row_count, False
+
+    where_clause = "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
+    key = (from_sql, where_clause, tuple(params))
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None and version is not None and (cached[0] == version or estimate):
+            _cache.move_to_end(key)
+            if cached[0] == version:
+                _stats["hits"] += 1
+                return cached[1], False
+            _stats["stale_hits"] += 1
+            return cached[1], True
+        _stats["misses"] += 1
+
+    cursor.execute(f"SELECT COUNT(*) {from_sql} {where_clause}", list(params))
+    count = cursor.fetchone()[0]
+
+    if version is not None:
+        with _cache_lock:
+            _cache[key] = (version, count)
+            _cache.move_to_end(key)
+            while len(_cache) > COUNT_CACHE_SIZE:
+                _cache.popitem(last=False)
+    return count, False
+
+
+def count_cache_info() -> Dict:
+    with _cache_lock:
+        return dict(_stats, size=len(_cache), maxsize=COUNT_CACHE_SIZE)
+
+
+def clear_count_cache():
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,85 @@
+"""
+DB 작업 전용 스레드 풀
+- async 라우트에서 blocking sqlite3/SQLAlchemy 호출을 이벤트 루프 밖에서 실행
+  → 느린 검색/정렬 하나가 같은 프로세스의 다른 요청을 멈추지 않음
+- 스레드 수 제한 (DAHAM_DB_THREADS, 기본 8): SQLite는 쓰기가 한 번에 하나라 더 늘려도 이득이 없고,
+  무거운 요청이 몰려도 연결/메모리 사용량이 일정함
+- @db_endpoint: 동기 함수로 작성한 라우트 핸들러를 DB 스레드에서 실행
+  (FastAPI는 원래 함수의 시그니처로 파라미터/의존성을 처리)
+- run_db(func, *args): async 핸들러 안에서 일부만 DB 스레드에서 실행
+
+기존 코드(count_cache, keyset_pagination, catalog_snapshot, sqlite_pool 등)가 모두 동기 sqlite3 기반이라
+aiosqlite로 옮기지 않고 같은 코드를 스레드 풀에서 실행합니다.
+"""
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+DB_THREADS = int(os.getenv("DAHAM_DB_THREADS", "8"))
+
+_executor = ThreadPoolExecutor(max_workers=DB_THREADS, thread_name_prefix="daham-db")
+_lock = threading.Lock()
+_stats = {"submitted": 0, "completed": 0, "failed": 0, "active": 0, "peak_active": 0,
+          "queue_ms_total": 0.0, "queue_ms_max": 0.0, "run_ms_total": 0.0, "run_ms_max": 0.0}
+
+
+def _run(func: Callable, submitted: float, args, kwargs):
+    started = time.perf_counter()
+    queued = (started - submitted) * 1000
+    with _lock:
+        _stats["active"] += 1
+        _stats["peak_active"] = max(_stats["peak_active"], _stats["active"])
+        _stats["queue_ms_total"] += queued
+        _stats["queue_ms_max"] = max(_stats["queue_ms_max"], queued)
+    failed = True
+    try:
+        result = func(*args, **kwargs)
+        failed = False
+        return result
+    finally:
+        elapsed = (time.perf_counter() - started) * 1000
+        with _lock:
+            _stats["active"] -= 1
+            _stats["failed" if failed else "completed"] += 1
+            _stats["run_ms_total"] += elapsed
+            _stats["run_ms_max"] = max(_stats["run_ms_max"], elapsed)
+
+
+async def run_db(func: Callable, *args, **kwargs):
+    """func(*args, **kwargs)를 DB 스레드에서 실행하고 결과를 기다림 (호출한 쪽의 컨텍스트 유지)"""
+    with _lock:
+        _stats["submitted"] += 1
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_executor, context.run, _run, func, time.perf_counter(), args, kwargs)
+
+
+def db_endpoint(func: Callable) -> Callable:
+    """동기 라우트 핸들러를 DB 스레드에서 실행하는 async 핸들러로 감쌈
+
+    @app.get(...) 바로 아래에 붙입니다.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_db(func, *args, **kwargs)
+    return wrapper
+
+
+def db_executor_stats() -> Dict:
+    """DB 스레드 풀 지표 (대기/실행 시간, 동시 실행 수)"""
+    with _lock:
+        stats = dict(_stats)
+    finished = stats["completed"] + stats["failed"]
+    started = finished + stats["active"]
+    stats["threads"] = DB_THREADS
+    stats["queued"] = stats["submitted"] - started
+    for key, count in (("queue_ms", started), ("run_ms", finished)):
+        stats[f"{key}_avg"] = round(stats[f"{key}_total"] / count, 3) if count else 0.0
+        stats[f"{key}_total"] = round(stats[f"{key}_total"], 3)
+        stats[f"{key}_max"] = round(stats[f"{key}_max"], 3)
+    return stats
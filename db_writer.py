@@ -0,0 +1,304 @@
+"""
+단일 쓰기 연결 (DB 쓰기 전용 스레드)
+- DB 경로마다 쓰기 스레드 하나가 쓰기 연결 하나를 소유하고, 제출된 쓰기 작업을 순서대로 적용
+  → 같은 프로세스의 업로드/재계산/학습 저장/식자재 수정이 서로 쓰기 잠금을 기다리거나
+    "database is locked"로 실패하지 않음
+- 그룹 커밋: 큐에 쌓여 있던 작업들을 한 트랜잭션(BEGIN IMMEDIATE)에서 적용하고 한 번에 커밋
+  작업마다 SAVEPOINT로 감싸 실패한 작업만 되돌림 (같은 그룹의 다른 작업은 커밋)
+- 결과는 커밋이 끝난 뒤 Future로 전달
+    writer.write(func, *args)              동기 (결과를 기다림)
+    await writer.write_async(func, *args)  async 핸들러
+  func(cursor, *args)는 커밋하지 않습니다 (커밋은 쓰기 스레드가 함)
+- SQLAlchemy 세션처럼 자기 연결로 쓰는 작업은 writer.call(func)로 쓰기 스레드에서 단독 실행
+  (진행 중인 그룹을 먼저 커밋) → commit_session(db, work)
+
+읽기는 기존처럼 각자의 연결(db_pool, 세션)에서 합니다. WAL이라 읽기와 쓰기는 서로 막지 않습니다.
+다른 프로세스(관리 스크립트 등)가 쓰는 동안에는 busy timeout(WRITER_TIMEOUT)만큼 기다립니다.
+"""
+import asyncio
+import contextvars
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+from query_stats import InstrumentedConnection
+
+DATABASE_PATH = os.getenv("DAHAM_DB_PATH", "daham_meal.db")
+
+WRITER_MAX_BATCH = 256    # 한 번에 커밋하는 최대 작업 수
+WRITER_TIMEOUT = 30       # 다른 프로세스가 쓰기 잠금을 가진 경우 대기 시간 (초)
+WRITER_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+)
+
+_writers: Dict[str, "DBWriter"] = {}
+_writers_lock = threading.Lock()
+
+
+class _Job:
+    """큐에 넣는 작업 하나 (transactional=False면 쓰기 연결 밖에서 단독 실행)
+
+    제출한 쪽의 컨텍스트(쿼리 통계의 요청 라우트 등)에서 실행합니다.
+    """
+
+    __slots__ = ("func", "args", "kwargs", "transactional", "future", "submitted", "context")
+
+    def __init__(self, func: Callable, args, kwargs, transactional: bool):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.transactional = transactional
+        self.future = Future()
+        self.submitted = time.perf_counter()
+        self.context = contextvars.copy_context()
+
+
+class DBWriter:
+    """DB 경로 하나의 쓰기 스레드 (처음 제출할 때 시작)"""
+
+    def __init__(self, db_path: str = DATABASE_PATH, max_batch: int = WRITER_MAX_BATCH,
+                 timeout: float = WRITER_TIMEOUT):
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"jobs": 0, "calls": 0, "failed": 0, "commits": 0, "largest_group": 0,
+                       "wait_ms_total": 0.0, "wait_ms_max": 0.0, "commit_ms_total": 0.0, "commit_ms_max": 0.0}
+
+    # ------------------------------------------------------------------
+    # 제출
+    # ------------------------------------------------------------------
+
+    def submit(self, func: Callable, *args, **kwargs) -> Future:
+        """쓰기 작업 제출 - func(cursor, *args, **kwargs)의 반환값이 커밋 후 Future에 들어감"""
+        return self._submit(_Job(func, args, kwargs, True))
+
+    def submit_call(self, func: Callable, *args, **kwargs) -> Future:
+        """자기 연결로 쓰는 작업을 쓰기 스레드에서 단독 실행 - func(*args, **kwargs)"""
+        return self._submit(_Job(func, args, kwargs, False))
+
+    def write(self, func: Callable, *args, **kwargs):
+        """쓰기 작업을 제출하고 커밋될 때까지 기다림"""
+        return self.submit(func, *args, **kwargs).result()
+
+    async def write_async(self, func: Callable, *args, **kwargs):
+        """쓰기 작업을 제출하고 커밋될 때까지 await"""
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    def call(self, func: Callable, *args, **kwargs):
+        """submit_call 후 결과를 기다림"""
+        return self.submit_call(func, *args, **kwargs).result()
+
+    async def call_async(self, func: Callable, *args, **kwargs):
+        """submit_call 후 결과를 await"""
+        return await asyncio.wrap_future(self.submit_call(func, *args, **kwargs))
+
+    def _submit(self, job: _Job) -> Future:
+        if threading.current_thread() is self._thread:
+            # 쓰기 작업 안에서 다시 쓰기를 요청한 경우: 큐에서 기다리면 교착되므로 그 자리에서 실행
+            self._run_inline(job)
+            return job.future
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, name="daham-db-writer", daemon=True)
+                    self._thread.start()
+        self._queue.put(job)
+        return job.future
+
+    def close(self):
+        """큐에 남은 작업을 모두 처리한 뒤 쓰기 스레드 종료"""
+        thread = self._thread
+        if thread is None:
+            return
+        self._queue.put(None)
+        thread.join()
+
+    # ------------------------------------------------------------------
+    # 쓰기 스레드
+    # ------------------------------------------------------------------
+
+    def _loop(self):
+        self._conn = sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None,
+                                     factory=InstrumentedConnection)
+        for pragma in WRITER_PRAGMAS:
+            self._conn.execute(pragma).fetchall()
+        try:
+            while True:
+                jobs = [self._queue.get()]
+                while jobs[-1] is not None and len(jobs) < self.max_batch:
+                    try:
+                        jobs.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                group = []
+                for job in jobs:
+                    if job is not None and job.transactional:
+                        group.append(job)
+                        continue
+                    self._commit_group(group)
+                    group = []
+                    if job is None:
+                        return
+                    self._run_call(job)
+                self._commit_group(group)
+        finally:
+            self._conn.close()
+            self._conn = None
+            with self._start_lock:
+                self._thread = None
+
+    def _start(self, job: _Job) -> bool:
+        """취소되지 않은 작업이면 실행 시작으로 표시하고 대기 시간 기록"""
+        if not job.future.set_running_or_notify_cancel():
+            return False
+        waited = (time.perf_counter() - job.submitted) * 1000
+        with self._stats_lock:
+            self._stats["jobs" if job.transactional else "calls"] += 1
+            self._stats["wait_ms_total"] += waited
+            self._stats["wait_ms_max"] = max(self._stats["wait_ms_max"], waited)
+        return True
+
+    def _fail(self, job: _Job, error: BaseException):
+        job.future.set_exception(error)
+        with self._stats_lock:
+            self._stats["failed"] += 1
+
+    def _apply(self, cursor, job: _Job):
+        """진행 중인 트랜잭션 안에서 작업 하나 적용 (실패하면 그 작업만 되돌림)
+
+        Returns:
+            (성공 여부, 반환값)
+        """
+        cursor.execute("SAVEPOINT writer_job")
+        try:
+            result = job.context.run(job.func, cursor, *job.args, **job.kwargs)
+        except Exception as e:
+            cursor.execute("ROLLBACK TO writer_job")
+            cursor.execute("RELEASE writer_job")
+            self._fail(job, e)
+            return False, None
+        cursor.execute("RELEASE writer_job")
+        return True, result
+
+    def _commit_group(self, jobs: List[_Job]):
+        """작업 묶음을 한 트랜잭션으로 적용하고 커밋한 뒤 결과 전달"""
+        jobs = [job for job in jobs if self._start(job)]
+        if not jobs:
+            return
+        started = time.perf_counter()
+        cursor = self._conn.cursor()
+        done = []
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            for job in jobs:
+                ok, result = self._apply(cursor, job)
+                if ok:
+                    done.append((job, result))
+            cursor.execute("COMMIT")
+        except Exception as e:
+            # BEGIN/COMMIT 실패 (다른 프로세스의 잠금 대기 초과, 디스크 오류 등): 묶음 전체 실패
+            if self._conn.in_transaction:
+                self._conn.execute("ROLLBACK")
+            for job in jobs:
+                if not job.future.done():
+                    self._fail(job, e)
+            return
+        finally:
+            cursor.close()
+
+        elapsed = (time.perf_counter() - started) * 1000
+        with self._stats_lock:
+            self._stats["commits"] += 1
+            self._stats["largest_group"] = max(self._stats["largest_group"], len(jobs))
+            self._stats["commit_ms_total"] += elapsed
+            self._stats["commit_ms_max"] = max(self._stats["commit_ms_max"], elapsed)
+        for job, result in done:
+            job.future.set_result(result)
+
+    def _run_call(self, job: _Job):
+        if not self._start(job):
+            return
+        try:
+            result = job.context.run(job.func, *job.args, **job.kwargs)
+        except Exception as e:
+            self._fail(job, e)
+            return
+        job.future.set_result(result)
+
+    def _run_inline(self, job: _Job):
+        if not job.transactional:
+            self._run_call(job)
+        elif self._conn.in_transaction:
+            # 진행 중인 그룹의 일부로 적용 (커밋은 그룹과 함께)
+            if self._start(job):
+                ok, result = self._apply(self._conn.cursor(), job)
+                if ok:
+                    job.future.set_result(result)
+        else:
+            self._commit_group([job])
+
+    def stats(self) -> Dict:
+        """쓰기 스레드 지표 (작업/커밋 수, 그룹 크기, 대기/커밋 시간)"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        started = stats["jobs"] + stats["calls"]
+        stats["queued"] = self._queue.qsize()
+        stats["running"] = self._thread is not None
+        stats["avg_group"] = round(stats["jobs"] / stats["commits"], 2) if stats["commits"] else 0.0
+        for key, count in (("wait_ms", started), ("commit_ms", stats["commits"])):
+            stats[f"{key}_avg"] = round(stats[f"{key}_total"] / count, 3) if count else 0.0
+            stats[f"{key}_total"] = round(stats[f"{key}_total"], 3)
+            stats[f"{key}_max"] = round(stats[f"{key}_max"], 3)
+        return stats
+
+
+def get_writer(db_path: str = DATABASE_PATH) -> DBWriter:
+    """DB 파일별 쓰기 스레드 (같은 파일이면 경로 표기가 달라도 같은 쓰기 스레드)"""
+    key = os.path.abspath(db_path)
+    writer = _writers.get(key)
+    if writer is None:
+        with _writers_lock:
+            writer = _writers.get(key)
+            if writer is None:
+                writer = _writers[key] = DBWriter(db_path)
+    return writer
+
+
+def _commit(session, work: Optional[Callable]):
+    try:
+        result = work() if work is not None else None
+        session.commit()
+        return result
+    except Exception:
+        session.rollback()
+        raise
+
+
+def commit_session(session, work: Optional[Callable] = None, db_path: str = DATABASE_PATH):
+    """
+    SQLAlchemy 세션의 쓰기와 커밋을 쓰기 스레드에서 단독 실행
+
+    autoflush=False 세션은 add/수정한 내용을 커밋할 때 한꺼번에 쓰므로 쓰기 잠금은 이 안에서만
+    잡힙니다. 바로 실행되는 쓰기(bulk_insert_mappings, execute(UPDATE ...))는 work로 넘깁니다.
+    실패하면 세션을 롤백하고 예외를 다시 던집니다.
+
+    Returns:
+        work()의 반환값
+    """
+    return get_writer(db_path).call(_commit, session, work)
+
+
+async def commit_session_async(session, work: Optional[Callable] = None, db_path: str = DATABASE_PATH):
+    """commit_session의 async 버전"""
+    return await get_writer(db_path).call_async(_commit, session, work)
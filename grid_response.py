@@ -0,0 +1,89 @@
+"""
+그리드용 목록 응답 (필드 선택 / 열 단위 형식 / 빠른 JSON / gzip)
+- fields=a,b,c: 요청한 열만 응답 (순서도 요청 순서)
+- layout=columns: 열 이름은 한 번만 보내고 행은 값 배열로 응답 (Handsontable data에 그대로 사용)
+  layout=rows(기본): 기존처럼 행마다 {열 이름: 값} 딕셔너리
+- JSON은 orjson이 있으면 orjson으로 직렬화 (없으면 표준 json, 공백 없이)
+- 클라이언트가 Accept-Encoding: gzip을 보내면 일정 크기 이상 응답은 gzip으로 압축
+"""
+import gzip
+import json
+from typing import Iterable, List, Sequence, Union
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # 나중에 설치하면 사용
+
+GRID_LAYOUTS = ("rows", "columns")
+GZIP_MIN_SIZE = 1024  # 이보다 작은 응답은 압축 이득이 없음
+GZIP_LEVEL = 3  # 압축률은 기본값(9)과 10% 정도 차이, 속도는 5배 이상 빠름
+
+
+def select_fields(available: Sequence[str], fields: Union[str, Sequence[str], None] = None,
+                  default: Sequence[str] = None) -> List[str]:
+    """응답할 열 이름 목록
+
+    Args:
+        available: 응답할 수 있는 열 이름 (기본 순서)
+        fields: 쉼표로 구분한 문자열 또는 목록 (없으면 default, default도 없으면 전체)
+        default: fields가 없을 때 응답할 열
+
+    Raises:
+        ValueError: 알 수 없는 열 이름이 있거나 선택한 열이 없을 때
+    """
+    if not fields:
+        return list(default or available)
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    names = [str(name).strip() for name in fields if str(name).strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise ValueError(f"알 수 없는 필드입니다: {', '.join(unknown)} (가능한 필드: {', '.join(available)})")
+    if not names:
+        raise ValueError("필드를 하나 이상 지정해야 합니다")
+    return list(dict.fromkeys(names))
+
+
+def check_layout(layout: str) -> str:
+    """응답 형식 확인 (rows / columns)"""
+    if layout not in GRID_LAYOUTS:
+        raise ValueError(f"지원하지 않는 응답 형식입니다: {layout} ({', '.join(GRID_LAYOUTS)})")
+    return layout
+
+
+def grid_rows(names: Sequence[str], rows: Iterable[Sequence], layout: str = "rows") -> list:
+    """값 배열 행을 응답 형식으로 변환 (행의 값 순서는 names와 같아야 함)"""
+    if layout == "columns":
+        return [list(row) for row in rows]
+    return [dict(zip(names, row)) for row in rows]
+
+
+def dumps(payload) -> bytes:
+    """JSON 직렬화 (orjson 우선)"""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def accepts_gzip(request: Request) -> bool:
+    """Accept-Encoding에 gzip이 있고 q=0으로 거부하지 않았는지"""
+    for part in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            quality = params.strip().lower()
+            return not (quality.startswith("q=") and quality[2:].strip() in ("0", "0.", "0.0", "0.00", "0.000"))
+    return False
+
+
+def grid_response(request: Request, payload, status_code: int = 200) -> Response:
+    """JSON 응답 (가능하면 gzip 압축)"""
+    body = dumps(payload)
+    headers = {"Vary": "Accept-Encoding"}
+    if len(body) >= GZIP_MIN_SIZE and accepts_gzip(request):
+        body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
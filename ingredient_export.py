@@ -0,0 +1,218 @@
+"""
+식자재 목록 내보내기 (CSV / XLSX 스트리밍)
+- SQLite 커서에서 fetchmany 배치로 읽어 바로 내보냄 (전체 목록을 메모리에 올리지 않음)
+- CSV: 배치마다 인코딩해 바로 전송 - 헤더는 조회 전에 먼저 보내 첫 바이트가 즉시 나감
+- XLSX: 최소 구성 xlsx(zip)를 직접 스트리밍 - 고정 파트를 먼저 쓰고 시트 XML은 배치마다
+  압축해 바로 전송 (openpyxl 저장은 모든 행을 쓴 뒤에야 첫 바이트가 나가고 느림)
+- 열 이름은 대량 업로드 양식과 같아 내보낸 파일을 그대로 다시 올릴 수 있음
+
+StreamingResponse는 동기 제너레이터를 스레드 풀에서 배치마다 호출하므로 연결은
+check_same_thread=False로 열고, 제너레이터가 끝나거나 닫힐 때 닫습니다.
+"""
+import csv
+import io
+import re
+import sqlite3
+import zipfile
+from datetime import datetime
+from typing import Iterable, Iterator, List, Sequence
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+from fastapi.responses import StreamingResponse
+
+# (DB 컬럼, 내보내기 열 이름) - 업로드 양식 순서
+EXPORT_COLUMNS = [
+    ("category", "분류(대분류)"),
+    ("sub_category", "기본식자재(세분류)"),
+    ("ingredient_code", "고유코드"),
+    ("ingredient_name", "식자재명"),
+    ("origin", "원산지"),
+    ("posting_status", "게시유무"),
+    ("specification", "규격"),
+    ("unit", "단위"),
+    ("tax_type", "면세"),
+    ("delivery_days", "선발주일"),
+    ("purchase_price", "입고가"),
+    ("selling_price", "판매가"),
+    ("supplier_name", "거래처명"),
+    ("notes", "비고"),
+    ("created_at", "등록일"),
+    ("price_per_unit", "단위당 단가"),
+]
+
+EXPORT_BATCH_SIZE = 2000
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def iter_export_rows(db_path: str, from_sql: str, where_conditions: Sequence[str], params: Sequence,
+                     order_sql: str = "ORDER BY id", batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[List[tuple]]:
+    """
+    조건에 맞는 행을 배치(행 목록) 단위로 반환
+
+    Args:
+        from_sql: FROM 절 ("FROM ingredients" + JOIN)
+        where_conditions/params: 검색 조건 (AND로 결합, 목록 조회와 같은 값)
+        order_sql: ORDER BY 절
+    """
+    columns_sql = ", ".join(column for column, _ in EXPORT_COLUMNS)
+    where_clause = "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT {columns_sql} {from_sql} {where_clause} {order_sql}", list(params))
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        conn.close()
+
+
+def stream_csv(batches: Iterable[List[tuple]]) -> Iterator[bytes]:
+    """배치마다 CSV 바이트 생성 (엑셀에서 한글이 깨지지 않도록 UTF-8 BOM)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([header for _, header in EXPORT_COLUMNS])
+    yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+
+    for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+
+
+# xlsx 고정 파트 (통합 문서 하나, 시트 하나)
+XLSX_STATIC_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="{sheet_title}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+XLSX_SHEET_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+XLSX_SHEET_FOOTER = '</sheetData></worksheet>'
+
+# XML에 넣을 수 없는 제어 문자 (탭/줄바꿈 제외)
+_ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+class _ChunkSink:
+    """zipfile 출력을 모아 두는 쓰기 전용 스트림 (tell/seek이 없어 zipfile이 데이터 디스크립터 사용)"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _column_letters(count: int) -> List[str]:
+    letters = []
+    for index in range(1, count + 1):
+        name = ""
+        while index:
+            index, remainder = divmod(index - 1, 26)
+            name = chr(65 + remainder) + name
+        letters.append(name)
+    return letters
+
+
+def _xlsx_row(row_number: int, values: Sequence, letters: Sequence[str]) -> str:
+    """시트 XML 한 행 (숫자는 숫자 셀, 문자열은 인라인 문자열 셀, NULL은 빈 셀)"""
+    cells = []
+    for letter, value in zip(letters, values):
+        if value is None:
+            continue
+        ref = f"{letter}{row_number}"
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            cells.append(f'<c r="{ref}"><v>{value!r}</v></c>')
+        else:
+            text = escape(_ILLEGAL_XML_CHARS.sub("", str(value)))
+            space = ' xml:space="preserve"' if text != text.strip() else ""
+            cells.append(f'<c r="{ref}" t="inlineStr"><is><t{space}>{text}</t></is></c>')
+    return f'<row r="{row_number}">{"".join(cells)}</row>'
+
+
+def stream_xlsx(batches: Iterable[List[tuple]], sheet_title: str = "식자재") -> Iterator[bytes]:
+    """시트 XML을 배치마다 압축해 바로 반환하는 xlsx 스트림"""
+    sink = _ChunkSink()
+    letters = _column_letters(len(EXPORT_COLUMNS))
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in XLSX_STATIC_PARTS.items():
+            archive.writestr(name, content.replace("{sheet_title}", escape(sheet_title)))
+
+        with archive.open("xl/worksheets/sheet1.xml", "w") as sheet:
+            sheet.write((XLSX_SHEET_HEADER + _xlsx_row(1, [header for _, header in EXPORT_COLUMNS], letters))
+                        .encode("utf-8"))
+            yield sink.take()
+
+            row_number = 1
+            for rows in batches:
+                parts = []
+                for row in rows:
+                    row_number += 1
+                    parts.append(_xlsx_row(row_number, row, letters))
+                sheet.write("".join(parts).encode("utf-8"))
+                yield sink.take()
+            sheet.write(XLSX_SHEET_FOOTER.encode("utf-8"))
+    yield sink.take()
+
+
+def export_response(batches: Iterable[List[tuple]], export_format: str, filename_prefix: str) -> StreamingResponse:
+    """배치 목록을 CSV/XLSX 다운로드 응답으로 변환 (export_format은 EXPORT_FORMATS 중 하나)"""
+    body = stream_csv(batches) if export_format == "csv" else stream_xlsx(batches)
+    filename = f"{filename_prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{export_format}"
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}"}
+    )
@@ -0,0 +1,105 @@
+"""
+식자재 전문 검색 (SQLite FTS5)
+- ingredients_fts: 식자재명/고유코드/규격/거래처명/분류 trigram 인덱스
+- ingredients 테이블 변경은 트리거로 자동 반영 (external content)
+- trigram 토크나이저라 한글 부분 문자열 검색도 LIKE '%검색어%'와 같은 결과
+
+trigram은 3글자 이상부터 인덱스를 쓸 수 있으므로 1~2글자 검색어는 기존 LIKE로 처리합니다.
+"""
+from typing import List, Optional, Sequence, Tuple
+
+FTS_TABLE = "ingredients_fts"
+FTS_COLUMNS = ("ingredient_name", "ingredient_code", "specification", "supplier_name", "category")
+
+# trigram 인덱스를 쓸 수 있는 최소 검색어 길이
+MIN_FTS_TERM_LENGTH = 3
+
+
+def ensure_search_index(cursor) -> bool:
+    """
+    ingredients_fts 테이블/동기화 트리거 확인 및 생성
+
+    Returns:
+        인덱스를 새로 만들어 전체 색인했으면 True
+    """
+    cursor.execute("SELECT name FROM sqlite_master WHERE name = ?", (FTS_TABLE,))
+    created = cursor.fetchone() is None
+
+    columns = ", ".join(FTS_COLUMNS)
+    new_values = ", ".join(f"new.{col}" for col in FTS_COLUMNS)
+    old_values = ", ".join(f"old.{col}" for col in FTS_COLUMNS)
+
+    cursor.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+            {columns},
+            content='ingredients', content_rowid='id', tokenize='trigram'
+        )
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS ingredients_fts_insert AFTER INSERT ON ingredients BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values});
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS ingredients_fts_delete AFTER DELETE ON ingredients BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+        END
+    """)
+    # 검색 대상 컬럼이 바뀔 때만 재색인 (단가 재계산 등은 영향 없음)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS ingredients_fts_update AFTER UPDATE OF id, {columns} ON ingredients BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values});
+        END
+    """)
+
+    if created:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return created
+
+
+def fts_query(term: str, columns: Sequence[str] = FTS_COLUMNS) -> Optional[str]:
+    """
+    검색어를 FTS5 MATCH 식으로 변환 (지정 컬럼 한정 부분 문자열 검색)
+
+    Returns:
+        MATCH 식 또는 None (trigram 인덱스를 쓸 수 없는 짧은 검색어)
+    """
+    term = (term or "").strip()
+    if len(term) < MIN_FTS_TERM_LENGTH:
+        return None
+    phrase = '"' + term.replace('"', '""') + '"'
+    return f"{{{' '.join(columns)}}} : {phrase}"
+
+
+def fts_match_sql(id_column: str = "id", placeholder: str = "?") -> str:
+    """FTS 검색 결과 id 조건 SQL (SQLAlchemy text()에서는 placeholder에 :이름 사용)"""
+    return f"{id_column} IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH {placeholder})"
+
+
+def search_condition(term: str, columns: Sequence[str], id_column: str = "id") -> Tuple[str, List]:
+    """
+    검색 WHERE 조건 (지정 컬럼 중 하나라도 검색어를 포함)
+
+    Returns:
+        (조건 SQL, 파라미터) - 짧은 검색어는 LIKE 조건
+    """
+    query = fts_query(term, columns)
+    if query is None:
+        like = f"%{(term or '').strip()}%"
+        return "(" + " OR ".join(f"{col} LIKE ?" for col in columns) + ")", [like] * len(columns)
+    return fts_match_sql(id_column), [query]
+
+
+def relevance_join(term: str, columns: Sequence[str], id_column: str = "ingredients.id") -> Optional[Tuple[str, List]]:
+    """
+    관련도 정렬용 JOIN (검색 조건 포함) - ORDER BY fts.fts_rank 로 정렬
+
+    Returns:
+        (JOIN SQL, 파라미터) 또는 None (짧은 검색어 - search_condition() 사용)
+    """
+    query = fts_query(term, columns)
+    if query is None:
+        return None
+    return (f"JOIN (SELECT rowid AS fts_rowid, rank AS fts_rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?) AS fts "
+            f"ON fts.fts_rowid = {id_column}", [query])
@@ -0,0 +1,156 @@
+"""
+식자재 업체별/분류별 통계 테이블 (트리거로 유지)
+- ingredient_supplier_stats: 업체별 식자재 수, 활성 수, 입고가 최소/평균/최대, 최근 수정일
+- ingredient_category_stats: 분류별 같은 항목
+- ingredients INSERT/UPDATE/DELETE 트리거가 해당 업체/분류 한 행만 갱신
+
+대시보드와 업체 목록은 전체 식자재 GROUP BY 대신 이 테이블을 읽습니다 (업체 수에 비례).
+최소/최대값은 삭제·변경된 행이 경계값일 때만 (업체, 입고가) 인덱스로 다시 구합니다.
+평균 = price_sum / price_count (입고가가 없는 행은 AVG처럼 제외)
+"""
+from typing import Dict
+
+# 통계 테이블 → 기준 컬럼
+STATS_TABLES = {
+    "ingredient_supplier_stats": "supplier_name",
+    "ingredient_category_stats": "category",
+}
+
+# 경계값 재계산용 인덱스 (기준 컬럼 범위에서 MIN/MAX를 바로 찾음)
+STATS_INDEXES = {
+    "idx_ingredients_supplier_price": "ingredients(supplier_name, purchase_price)",
+    "idx_ingredients_category_price": "ingredients(category, purchase_price)",
+}
+
+
+def _row_expressions(cursor) -> Dict[str, str]:
+    """트리거에서 쓸 활성 여부/수정일 식 (컬럼이 없는 예전 DB도 지원)"""
+    cursor.execute("PRAGMA table_info(ingredients)")
+    columns = {row[1] for row in cursor.fetchall()}
+    return {
+        "active": "COALESCE({row}.is_active = 1, 0)" if "is_active" in columns else "1",
+        "updated": "{row}.updated_at" if "updated_at" in columns else "NULL",
+        "updated_column": "updated_at" if "updated_at" in columns else "NULL",
+        "update_of": ", ".join(c for c in ("supplier_name", "category", "purchase_price", "is_active", "updated_at")
+                               if c in columns),
+    }
+
+
+def _add_row_sql(table: str, key: str, expr: Dict[str, str]) -> str:
+    """new 행을 통계에 더하는 UPSERT"""
+    active = expr["active"].format(row="new")
+    updated = expr["updated"].format(row="new")
+    return f"""
+        INSERT INTO {table} ({key}, ingredient_count, active_count, price_count, price_sum,
+                             min_price, max_price, last_updated_at)
+        SELECT new.{key}, 1, {active}, new.purchase_price IS NOT NULL, COALESCE(new.purchase_price, 0),
+               new.purchase_price, new.purchase_price, {updated}
+        WHERE new.{key} IS NOT NULL
+        ON CONFLICT({key}) DO UPDATE SET
+            ingredient_count = ingredient_count + 1,
+            active_count = active_count + excluded.active_count,
+            price_count = price_count + excluded.price_count,
+            price_sum = price_sum + excluded.price_sum,
+            min_price = CASE WHEN min_price IS NULL OR excluded.min_price < min_price
+                             THEN excluded.min_price ELSE min_price END,
+            max_price = CASE WHEN max_price IS NULL OR excluded.max_price > max_price
+                             THEN excluded.max_price ELSE max_price END,
+            last_updated_at = CASE WHEN last_updated_at IS NULL OR excluded.last_updated_at > last_updated_at
+                                   THEN excluded.last_updated_at ELSE last_updated_at END;
+    """
+
+
+def _remove_row_sql(table: str, key: str, expr: Dict[str, str]) -> str:
+    """old 행을 통계에서 빼는 UPDATE (경계값이면 남은 행에서 다시 구함)"""
+    active = expr["active"].format(row="old")
+    updated = expr["updated"].format(row="old")
+    updated_column = expr["updated_column"]
+    return f"""
+        UPDATE {table} SET
+            ingredient_count = ingredient_count - 1,
+            active_count = active_count - {active},
+            price_count = price_count - (old.purchase_price IS NOT NULL),
+            price_sum = price_sum - COALESCE(old.purchase_price, 0),
+            min_price = CASE WHEN old.purchase_price <= min_price
+                             THEN (SELECT MIN(purchase_price) FROM ingredients WHERE {key} = old.{key})
+                             ELSE min_price END,
+            max_price = CASE WHEN old.purchase_price >= max_price
+                             THEN (SELECT MAX(purchase_price) FROM ingredients WHERE {key} = old.{key})
+                             ELSE max_price END,
+            last_updated_at = CASE WHEN {updated} >= last_updated_at
+                                   THEN (SELECT MAX({updated_column}) FROM ingredients WHERE {key} = old.{key})
+                                   ELSE last_updated_at END
+        WHERE {key} = old.{key};
+        DELETE FROM {table} WHERE {key} = old.{key} AND ingredient_count <= 0;
+    """
+
+
+def rebuild_stats(cursor):
+    """통계 테이블을 ingredients 전체에서 다시 계산"""
+    expr = _row_expressions(cursor)
+    active = expr["active"].format(row="ingredients")
+    updated_column = expr["updated_column"]
+    for table, key in STATS_TABLES.items():
+        cursor.execute(f"DELETE FROM {table}")
+        cursor.execute(f"""
+            INSERT INTO {table} ({key}, ingredient_count, active_count, price_count, price_sum,
+                                 min_price, max_price, last_updated_at)
+            SELECT {key}, COUNT(*), SUM({active}), COUNT(purchase_price), COALESCE(SUM(purchase_price), 0),
+                   MIN(purchase_price), MAX(purchase_price), MAX({updated_column})
+            FROM ingredients
+            WHERE {key} IS NOT NULL
+            GROUP BY {key}
+        """)
+
+
+def ensure_stats_tables(cursor) -> bool:
+    """
+    통계 테이블/인덱스/트리거 확인 및 생성
+
+    Returns:
+        테이블을 새로 만들어 전체 계산했으면 True
+    """
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = ?",
+                   ("ingredient_supplier_stats",))
+    created = cursor.fetchone() is None
+
+    for table, key in STATS_TABLES.items():
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                {key} TEXT PRIMARY KEY,
+                ingredient_count INTEGER NOT NULL DEFAULT 0,
+                active_count INTEGER NOT NULL DEFAULT 0,
+                price_count INTEGER NOT NULL DEFAULT 0,
+                price_sum REAL NOT NULL DEFAULT 0,
+                min_price REAL,
+                max_price REAL,
+                last_updated_at TIMESTAMP
+            )
+        """)
+    for name, target in STATS_INDEXES.items():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+
+    expr = _row_expressions(cursor)
+    add_sql = "".join(_add_row_sql(table, key, expr) for table, key in STATS_TABLES.items())
+    remove_sql = "".join(_remove_row_sql(table, key, expr) for table, key in STATS_TABLES.items())
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS ingredient_stats_insert AFTER INSERT ON ingredients BEGIN
+            {add_sql}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS ingredient_stats_delete AFTER DELETE ON ingredients BEGIN
+            {remove_sql}
+        END
+    """)
+    # 통계에 영향 있는 컬럼이 바뀔 때만 (단가 재계산 등은 제외)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS ingredient_stats_update AFTER UPDATE OF {expr["update_of"]} ON ingredients BEGIN
+            {remove_sql}
+            {add_sql}
+        END
+    """)
+
+    if created:
+        rebuild_stats(cursor)
+    return created
@@ -0,0 +1,209 @@
+"""
+커서(keyset) 페이지네이션
+- 정렬 컬럼 + id 기준으로 "마지막으로 본 행 다음"부터 조회 (OFFSET 없이 인덱스 탐색)
+- 커서는 경계 행의 정렬 값을 담은 불투명 문자열 (next/prev 방향 포함)
+- 페이지 번호 방식(OFFSET) 조회도 같은 정렬로 처리하고 다음/이전 커서를 함께 반환
+
+SQLite는 NULL을 가장 작은 값으로 정렬합니다. 첫 정렬 컬럼에 NULL이 있을 수 있으면
+NULL 구간과 값 구간을 나눠 조회해 각 구간에서 인덱스 범위 탐색이 되도록 합니다
+('컬럼 <= ? OR 컬럼 IS NULL' 조건은 인덱스를 처음부터 훑게 됨).
+"""
+import base64
+import json
+from typing import List, Optional, Sequence, Tuple
+
+# 커서 정렬용 인덱스 (인덱스는 rowid를 마지막 키로 포함하므로 "정렬 컬럼, id" 순서로 탐색)
+# 서버 시작 시 schema_migrations가 생성
+PAGINATION_INDEXES = {
+    "idx_ingredients_name": "ingredients(ingredient_name)",
+    "idx_ingredients_purchase_price": "ingredients(purchase_price)",
+    "idx_ingredients_supplier_name": "ingredients(supplier_name, ingredient_name)",
+}
+
+
+class SortOrder:
+    """
+    커서 페이지네이션 정렬 정의
+
+    Args:
+        name: 정렬 이름 (커서에 기록해 다른 정렬의 커서를 거부)
+        columns: [(정렬 식, NULL 가능 여부), ...] - id는 자동으로 마지막에 추가
+        descending: 모든 컬럼 내림차순 여부
+    """
+
+    def __init__(self, name: str, columns: Sequence[Tuple[str, bool]] = (), descending: bool = False,
+                 id_column: str = "id"):
+        self.name = name
+        self.columns = list(columns) + [(id_column, False)]
+        self.descending = descending
+
+    def order_by(self, reverse: bool = False) -> str:
+        direction = "DESC" if self.descending != reverse else "ASC"
+        return "ORDER BY " + ", ".join(f"{expr} {direction}" for expr, _ in self.columns)
+
+    @property
+    def select_sql(self) -> str:
+        return ", ".join(expr for expr, _ in self.columns)
+
+
+def encode_cursor(order: SortOrder, values: Sequence, direction: str) -> str:
+    """경계 행 정렬 값을 커서 문자열로 변환 (direction: 'next' 또는 'prev')"""
+    payload = json.dumps({"s": order.name, "d": direction, "v": list(values)},
+                         ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(order: SortOrder, cursor: str) -> Tuple[list, str]:
+    """커서 문자열 해석 - 형식이 틀리거나 다른 정렬의 커서면 ValueError"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        values, direction, name = payload["v"], payload["d"], payload["s"]
+    except Exception:
+        raise ValueError("잘못된 커서입니다")
+    if name != order.name or direction not in ("next", "prev") or len(values) != len(order.columns):
+        raise ValueError("현재 정렬과 맞지 않는 커서입니다")
+    return values, direction
+
+
+def _after_condition(order: SortOrder, values: Sequence, descending: bool) -> Tuple[str, list]:
+    """정렬 순서상 values 행보다 뒤에 오는 행 조건 (NULL은 가장 작은 값)"""
+    terms, params = [], []
+    eq_sql, eq_params = [], []
+    for (expr, _nullable), value in zip(order.columns, values):
+        if value is None:
+            after = None if descending else f"{expr} IS NOT NULL"
+            after_params = []
+        else:
+            after = f"({expr} < ? OR {expr} IS NULL)" if descending else f"{expr} > ?"
+            after_params = [value]
+        if after:
+            terms.append("(" + " AND ".join(eq_sql + [after]) + ")")
+            params.extend(eq_params + after_params)
+        if value is None:
+            eq_sql.append(f"{expr} IS NULL")
+        else:
+            eq_sql.append(f"{expr} = ?")
+            eq_params.append(value)
+    if not terms:
+        return "0", []
+    return "(" + " OR ".join(terms) + ")", params
+
+
+def _regions(order: SortOrder, descending: bool, start_value, has_cursor: bool) -> List[Tuple[str, list]]:
+    """
+    조회 순서대로 첫 정렬 컬럼 구간 조건 목록 (인덱스 범위 탐색용)
+
+    NULL 가능 컬럼은 오름차순이면 NULL 구간이 먼저, 내림차순이면 나중입니다.
+    """
+    expr, nullable = order.columns[0]
+    if not nullable:
+        if not has_cursor:
+            return [("", [])]
+        return [(f"{expr} {'<=' if descending else '>='} ?", [start_value])]
+
+    null_region = (f"{expr} IS NULL", [])
+    value_region = (f"{expr} IS NOT NULL", [])
+    if has_cursor and start_value is not None:
+        value_region = (f"{expr} {'<=' if descending else '>='} ?", [start_value])
+
+    regions = [value_region, null_region] if descending else [null_region, value_region]
+    if has_cursor:
+        # 커서가 있는 구간부터
+        in_null = start_value is None
+        if descending:
+            regions = [null_region] if in_null else regions
+        else:
+            regions = [value_region] if not in_null else regions
+    return regions
+
+
+def _fetch(cursor, columns_sql, from_sql, where_conditions, params, order, limit, values, reverse):
+    descending = order.descending != reverse
+    rows = []
+    for region_sql, region_params in _regions(order, descending, values[0] if values else None, values is not None):
+        conditions = list(where_conditions)
+        query_params = list(params)
+        if region_sql:
+            conditions.append(region_sql)
+            query_params.extend(region_params)
+        if values is not None:
+            after_sql, after_params = _after_condition(order, values, descending)
+            conditions.append(after_sql)
+            query_params.extend(after_params)
+        where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
+        cursor.execute(f"""
+            SELECT {columns_sql}, {order.select_sql}
+            {from_sql}
+            {where_clause}
+            {order.order_by(reverse)}
+            LIMIT ?
+        """, query_params + [limit - len(rows)])
+        rows.extend(cursor.fetchall())
+        if len(rows) >= limit:
+            break
+    return rows
+
+
+def fetch_keyset_page(cursor, columns_sql: str, from_sql: str, where_conditions: Sequence[str], params: Sequence,
+                      order: SortOrder, limit: int, page_cursor: Optional[str] = None):
+    """
+    커서 기준 한 페이지 조회
+
+    Args:
+        columns_sql: 반환할 컬럼 SQL ("id, ingredient_name, ...")
+        from_sql: FROM 절 ("FROM ingredients" + JOIN)
+        where_conditions/params: 검색 조건 (AND로 결합)
+        page_cursor: 이전 응답의 next_cursor/prev_cursor (없으면 첫 페이지)
+
+    Returns:
+        (행 목록, next_cursor, prev_cursor) - 더 없으면 커서는 None
+    """
+    values, direction = decode_cursor(order, page_cursor) if page_cursor else (None, "next")
+    reverse = direction == "prev"
+    rows = _fetch(cursor, columns_sql, from_sql, where_conditions, params, order, limit + 1, values, reverse)
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if reverse:
+        rows.reverse()
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, values is not None
+
+    next_cursor, prev_cursor = page_cursors(order, rows, has_next, has_prev)
+    key_count = len(order.columns)
+    return [row[:-key_count] for row in rows], next_cursor, prev_cursor
+
+
+def fetch_offset_page(cursor, columns_sql: str, from_sql: str, where_conditions: Sequence[str], params: Sequence,
+                      order: SortOrder, limit: int, offset: int, total_count: int):
+    """
+    페이지 번호(OFFSET) 방식 조회 - 다음/이전 커서도 함께 반환 (이후 페이지는 커서로 이동 가능)
+
+    Returns:
+        (행 목록, next_cursor, prev_cursor)
+    """
+    where_clause = "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
+    cursor.execute(f"""
+        SELECT {columns_sql}, {order.select_sql}
+        {from_sql}
+        {where_clause}
+        {order.order_by()}
+        LIMIT ? OFFSET ?
+    """, list(params) + [limit, offset])
+    rows = cursor.fetchall()
+
+    next_cursor, prev_cursor = page_cursors(order, rows, offset + len(rows) < total_count, offset > 0)
+    key_count = len(order.columns)
+    return [row[:-key_count] for row in rows], next_cursor, prev_cursor
+
+
+def page_cursors(order: SortOrder, rows: Sequence, has_next: bool, has_prev: bool):
+    """정렬 값이 뒤에 붙은 행 목록에서 (next_cursor, prev_cursor) 생성"""
+    if not rows:
+        return None, None
+    key_count = len(order.columns)
+    next_cursor = encode_cursor(order, rows[-1][-key_count:], "next") if has_next else None
+    prev_cursor = encode_cursor(order, rows[0][-key_count:], "prev") if has_prev else None
+    return next_cursor, prev_cursor
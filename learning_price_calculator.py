@@ -1,21 +1,251 @@
 import sqlite3
 import re
+import atexit
+import hashlib
+import threading
 from decimal import Decimal, InvalidOperation
 from typing import Optional, Tuple, Dict, List
 from datetime import datetime
 
 # 기존 함수 import
 from improved_unit_price_calculator import calculate_unit_price_improved as original_calculate_unit_price_improved
+from db_writer import get_writer
 
 DATABASE_PATH = "daham_meal.db"
 
+# 학습 쓰기 버퍼: 누적 건수 또는 경과 시간 중 먼저 도달하는 조건에서 저장
+FLUSH_BATCH_SIZE = 500
+FLUSH_INTERVAL_SECONDS = 5.0
+
+# 이 신뢰도를 넘는 패턴만 계산에 사용
+MIN_PATTERN_CONFIDENCE = 0.7
+
+# 와일드카드 변환 후 정규식에서 리터럴이 아닌 문자
+_REGEX_META = set('.^$*+?()')
+# 리터럴 조각을 안전하게 추출할 수 없는 정규식 문법 (항상 전체 검사)
+_COMPLEX_META = set('|[]{}\\')
+
+
+def wildcard_to_regex(pattern: str) -> str:
+    """와일드카드 패턴을 정규식 문자열로 변환 (* -> .*, ? -> .)"""
+    return pattern.replace('*', '.*').replace('?', '.')
+
+
+def search_regex(pattern: str) -> str:
+    """
+    부분 문자열 검색(re.search)용 정규식 - 매칭 여부는 wildcard_to_regex()와 같음
+
+    검색은 어느 위치에서나 시작하므로 앞뒤의 .* 는 불필요하고, 연속된 .* 는 하나와
+    같습니다. 남겨 두면 실패하는 검색마다 역추적이 크게 늘어납니다.
+    """
+    regex = wildcard_to_regex(pattern)
+    # '+'가 있으면 .*+ (소유 수량자)가 될 수 있어 그대로 사용
+    if '+' in regex or any(ch in _COMPLEX_META for ch in regex):
+        return regex
+    while '.*.*' in regex:
+        regex = regex.replace('.*.*', '.*')
+    if regex.startswith('.*'):
+        regex = regex[2:]
+    if regex.endswith('.*'):
+        regex = regex[:-2]
+    return regex
+
+
+def _is_indexable_char(ch: str) -> bool:
+    """IGNORECASE 매칭과 str.lower() 비교 결과가 같은 문자인지"""
+    if ch in _REGEX_META or ch in _COMPLEX_META:
+        return False
+    if ch.isascii():
+        # 's', 'i'는 유니코드 대소문자 예외(ſ, İ)가 있어 제외
+        return ch.lower() not in ('s', 'i')
+    # 한글 등 대소문자 구분이 없는 문자만 사용
+    return ch.lower() == ch and ch.upper() == ch
+
+
+def _text_grams(text: str) -> set:
+    """텍스트(소문자)의 모든 2글자 조각"""
+    lowered = text.lower()
+    return {lowered[i:i + 2] for i in range(len(lowered) - 1)}
+
+
+def required_grams(pattern: str) -> Optional[set]:
+    """
+    와일드카드 패턴이 매칭되려면 규격에 반드시 포함되어야 하는 2글자 조각
+
+    Returns:
+        조각 집합 (비어있을 수 있음) 또는 None (복잡한 정규식이라 추출 불가)
+    """
+    regex = wildcard_to_regex(pattern)
+    if any(ch in _COMPLEX_META for ch in regex):
+        return None
+
+    grams = set()
+    run = []
+    for ch in regex + '.':
+        if _is_indexable_char(ch):
+            run.append(ch.lower())
+            continue
+        for i in range(len(run) - 1):
+            grams.add(run[i] + run[i + 1])
+        run = []
+    return grams
+
+
+class PatternIndex:
+    """
+    학습 패턴 인덱스
+    - 와일드카드 패턴은 로드 시 한 번만 정규식으로 컴파일
+    - 단위 패턴별 버킷 → 숫자를 제거한 규격 템플릿의 리터럴 2글자 조각별 버킷
+    - 조회 시 규격에 포함된 조각의 버킷만 후보로 검사
+
+    패턴 매칭은 부분 문자열 검색(re.search)이므로 템플릿이 같은 패턴만 고르면
+    결과가 달라집니다. 대신 패턴이 요구하는 리터럴 조각을 키로 사용해
+    기존 전체 검사와 동일한 결과를 보장합니다.
+    """
+
+    def __init__(self):
+        self.entries = {}         # pattern_key -> (순번, 규격 정규식, 단위 정규식)
+        self.unit_buckets = {}    # unit_pattern -> {'scan': [...], 'grams': {gram: [...]}}
+        self.unit_regexes = {}    # unit_pattern -> 컴파일된 정규식
+        self.gram_counts = {}     # 조각별 등록 패턴 수 (가장 드문 조각 선택용)
+        self._unit_match_cache = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, pattern_key: str):
+        return pattern_key in self.entries
+
+    @staticmethod
+    def compile(pattern: str):
+        """와일드카드 패턴 컴파일 (빈 패턴/잘못된 정규식은 None - 매칭되지 않음)"""
+        if not pattern:
+            return None
+        try:
+            return re.compile(search_regex(pattern), re.IGNORECASE)
+        except re.error:
+            print(f"잘못된 학습 패턴 무시: {pattern}")
+            return None
+
+    def add(self, pattern_key: str, spec_pattern: str, unit_pattern: str):
+        """패턴 등록 (이미 있으면 무시 - 순번 유지)"""
+        if pattern_key in self.entries:
+            return
+
+        spec_regex = self.compile(spec_pattern)
+        if unit_pattern not in self.unit_regexes:
+            self.unit_regexes[unit_pattern] = self.compile(unit_pattern)
+            self._unit_match_cache.clear()
+        unit_regex = self.unit_regexes[unit_pattern]
+
+        self.entries[pattern_key] = (len(self.entries), spec_regex, unit_regex)
+        if spec_regex is None or unit_regex is None:
+            return
+
+        bucket = self.unit_buckets.get(unit_pattern)
+        if bucket is None:
+            # 단위별 캐시는 버킷이 있는 단위 패턴만 담으므로 새 버킷이 생기면 비움
+            bucket = self.unit_buckets[unit_pattern] = {'scan': [], 'grams': {}}
+            self._unit_match_cache.clear()
+        grams = required_grams(spec_pattern)
+        if not grams:
+            bucket['scan'].append(pattern_key)
+            return
+
+        gram = min(grams, key=lambda g: (self.gram_counts.get(g, 0), g))
+        self.gram_counts[gram] = self.gram_counts.get(gram, 0) + 1
+        bucket['grams'].setdefault(gram, []).append(pattern_key)
+
+    def _matching_unit_patterns(self, unit: str) -> List[str]:
+        """단위에 매칭되는 단위 패턴 목록 (단위 문자열별 캐시)"""
+        cached = self._unit_match_cache.get(unit)
+        if cached is None:
+            cached = [
+                unit_pattern for unit_pattern, regex in self.unit_regexes.items()
+                if regex is not None and unit_pattern in self.unit_buckets and regex.search(unit)
+            ]
+            self._unit_match_cache[unit] = cached
+        return cached
+
+    def lookup(self, specification: str, unit: str) -> List[str]:
+        """규격-단위에 매칭되는 패턴 키 목록 (등록 순서)"""
+        if not specification or not unit:
+            return []
+
+        unit_patterns = self._matching_unit_patterns(unit)
+        if not unit_patterns:
+            return []
+
+        grams = _text_grams(specification)
+        candidates = set()
+        for unit_pattern in unit_patterns:
+            bucket = self.unit_buckets[unit_pattern]
+            candidates.update(bucket['scan'])
+            bucket_grams = bucket['grams']
+            for gram in grams:
+                keys = bucket_grams.get(gram)
+                if keys:
+                    candidates.update(keys)
+
+        matched = []
+        for pattern_key in candidates:
+            order, spec_regex, _ = self.entries[pattern_key]
+            if spec_regex.search(specification):
+                matched.append((order, pattern_key))
+        matched.sort()
+        return [pattern_key for _, pattern_key in matched]
+
+
+def _write_learning(cursor, pending_patterns: Dict, pending_feedback: List[Tuple]) -> int:
+    """학습 버퍼 저장 (쓰기 스레드에서 실행)
+
+    Returns:
+        새로 추가한 패턴 수
+    """
+    new_count = 0
+    for (spec_pattern, unit_pattern, method), pending in pending_patterns.items():
+        cursor.execute("""
+            UPDATE price_calculation_patterns
+            SET success_count = success_count + ?, failure_count = failure_count + ?,
+                last_used = CURRENT_TIMESTAMP
+            WHERE specification_pattern = ? AND unit_pattern = ? AND extraction_method = ?
+        """, (pending['success'], pending['failure'], spec_pattern, unit_pattern, method))
+
+        if cursor.rowcount == 0:
+            cursor.execute("""
+                INSERT INTO price_calculation_patterns
+                (specification_pattern, unit_pattern, extraction_method, extraction_value,
+                 success_count, failure_count, notes)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (spec_pattern, unit_pattern, method, pending['value'],
+                  pending['success'], pending['failure'], "자동 학습된 패턴"))
+            new_count += 1
+
+    cursor.executemany("""
+        INSERT INTO calculation_feedback
+        (ingredient_id, original_specification, original_unit, original_price,
+         calculated_unit_price, corrected_unit_price, feedback_type, user_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, pending_feedback)
+    return new_count
+
+
 class LearningPriceCalculator:
     """학습 기반 단가 계산 시스템"""
 
-    def __init__(self, db_path=DATABASE_PATH):
+    def __init__(self, db_path=DATABASE_PATH, patterns: List[Tuple[str, str, Dict]] = None):
         self.db_path = db_path
         self.pattern_cache = {}
-        self.load_patterns()
+        self.pattern_index = PatternIndex()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending_patterns = {}   # (규격 패턴, 단위 패턴, 추출 방법) -> 누적 성공/실패
+        self._pending_feedback = []
+        self._flush_timer = None
+        if patterns is None:
+            self.load_patterns()
+        else:
+            self.load_snapshot(patterns)
 
     def load_patterns(self):
         """저장된 패턴들을 메모리에 로드"""
@@ -27,11 +257,12 @@ class LearningPriceCalculator:
                 SELECT specification_pattern, unit_pattern, extraction_method,
                        extraction_value, success_count, failure_count
                 FROM price_calculation_patterns
-                ORDER BY success_count DESC, last_used DESC
+                ORDER BY success_count DESC, last_used DESC, id
             """)
 
             for row in cursor.fetchall():
                 pattern_key = f"{row[0]}|{row[1]}"
+                self.pattern_index.add(pattern_key, row[0], row[1])
                 self.pattern_cache[pattern_key] = {
                     'method': row[2],
                     'value': row[3],
@@ -46,25 +277,56 @@ class LearningPriceCalculator:
         except Exception as e:
             print(f"패턴 로드 실패: {e}")
 
+    def snapshot(self) -> List[Tuple[str, str, Dict]]:
+        """
+        현재 메모리 패턴 스냅샷 (다른 프로세스에서 동일한 계산을 재현할 때 사용)
+
+        Returns:
+            [(규격 패턴, 단위 패턴, 패턴 정보), ...] - 로드 순서 유지
+        """
+        with self._lock:
+            return [
+                (*pattern_key.rsplit('|', 1), dict(info))
+                for pattern_key, info in self.pattern_cache.items()
+            ]
+
+    def load_snapshot(self, patterns: List[Tuple[str, str, Dict]]):
+        """snapshot()으로 만든 패턴 목록을 메모리에 로드 (DB를 읽지 않음)"""
+        for spec_pattern, unit_pattern, info in patterns:
+            pattern_key = f"{spec_pattern}|{unit_pattern}"
+            self.pattern_index.add(pattern_key, spec_pattern, unit_pattern)
+            self.pattern_cache[pattern_key] = dict(info)
+
+    def pattern_version(self) -> str:
+        """
+        계산에 쓰이는 패턴 집합의 버전 (사용 가능한 패턴의 키/방법/값 요약 해시)
+
+        성공 횟수만 늘어나는 강화는 버전을 바꾸지 않고, 패턴이 추가되거나
+        신뢰도 기준을 넘나들 때만 바뀝니다.
+        """
+        with self._lock:
+            usable = sorted(
+                f"{pattern_key}|{info['method']}|{info['value']}"
+                for pattern_key, info in self.pattern_cache.items()
+                if info['confidence'] > MIN_PATTERN_CONFIDENCE
+            )
+        return hashlib.sha1("\n".join(usable).encode('utf-8')).hexdigest()[:16]
+
     def find_matching_patterns(self, specification: str, unit: str) -> List[Dict]:
-        """규격-단위에 매칭되는 패턴들 찾기"""
+        """규격-단위에 매칭되는 패턴들 찾기 (인덱스 후보만 검사)"""
         matches = []
 
-        for pattern_key, pattern_info in self.pattern_cache.items():
-            spec_pattern, unit_pattern = pattern_key.split('|')
-
-            # 와일드카드 패턴 매칭
-            if self._pattern_matches(specification, spec_pattern) and \
-               self._pattern_matches(unit, unit_pattern):
-                matches.append({
-                    'pattern_key': pattern_key,
-                    'confidence': pattern_info['confidence'],
-                    'method': pattern_info['method'],
-                    'value': pattern_info['value'],
-                    'success_count': pattern_info['success_count']
-                })
-
-        # 신뢰도 순으로 정렬
+        for pattern_key in self.pattern_index.lookup(specification, unit):
+            pattern_info = self.pattern_cache[pattern_key]
+            matches.append({
+                'pattern_key': pattern_key,
+                'confidence': pattern_info['confidence'],
+                'method': pattern_info['method'],
+                'value': pattern_info['value'],
+                'success_count': pattern_info['success_count']
+            })
+
+        # 신뢰도 순으로 정렬 (동률이면 등록 순서 유지)
         matches.sort(key=lambda x: x['confidence'], reverse=True)
         return matches
 
@@ -73,9 +335,8 @@ class LearningPriceCalculator:
         if not text or not pattern:
             return False
 
-        # 와일드카드 패턴을 정규식으로 변환
-        pattern_regex = pattern.replace('*', '.*').replace('?', '.')
-        return bool(re.search(pattern_regex, text, re.IGNORECASE))
+        regex = PatternIndex.compile(pattern)
+        return bool(regex and regex.search(text))
 
     def extract_value_by_method(self, specification: str, unit: str, method: str, base_value: float) -> Optional[float]:
         """추출 방법에 따라 값 계산"""
@@ -130,57 +391,70 @@ class LearningPriceCalculator:
             # 기본값 반환
             return base_value
 
+    def _buffer_pattern(self, spec_pattern: str, unit_pattern: str, method: str,
+                        extraction_value: float, success: bool):
+        """패턴 성공/실패 횟수를 쓰기 버퍼에 누적 (락 안에서 호출)"""
+        key = (spec_pattern, unit_pattern, method)
+        pending = self._pending_patterns.get(key)
+        if pending is None:
+            pending = {'value': extraction_value, 'success': 0, 'failure': 0}
+            self._pending_patterns[key] = pending
+        pending['success' if success else 'failure'] += 1
+
+    def _update_cache(self, spec_pattern: str, unit_pattern: str, method: str,
+                      extraction_value: float, success: bool):
+        """메모리 캐시/인덱스 증분 갱신 (테이블을 다시 읽지 않음)"""
+        pattern_key = f"{spec_pattern}|{unit_pattern}"
+        pattern_info = self.pattern_cache.get(pattern_key)
+
+        if pattern_info is None:
+            self.pattern_index.add(pattern_key, spec_pattern, unit_pattern)
+            self.pattern_cache[pattern_key] = {
+                'method': method,
+                'value': extraction_value,
+                'success_count': 1 if success else 0,
+                'failure_count': 0 if success else 1,
+                'confidence': 1.0 if success else 0.0
+            }
+            return
+
+        # 같은 키에 다른 추출 방법이 캐시되어 있으면 DB에만 반영
+        if pattern_info['method'] != method:
+            return
+
+        if success:
+            pattern_info['success_count'] += 1
+        else:
+            pattern_info['failure_count'] += 1
+        total = pattern_info['success_count'] + pattern_info['failure_count']
+        pattern_info['confidence'] = pattern_info['success_count'] / total if total > 0 else 0.5
+
+    def _schedule_flush(self):
+        """버퍼 크기/시간 조건에 따라 플러시 예약 (락 안에서 호출)"""
+        pending_count = len(self._pending_patterns) + len(self._pending_feedback)
+        if pending_count >= FLUSH_BATCH_SIZE:
+            return True
+
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(FLUSH_INTERVAL_SECONDS, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+        return False
+
     def save_pattern(self, specification: str, unit: str, method: str, extraction_value: float, success: bool = True):
-        """새로운 패턴 저장 또는 기존 패턴 업데이트"""
+        """새로운 패턴 저장 또는 기존 패턴 업데이트 (쓰기 버퍼 경유)"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
             # 패턴 일반화 (숫자를 와일드카드로 변환)
             spec_pattern = re.sub(r'\d+(?:\.\d+)?', '*', specification)
             unit_pattern = unit if unit else '*'
 
-            # 기존 패턴 확인
-            cursor.execute("""
-                SELECT id, success_count, failure_count
-                FROM price_calculation_patterns
-                WHERE specification_pattern = ? AND unit_pattern = ? AND extraction_method = ?
-            """, (spec_pattern, unit_pattern, method))
-
-            existing = cursor.fetchone()
-
-            if existing:
-                # 기존 패턴 업데이트
-                pattern_id, success_count, failure_count = existing
-                if success:
-                    success_count += 1
-                else:
-                    failure_count += 1
-
-                cursor.execute("""
-                    UPDATE price_calculation_patterns
-                    SET success_count = ?, failure_count = ?, last_used = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                """, (success_count, failure_count, pattern_id))
-
-                print(f"패턴 업데이트: {spec_pattern}|{unit_pattern} (성공:{success_count}, 실패:{failure_count})")
-            else:
-                # 새 패턴 저장
-                cursor.execute("""
-                    INSERT INTO price_calculation_patterns
-                    (specification_pattern, unit_pattern, extraction_method, extraction_value,
-                     success_count, failure_count, notes)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (spec_pattern, unit_pattern, method, extraction_value,
-                      1 if success else 0, 0 if success else 1, f"자동 학습된 패턴"))
-
-                print(f"새 패턴 저장: {spec_pattern}|{unit_pattern} -> {method}")
-
-            conn.commit()
-            conn.close()
+            with self._lock:
+                self._update_cache(spec_pattern, unit_pattern, method, extraction_value, success)
+                self._buffer_pattern(spec_pattern, unit_pattern, method, extraction_value, success)
+                flush_now = self._schedule_flush()
 
-            # 캐시 업데이트
-            self.load_patterns()
+            if flush_now:
+                self.flush()
 
         except Exception as e:
             print(f"패턴 저장 실패: {e}")
@@ -188,71 +462,134 @@ class LearningPriceCalculator:
     def save_feedback(self, ingredient_id: int, specification: str, unit: str,
                      original_price: float, calculated_price: float,
                      corrected_price: float = None, feedback_type: str = "auto"):
-        """계산 피드백 저장"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+        """계산 피드백 저장 (쓰기 버퍼 경유)"""
+        with self._lock:
+            self._pending_feedback.append((ingredient_id, specification, unit, original_price,
+                                           calculated_price, corrected_price, feedback_type, "system"))
+            flush_now = self._schedule_flush()
+
+        if flush_now:
+            self.flush()
+
+    def flush(self) -> bool:
+        """
+        버퍼에 쌓인 패턴 강화/피드백을 한 트랜잭션으로 저장
+
+        Returns:
+            저장 성공 여부 (저장할 내용이 없으면 True, 실패한 내용은 버퍼로 되돌림)
+        """
+        with self._flush_lock:
+            with self._lock:
+                if self._flush_timer is not None:
+                    self._flush_timer.cancel()
+                    self._flush_timer = None
+                pending_patterns, self._pending_patterns = self._pending_patterns, {}
+                pending_feedback, self._pending_feedback = self._pending_feedback, []
+
+            if not pending_patterns and not pending_feedback:
+                return True
+
+            try:
+                # 쓰기 스레드에서 다른 쓰기와 함께 커밋
+                new_count = get_writer(self.db_path).write(_write_learning, pending_patterns, pending_feedback)
+                print(f"학습 버퍼 저장: 패턴 {len(pending_patterns)}개 (신규 {new_count}개), 피드백 {len(pending_feedback)}건")
+                return True
+
+            except Exception as e:
+                print(f"학습 버퍼 저장 실패: {e}")
+                # 실패한 내용은 버퍼로 되돌려 다음 플러시에서 재시도
+                with self._lock:
+                    for key, pending in pending_patterns.items():
+                        current = self._pending_patterns.get(key)
+                        if current is None:
+                            self._pending_patterns[key] = pending
+                        else:
+                            current['success'] += pending['success']
+                            current['failure'] += pending['failure']
+                    self._pending_feedback[:0] = pending_feedback
+                return False
+
+    def _apply_patterns(self, price: float, specification: str, unit: str) -> Tuple[Optional[float], Optional[Dict], List[Dict]]:
+        """
+        학습된 패턴으로 단가 계산 (DB/버퍼에 쓰지 않음)
+
+        Returns:
+            (단가, 성공한 패턴, 계산 중 예외가 난 패턴 목록)
+        """
+        failed = []
+        matching_patterns = self.find_matching_patterns(specification, unit or "")
 
-            cursor.execute("""
-                INSERT INTO calculation_feedback
-                (ingredient_id, original_specification, original_unit, original_price,
-                 calculated_unit_price, corrected_unit_price, feedback_type, user_id)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (ingredient_id, specification, unit, original_price,
-                  calculated_price, corrected_price, feedback_type, "system"))
-
-            conn.commit()
-            conn.close()
+        for pattern in matching_patterns[:3]:  # 상위 3개 패턴만 시도
+            if pattern['confidence'] > MIN_PATTERN_CONFIDENCE:
+                try:
+                    total_weight = self.extract_value_by_method(
+                        specification, unit, pattern['method'], pattern['value']
+                    )
 
-        except Exception as e:
-            print(f"피드백 저장 실패: {e}")
+                    if total_weight and total_weight > 0:
+                        return price / total_weight, pattern, failed
+
+                except Exception as e:
+                    print(f"패턴 계산 실패: {e}")
+                    failed.append(pattern)
+
+        return None, None, failed
+
+    def evaluate(self, price: float, specification: str, unit: str) -> Optional[float]:
+        """
+        읽기 전용 단가 계산 - 학습 패턴을 적용하되 패턴 강화/피드백 저장은 하지 않음
+        (목록 조회 등 GET 경로용)
+        """
+        if not price or price <= 0 or not specification:
+            return None
+
+        unit_price, _, _ = self._apply_patterns(price, specification, unit)
+        if unit_price is not None:
+            return unit_price
+
+        fallback_result = original_calculate_unit_price_improved(price, specification, unit)
+        if fallback_result and fallback_result > 0:
+            return fallback_result
+        return None
 
     def calculate_with_learning(self, price: float, specification: str, unit: str,
-                              ingredient_id: int = None) -> Optional[float]:
-        """학습 기반 단가 계산"""
+                              ingredient_id: int = None, verbose: bool = True) -> Optional[float]:
+        """학습 기반 단가 계산 (verbose=False면 행별 로그 생략 - 대량 재학습용)"""
 
         if not price or price <= 0 or not specification:
             return None
 
-        print(f"학습 계산 시작: 가격={price}, 규격={specification}, 단위={unit}")
+        log = print if verbose else (lambda *args: None)
+        log(f"학습 계산 시작: 가격={price}, 규격={specification}, 단위={unit}")
 
         # 1. 학습된 패턴으로 먼저 시도
-        matching_patterns = self.find_matching_patterns(specification, unit or "")
+        unit_price, pattern, failed_patterns = self._apply_patterns(price, specification, unit)
 
-        for pattern in matching_patterns[:3]:  # 상위 3개 패턴만 시도
-            if pattern['confidence'] > 0.7:  # 70% 이상 신뢰도만
-                try:
-                    total_weight = self.extract_value_by_method(
-                        specification, unit, pattern['method'], pattern['value']
-                    )
-
-                    if total_weight and total_weight > 0:
-                        unit_price = price / total_weight
-                        print(f"학습 패턴 매칭: {pattern['method']} -> {unit_price:.4f}")
+        # 실패한 패턴 기록
+        for failed in failed_patterns:
+            self.save_pattern(specification, unit, failed['method'],
+                            failed['value'], success=False)
 
-                        # 성공한 패턴 강화
-                        self.save_pattern(specification, unit, pattern['method'],
-                                        pattern['value'], success=True)
+        if unit_price is not None:
+            log(f"학습 패턴 매칭: {pattern['method']} -> {unit_price:.4f}")
 
-                        # 피드백 저장
-                        if ingredient_id:
-                            self.save_feedback(ingredient_id, specification, unit,
-                                             price, unit_price, feedback_type="learned_pattern")
+            # 성공한 패턴 강화
+            self.save_pattern(specification, unit, pattern['method'],
+                            pattern['value'], success=True)
 
-                        return unit_price
+            # 피드백 저장
+            if ingredient_id:
+                self.save_feedback(ingredient_id, specification, unit,
+                                 price, unit_price, feedback_type="learned_pattern")
 
-                except Exception as e:
-                    print(f"패턴 계산 실패: {e}")
-                    # 실패한 패턴 기록
-                    self.save_pattern(specification, unit, pattern['method'],
-                                    pattern['value'], success=False)
+            return unit_price
 
         # 2. 기존 알고리즘으로 폴백
-        print("기존 알고리즘으로 폴백")
+        log("기존 알고리즘으로 폴백")
         fallback_result = original_calculate_unit_price_improved(price, specification, unit)
 
         if fallback_result and fallback_result > 0:
-            print(f"기존 알고리즘 성공: {fallback_result:.4f}")
+            log(f"기존 알고리즘 성공: {fallback_result:.4f}")
 
             # 성공한 계산을 새로운 패턴으로 학습
             self._learn_from_successful_calculation(specification, unit, price, fallback_result)
@@ -264,7 +601,7 @@ class LearningPriceCalculator:
 
             return fallback_result
 
-        print("모든 계산 방법 실패")
+        log("모든 계산 방법 실패")
 
         # 실패 피드백 저장
         if ingredient_id:
@@ -298,13 +635,28 @@ class LearningPriceCalculator:
 
 # 글로벌 계산기 인스턴스
 _calculator = LearningPriceCalculator()
+atexit.register(_calculator.flush)
 
-def calculate_unit_price_with_learning(price: float, specification: str, unit: str, ingredient_id: int = None) -> Optional[float]:
+def calculate_unit_price_with_learning(price: float, specification: str, unit: str, ingredient_id: int = None,
+                                      verbose: bool = True) -> Optional[float]:
     """학습 기반 단가 계산 - 기존 함수를 대체하는 인터페이스"""
-    return _calculator.calculate_with_learning(price, specification, unit, ingredient_id)
+    return _calculator.calculate_with_learning(price, specification, unit, ingredient_id, verbose)
+
+def calculate_unit_price_readonly(price: float, specification: str, unit: str) -> Optional[float]:
+    """학습 패턴을 적용한 읽기 전용 단가 계산 - 조회(GET) 경로용, 학습 데이터를 기록하지 않음"""
+    return _calculator.evaluate(price, specification, unit)
+
+def get_pattern_snapshot() -> List[Tuple[str, str, Dict]]:
+    """현재 학습 패턴 스냅샷"""
+    return _calculator.snapshot()
+
+def get_pattern_version() -> str:
+    """현재 학습 패턴 집합의 버전"""
+    return _calculator.pattern_version()
 
 def record_manual_correction(ingredient_id: int, specification: str, unit: str,
-                           original_price: float, calculated_price: float, corrected_price: float):
+                           original_price: float, calculated_price: float, corrected_price: float,
+                           verbose: bool = True):
     """수동 수정사항을 학습 시스템에 반영"""
     _calculator.save_feedback(ingredient_id, specification, unit, original_price,
                             calculated_price, corrected_price, "manual_correction")
@@ -313,10 +665,16 @@ def record_manual_correction(ingredient_id: int, specification: str, unit: str,
     if corrected_price and corrected_price > 0:
         total_weight = original_price / corrected_price
         _calculator.save_pattern(specification, unit, "manual_correction", total_weight, success=True)
-        print(f"수동 수정사항 학습 완료: {specification} -> {corrected_price}")
+        if verbose:
+            print(f"수동 수정사항 학습 완료: {specification} -> {corrected_price}")
+
+def flush_learning_buffer() -> bool:
+    """버퍼에 남은 학습 데이터를 즉시 저장 (실패하면 False - 내용은 버퍼에 남아 다음 저장에서 재시도)"""
+    return _calculator.flush()
 
 def get_calculation_stats():
     """계산 통계 조회"""
+    _calculator.flush()
     try:
         conn = sqlite3.connect(DATABASE_PATH)
         cursor = conn.cursor()
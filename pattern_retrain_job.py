@@ -0,0 +1,261 @@
+"""
+단가 계산 패턴 전체 재학습 백그라운드 작업
+- 전체 식자재를 id 순 배치로 처리 (건수 제한 없음)
+- 배치마다 학습 버퍼를 한 번에 저장하고 마지막 처리 id를 체크포인트로 기록
+- 서버가 재시작되면 체크포인트 이후부터 이어서 실행
+- 실행 권한은 작업 행의 updated_at(체크포인트마다 갱신)으로 관리: 여러 워커가 동시에 시작/재개해도
+  한 곳에서만 실행하고, 갱신이 RETRAIN_LEASE_SECONDS 넘게 멈춘 작업만 중단된 것으로 보고 이어받음
+- 배치 사이에 잠시 쉬어 API 쓰기 요청이 DB 잠금을 얻을 수 있게 함
+
+재학습 규칙은 기존 동기 재학습과 같습니다: 학습 계산 결과가 저장된 단위당 단가와
+다르면 저장된 값을 수동 수정값으로 보고 학습합니다.
+"""
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from db_writer import get_writer
+from learning_price_calculator import (
+    DATABASE_PATH, calculate_unit_price_with_learning, flush_learning_buffer, record_manual_correction
+)
+
+# 한 배치에서 처리하는 식자재 수 (배치마다 학습 버퍼 저장 + 체크포인트)
+RETRAIN_BATCH_SIZE = 500
+
+# 배치 사이 대기 시간 - API 쓰기 요청에 DB 잠금을 양보
+RETRAIN_BATCH_PAUSE_SECONDS = 0.05
+
+# 실행 중인 작업의 마지막 체크포인트 후 이 시간이 지나면 중단된 작업으로 보고 이어받음
+RETRAIN_LEASE_SECONDS = 120
+
+# 재시작 후 이어서 실행할 작업 상태
+UNFINISHED_STATUSES = ('running', 'failed')
+
+RETRAIN_ROWS_SQL = """
+    SELECT id, specification, unit, purchase_price, price_per_unit
+    FROM ingredients
+    WHERE id > ? AND purchase_price > 0 AND specification IS NOT NULL
+    ORDER BY id
+    LIMIT ?
+"""
+
+_JOB_COLUMNS = ('job_id', 'status', 'last_id', 'processed', 'retrained', 'total',
+                'rows_per_second', 'started_at', 'updated_at', 'finished_at', 'error')
+
+def ensure_checkpoint_table(cursor):
+    """재학습 작업 체크포인트 테이블 생성 (서버 시작 시 schema_migrations가 호출)"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS pattern_retrain_jobs (
+            job_id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            last_id INTEGER DEFAULT 0,
+            processed INTEGER DEFAULT 0,
+            retrained INTEGER DEFAULT 0,
+            total INTEGER,
+            rows_per_second REAL,
+            started_at TEXT,
+            updated_at TEXT,
+            finished_at TEXT,
+            error TEXT
+        )
+    """)
+
+
+def _lease_expired_before() -> str:
+    """이 시각 전에 마지막으로 갱신된 실행 중 작업은 중단된 작업"""
+    return (datetime.now() - timedelta(seconds=RETRAIN_LEASE_SECONDS)).isoformat()
+
+
+def _row_to_job(row) -> Dict:
+    job = dict(zip(_JOB_COLUMNS, row))
+    # 실행 중으로 기록되어 있지만 체크포인트 갱신이 멈췄으면 (어느 프로세스에서든) 중단된 작업
+    if job['status'] == 'running' and (job['updated_at'] or '') < _lease_expired_before():
+        job['status'] = 'interrupted'
+    return job
+
+
+def _select_job(cursor, job_id: Optional[str] = None, unfinished: bool = False) -> Optional[Dict]:
+    columns = ", ".join(_JOB_COLUMNS)
+    if job_id:
+        cursor.execute(f"SELECT {columns} FROM pattern_retrain_jobs WHERE job_id = ?", (job_id,))
+    elif unfinished:
+        cursor.execute(f"""
+            SELECT {columns} FROM pattern_retrain_jobs
+            WHERE status IN ({", ".join("?" * len(UNFINISHED_STATUSES))})
+            ORDER BY started_at DESC LIMIT 1
+        """, UNFINISHED_STATUSES)
+    else:
+        cursor.execute(f"SELECT {columns} FROM pattern_retrain_jobs ORDER BY started_at DESC LIMIT 1")
+    row = cursor.fetchone()
+    return _row_to_job(row) if row else None
+
+
+def retrain_rows(rows) -> int:
+    """
+    식자재 배치 재학습 (학습 데이터는 버퍼에만 쌓임)
+
+    Returns:
+        저장된 단가로 재학습한 식자재 수
+    """
+    retrained = 0
+    for ing_id, spec, unit, price, existing_price in rows:
+        new_price = calculate_unit_price_with_learning(price, spec, unit, ing_id, verbose=False)
+
+        if new_price and existing_price and abs(new_price - existing_price) > 0.001:
+            # 기존값과 다르면 수동 수정으로 간주하여 학습
+            record_manual_correction(ing_id, spec, unit, price, new_price, existing_price, verbose=False)
+            retrained += 1
+    return retrained
+
+
+def _save_checkpoint(cursor, job_id: str, lease: str, values: Dict) -> bool:
+    """
+    작업 체크포인트/상태 저장 (쓰기 스레드에서 실행)
+
+    이 실행이 마지막으로 기록한 updated_at(lease)이 그대로일 때만 저장합니다.
+
+    Returns:
+        저장 여부 (False면 갱신이 늦어 다른 프로세스가 작업을 이어받은 것)
+    """
+    assignments = ", ".join(f"{column} = ?" for column in values)
+    cursor.execute(f"UPDATE pattern_retrain_jobs SET {assignments} WHERE job_id = ? AND updated_at = ?",
+                   (*values.values(), job_id, lease))
+    return cursor.rowcount == 1
+
+
+def _run_job(job: Dict, db_path: str):
+    """백그라운드 스레드에서 체크포인트 이후 전체 재학습"""
+    start_time = time.time()
+    processed_this_run = 0
+    last_id, processed, retrained = job['last_id'] or 0, job['processed'] or 0, job['retrained'] or 0
+    status, error = 'completed', None
+    lease = job['updated_at']
+    writer = get_writer(db_path)
+
+    def checkpoint(values: Dict) -> bool:
+        nonlocal lease
+        values['updated_at'] = datetime.now().isoformat()
+        if not writer.write(_save_checkpoint, job['job_id'], lease, values):
+            return False
+        lease = values['updated_at']
+        return True
+
+    try:
+        while True:
+            conn = sqlite3.connect(db_path, timeout=30)
+            rows = conn.execute(RETRAIN_ROWS_SQL, (last_id, RETRAIN_BATCH_SIZE)).fetchall()
+            conn.close()
+            if not rows:
+                break
+
+            retrained += retrain_rows(rows)
+            # 학습 결과를 저장한 뒤에 체크포인트를 옮겨야 재시작 시 누락이 없음
+            if not flush_learning_buffer():
+                raise RuntimeError(f"학습 버퍼 저장 실패 - 체크포인트를 id {last_id}에서 멈춤")
+
+            last_id = rows[-1][0]
+            processed += len(rows)
+            processed_this_run += len(rows)
+            elapsed = time.time() - start_time
+            rows_per_second = round(processed_this_run / elapsed) if elapsed > 0 else 0
+
+            if not checkpoint({'last_id': last_id, 'processed': processed, 'retrained': retrained,
+                               'rows_per_second': rows_per_second}):
+                print(f"패턴 재학습 작업 {job['job_id']}을 다른 프로세스가 이어받아 이 실행을 중단합니다")
+                return
+
+            time.sleep(RETRAIN_BATCH_PAUSE_SECONDS)
+
+    except Exception as e:
+        print(f"패턴 재학습 작업 실패: {e}")
+        status, error = 'failed', str(e)
+
+    now = datetime.now().isoformat()
+    checkpoint({'status': status, 'error': error, 'finished_at': now})
+    print(f"패턴 재학습 {status}: {processed:,}개 처리, {retrained:,}개 재학습")
+
+
+def _claim_job(cursor, restart: bool) -> Tuple[bool, Dict]:
+    """
+    재학습 작업 실행 권한 확보 (쓰기 스레드에서 실행)
+
+    쓰기 스레드의 BEGIN IMMEDIATE 트랜잭션 안에서 확인하고 기록하므로 여러 워커가 동시에
+    시작/재개해도 한 곳만 권한을 얻습니다.
+
+    Returns:
+        (권한을 얻었는지, 시작한 작업 또는 이미 실행 중인 작업)
+    """
+    now = datetime.now().isoformat()
+    job = _select_job(cursor, unfinished=True)
+    if job and job['status'] == 'running':
+        return False, job
+
+    if job and restart:
+        cursor.execute("UPDATE pattern_retrain_jobs SET status = 'cancelled', finished_at = ? WHERE job_id = ?",
+                       (now, job['job_id']))
+        job = None
+
+    if job:
+        cursor.execute("""
+            UPDATE pattern_retrain_jobs SET status = 'running', error = NULL, finished_at = NULL, updated_at = ?
+            WHERE job_id = ?
+        """, (now, job['job_id']))
+    else:
+        cursor.execute("SELECT COUNT(*) FROM ingredients WHERE purchase_price > 0 AND specification IS NOT NULL")
+        total = cursor.fetchone()[0]
+        job = {'job_id': uuid.uuid4().hex[:12]}
+        cursor.execute("""
+            INSERT INTO pattern_retrain_jobs (job_id, status, last_id, processed, retrained, total, started_at, updated_at)
+            VALUES (?, 'running', 0, 0, 0, ?, ?, ?)
+        """, (job['job_id'], total, now, now))
+
+    return True, _select_job(cursor, job['job_id'])
+
+
+def start_retrain_job(db_path: str = DATABASE_PATH, restart: bool = False) -> Dict:
+    """
+    전체 재학습 백그라운드 작업 시작
+
+    이미 실행 중이면 (다른 워커에서 실행 중이어도) 그 작업을 반환합니다. 중단/실패한 작업이
+    있으면 체크포인트부터 이어서 실행하고, restart=True면 그 작업을 취소하고 처음부터 시작합니다.
+    """
+    claimed, job = get_writer(db_path).write(_claim_job, restart)
+    if claimed:
+        threading.Thread(target=_run_job, args=(job, db_path), daemon=True).start()
+    return job
+
+
+def resume_retrain_job(db_path: str = DATABASE_PATH) -> Optional[Dict]:
+    """중단된 재학습 작업이 있으면 체크포인트부터 이어서 실행 (서버 시작 시 호출)"""
+    try:
+        conn = sqlite3.connect(db_path, timeout=30)
+        job = _select_job(conn.cursor(), unfinished=True)
+        conn.close()
+    except Exception as e:
+        print(f"패턴 재학습 작업 확인 실패: {e}")
+        return None
+
+    # 실패한 작업은 직접 다시 시작할 때만, 실행 중인 작업은 그 워커가 계속 실행
+    if job is None or job['status'] != 'interrupted':
+        return None
+
+    claimed, job = get_writer(db_path).write(_claim_job, False)
+    if not claimed:
+        return None  # 다른 워커가 먼저 이어받음
+    print(f"중단된 패턴 재학습 작업 재개: {job['job_id']} (id {job['last_id']} 이후)")
+    threading.Thread(target=_run_job, args=(job, db_path), daemon=True).start()
+    return job
+
+
+def get_retrain_job(job_id: Optional[str] = None, db_path: str = DATABASE_PATH) -> Optional[Dict]:
+    """재학습 작업 상태 조회 (job_id가 없으면 가장 최근 작업)"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        return _select_job(conn.cursor(), job_id)
+    except sqlite3.OperationalError:
+        return None  # 작업 테이블 없음 (마이그레이션 전)
+    finally:
+        conn.close()
@@ -0,0 +1,323 @@
+"""
+쿼리 실행 시간 통계 / 느린 쿼리 로그
+- raw sqlite3: InstrumentedConnection/InstrumentedCursor (연결 풀, 쓰기 스레드 연결에 사용)
+- SQLAlchemy: instrument_engine(engine)으로 before/after_cursor_execute 이벤트 등록
+- 값(문자열/숫자 리터럴, IN 목록)을 ?로 바꾼 정규화 문장별로 횟수, 합계/최대 시간, 시간 분포를 집계
+- 기준 시간(DAHAM_SLOW_QUERY_MS, 기본 100ms)을 넘은 문장은 EXPLAIN QUERY PLAN과 호출 라우트를 함께 기록
+  (실행 계획은 정규화 문장당 한 번만 조회, 전체 스캔/임시 정렬 여부 표시)
+- 라우트는 set_route()로 요청마다 지정 (DB 스레드/쓰기 스레드로 넘어가도 유지)
+  라우팅 전에 지정하는 미들웨어는 함수를 넘기면 기록할 때 매칭된 라우트 템플릿으로 바꿔 씀
+
+sqlite3 커서는 execute 시간과 이어지는 fetch 시간을 합쳐 느린 쿼리를 판단합니다
+(인덱스 없이 LIMIT 없이 읽는 문장은 대부분의 시간이 fetch에서 걸림).
+DAHAM_QUERY_STATS=0이면 집계하지 않습니다.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Union
+
+QUERY_STATS_ENABLED = os.getenv("DAHAM_QUERY_STATS", "1") != "0"
+SLOW_QUERY_MS = float(os.getenv("DAHAM_SLOW_QUERY_MS", "100"))
+
+# 시간 분포 구간 (ms, 마지막 구간은 그 이상)
+HISTOGRAM_BOUNDS = (1, 5, 10, 50, 100, 500, 1000)
+HISTOGRAM_LABELS = tuple(f"<{bound}ms" for bound in HISTOGRAM_BOUNDS) + (f">={HISTOGRAM_BOUNDS[-1]}ms",)
+
+MAX_STATEMENTS = 2000     # 집계하는 정규화 문장 수 (넘으면 OTHER_STATEMENT로 합산)
+MAX_ROUTES = 20           # 문장별로 기록하는 라우트 수
+SLOW_LOG_SIZE = 200       # 보관하는 느린 쿼리 기록 수
+OTHER_STATEMENT = "(기타)"
+
+_EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT", "REPLACE")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+_route: ContextVar[Optional[Union[str, Callable[[], str]]]] = ContextVar("query_route", default=None)
+
+_lock = threading.Lock()
+_statements: Dict[str, Dict] = {}
+_slow_log = deque(maxlen=SLOW_LOG_SIZE)
+_plans: Dict[str, List[str]] = {}
+
+
+@lru_cache(maxsize=4096)
+def normalize_sql(sql: str) -> str:
+    """값을 ?로 바꾸고 공백을 정리한 문장 (f-string으로 값을 넣은 쿼리도 같은 문장으로 집계)"""
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _WHITESPACE.sub(" ", sql).strip()
+    return _IN_LIST.sub("IN (...)", sql)
+
+
+def set_route(route: Optional[Union[str, Callable[[], str]]]):
+    """현재 요청의 라우트 지정 (reset_route에 넘길 토큰 반환)
+
+    라우트 이름 대신 함수를 넘기면 쿼리를 기록할 때 호출해 이름을 구합니다.
+    """
+    return _route.set(route)
+
+
+def reset_route(token):
+    _route.reset(token)
+
+
+def current_route() -> Optional[str]:
+    """현재 요청의 라우트 이름"""
+    route = _route.get()
+    return route() if callable(route) else route
+
+
+def _histogram_index(elapsed_ms: float) -> int:
+    for i, bound in enumerate(HISTOGRAM_BOUNDS):
+        if elapsed_ms < bound:
+            return i
+    return len(HISTOGRAM_BOUNDS)
+
+
+def _entry(key: str) -> Dict:
+    """문장별 집계 항목 (락 안에서 호출)"""
+    entry = _statements.get(key)
+    if entry is None:
+        if len(_statements) >= MAX_STATEMENTS:
+            key = OTHER_STATEMENT
+            entry = _statements.get(key)
+        if entry is None:
+            entry = _statements[key] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "fetch_ms": 0.0,
+                                        "slow_count": 0, "histogram": [0] * len(HISTOGRAM_LABELS),
+                                        "routes": {}}
+    return entry
+
+
+def record(sql: str, elapsed_ms: float) -> str:
+    """실행 한 번 집계
+
+    Returns:
+        정규화 문장 (fetch 시간을 더할 때 사용)
+    """
+    key = normalize_sql(sql)
+    route = current_route()
+    with _lock:
+        entry = _entry(key)
+        entry["count"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+        entry["histogram"][_histogram_index(elapsed_ms)] += 1
+        if route is not None:
+            routes = entry["routes"]
+            if route in routes or len(routes) < MAX_ROUTES:
+                routes[route] = routes.get(route, 0) + 1
+    return key
+
+
+def record_fetch(key: str, elapsed_ms: float):
+    """execute 이후 fetch에 걸린 시간 추가 (횟수/분포는 execute 기준)"""
+    with _lock:
+        entry = _entry(key)
+        entry["total_ms"] += elapsed_ms
+        entry["fetch_ms"] += elapsed_ms
+
+
+def plan_lines(rows) -> List[str]:
+    """EXPLAIN QUERY PLAN 결과를 들여쓴 줄 목록으로 (id, parent, notused, detail)"""
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _notused, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return lines
+
+
+def is_full_scan(plan: List[str]) -> bool:
+    """인덱스 없이 테이블 전체를 읽는 단계가 있는지 (SCAN 테이블, 인덱스/가상 테이블 제외)"""
+    for line in plan:
+        detail = line.strip()
+        if detail.startswith("SCAN") and "USING" not in detail and "VIRTUAL TABLE" not in detail:
+            return True
+    return False
+
+
+def _explain(conn: sqlite3.Connection, sql: str, params) -> List[str]:
+    # 기본 Cursor로 실행 (계측 커서를 거치지 않음)
+    cursor = sqlite3.Connection.cursor(conn)
+    try:
+        return plan_lines(cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall())
+    finally:
+        cursor.close()
+
+
+def log_slow(conn: Optional[sqlite3.Connection], sql: str, params, key: str, elapsed_ms: float):
+    """느린 쿼리 기록 (실행 계획은 정규화 문장당 한 번 조회)"""
+    plan = _plans.get(key)
+    if plan is None and conn is not None and sql.lstrip()[:7].upper().startswith(_EXPLAINABLE):
+        try:
+            plan = _explain(conn, sql, params if params is not None else ())
+        except Exception as e:
+            plan = [f"(실행 계획 조회 실패: {e})"]
+        _plans[key] = plan
+    plan = plan or []
+    route = current_route()
+    full_scan = is_full_scan(plan)
+    with _lock:
+        _entry(key)["slow_count"] += 1
+        _slow_log.append({
+            "at": datetime.now().isoformat(timespec="seconds"),
+            "elapsed_ms": round(elapsed_ms, 3),
+            "route": route,
+            "statement": key,
+            "params": repr(params)[:200] if params else None,
+            "plan": plan,
+            "full_scan": full_scan,
+            "temp_b_tree": any("TEMP B-TREE" in line for line in plan),
+        })
+    print(f"느린 쿼리 {elapsed_ms:.0f}ms [{route or '-'}]{' 전체 스캔' if full_scan else ''}: {key[:300]}")
+    for line in plan:
+        print(f"   {line}")
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """실행/fetch 시간을 집계하는 커서"""
+
+    _query = None    # [정규화 문장, 원문, 파라미터, 누적 시간, 느린 쿼리 기록 여부]
+
+    def _timed(self, method, sql, params, plan_params):
+        started = time.perf_counter()
+        try:
+            return method(self, sql, params)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            key = record(sql, elapsed)
+            slow = elapsed >= SLOW_QUERY_MS
+            self._query = [key, sql, plan_params, elapsed, slow]
+            if slow:
+                log_slow(self.connection, sql, plan_params, key, elapsed)
+
+    def execute(self, sql, parameters=()):
+        if not QUERY_STATS_ENABLED:
+            return super().execute(sql, parameters)
+        return self._timed(sqlite3.Cursor.execute, sql, parameters, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        if not QUERY_STATS_ENABLED:
+            return super().executemany(sql, seq_of_parameters)
+        rows = seq_of_parameters if isinstance(seq_of_parameters, (list, tuple)) else list(seq_of_parameters)
+        # 실행 계획은 첫 행 파라미터로 조회
+        return self._timed(sqlite3.Cursor.executemany, sql, rows, rows[0] if rows else ())
+
+    def _fetched(self, started: float):
+        query = self._query
+        if query is None:
+            return
+        elapsed = (time.perf_counter() - started) * 1000
+        record_fetch(query[0], elapsed)
+        query[3] += elapsed
+        if not query[4] and query[3] >= SLOW_QUERY_MS:
+            query[4] = True
+            log_slow(self.connection, query[1], query[2], query[0], query[3])
+
+    def fetchone(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            self._fetched(started)
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        try:
+            return super().fetchmany(self.arraysize if size is None else size)
+        finally:
+            self._fetched(started)
+
+    def fetchall(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            self._fetched(started)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """커서(conn.execute 포함)가 InstrumentedCursor인 연결"""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def instrument_engine(engine):
+    """SQLAlchemy 엔진의 모든 문장 실행 시간 집계 (sqlite 엔진이면 느린 문장의 실행 계획도 기록)"""
+    if not QUERY_STATS_ENABLED:
+        return
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = (time.perf_counter() - conn.info["query_started"].pop()) * 1000
+        key = record(statement, elapsed)
+        if elapsed >= SLOW_QUERY_MS:
+            params = parameters[0] if executemany and parameters else parameters
+            dbapi_conn = getattr(cursor, "connection", None)
+            log_slow(dbapi_conn if isinstance(dbapi_conn, sqlite3.Connection) else None,
+                     statement, params, key, elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+
+def query_stats(sort: str = "total_ms", limit: int = 50) -> List[Dict]:
+    """정규화 문장별 집계 (sort: total_ms, max_ms, avg_ms, count, slow_count)"""
+    with _lock:
+        items = [(key, dict(entry, histogram=list(entry["histogram"]), routes=dict(entry["routes"])))
+                 for key, entry in _statements.items()]
+    statements = []
+    for key, entry in items:
+        plan = _plans.get(key)
+        entry["statement"] = key
+        entry["avg_ms"] = round(entry["total_ms"] / entry["count"], 3) if entry["count"] else 0.0
+        entry["total_ms"] = round(entry["total_ms"], 3)
+        entry["max_ms"] = round(entry["max_ms"], 3)
+        entry["fetch_ms"] = round(entry["fetch_ms"], 3)
+        entry["histogram"] = dict(zip(HISTOGRAM_LABELS, entry["histogram"]))
+        entry["routes"] = dict(sorted(entry["routes"].items(), key=lambda item: -item[1]))
+        entry["plan"] = plan
+        entry["full_scan"] = is_full_scan(plan) if plan is not None else None
+        statements.append(entry)
+    statements.sort(key=lambda entry: entry.get(sort, 0), reverse=True)
+    return statements[:limit]
+
+
+def slow_queries(limit: int = 50) -> List[Dict]:
+    """최근 느린 쿼리 기록 (최신순)"""
+    with _lock:
+        entries = list(_slow_log)
+    return entries[::-1][:limit]
+
+
+def reset_query_stats():
+    """집계, 느린 쿼리 기록, 실행 계획 캐시 초기화"""
+    with _lock:
+        _statements.clear()
+        _slow_log.clear()
+        _plans.clear()
@@ -0,0 +1,202 @@
+"""
+스키마 마이그레이션 (서버 시작 시 한 번 실행)
+- schema_version 테이블에 적용한 마이그레이션 번호를 기록하고 적용하지 않은 것만 순서대로 실행
+- 컬럼 추가, 조회 인덱스, 검색 인덱스/통계 테이블/변경 카운터 트리거를 여기서 관리
+  → 요청 처리 중에는 PRAGMA table_info / ALTER TABLE / sqlite_master 조회를 하지 않음
+- 필요한 테이블이 아직 없는 마이그레이션은 기록하지 않고 건너뜀 (테이블이 생긴 뒤 다음 시작 때 적용)
+- 마이그레이션마다 BEGIN IMMEDIATE로 쓰기 잠금을 잡고 적용 여부를 다시 확인
+  (여러 워커가 동시에 시작해도 한 번만 적용)
+
+새 마이그레이션은 MIGRATIONS 끝에 다음 번호로 추가합니다. 이미 배포한 항목은 고치지 않습니다.
+"""
+import os
+import sqlite3
+import threading
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from count_cache import ensure_change_counter
+from ingredient_search import ensure_search_index
+from ingredient_stats import ensure_stats_tables
+from keyset_pagination import PAGINATION_INDEXES
+from pattern_retrain_job import ensure_checkpoint_table
+from spec_parse_cache import ensure_table as ensure_parse_cache_table
+from typeahead_index import ensure_change_log
+from unit_price_columns import ensure_unit_price_indexes
+from unit_price_recalculator import ensure_recalc_job_table, ensure_tracking_columns
+
+DATABASE_PATH = os.getenv("DAHAM_DB_PATH", "daham_meal.db")
+
+_ensured_paths = set()
+_ensure_lock = threading.Lock()
+
+
+def _table_columns(cursor, table: str) -> List[str]:
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [row[1] for row in cursor.fetchall()]
+
+
+def _index_prefixes(cursor, table: str) -> List[Tuple[str, ...]]:
+    """테이블의 기존 인덱스 컬럼 목록 (식 인덱스의 식 부분은 None)"""
+    prefixes = []
+    cursor.execute(f"PRAGMA index_list({table})")
+    for index in cursor.fetchall():
+        cursor.execute(f"PRAGMA index_info({index[1]})")
+        prefixes.append(tuple(row[2] for row in cursor.fetchall()))
+    return prefixes
+
+
+def create_indexes(cursor, table: str, indexes: Dict[str, Sequence[str]]) -> List[str]:
+    """
+    조회 인덱스 생성
+
+    컬럼이 없는 인덱스는 건너뛰고, 같은 컬럼으로 시작하는 인덱스가 이미 있으면
+    (SQLAlchemy가 만든 ix_* 인덱스, 복합 인덱스 등) 중복으로 만들지 않습니다.
+
+    Returns:
+        새로 만든 인덱스 이름 목록
+    """
+    columns = set(_table_columns(cursor, table))
+    created = []
+    for name, index_columns in indexes.items():
+        index_columns = tuple(index_columns)
+        if not columns.issuperset(index_columns):
+            continue
+        if any(prefix[:len(index_columns)] == index_columns for prefix in _index_prefixes(cursor, table)):
+            continue
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({', '.join(index_columns)})")
+        created.append(name)
+    return created
+
+
+def _index_migration(table: str, indexes: Dict[str, Sequence[str]]) -> Callable:
+    def migrate(cursor):
+        create_indexes(cursor, table, indexes)
+    return migrate
+
+
+def _pagination_indexes(cursor):
+    """식자재 목록 커서 정렬 인덱스 (keyset_pagination 정렬 기준)"""
+    for name, target in PAGINATION_INDEXES.items():
+        table, columns = target.rstrip(")").split("(", 1)
+        create_indexes(cursor, table, {name: [column.strip() for column in columns.split(",")]})
+
+
+# (번호, 이름, 필요한 테이블, 적용 함수)
+MIGRATIONS: List[Tuple[int, str, Tuple[str, ...], Callable]] = [
+    (1, "식자재 단가/계산 추적 컬럼", ("ingredients",), ensure_tracking_columns),
+    (2, "식자재 목록 정렬 인덱스", ("ingredients",), _pagination_indexes),
+    (3, "저장된 단가 정렬/범위 인덱스", ("ingredients",), ensure_unit_price_indexes),
+    # 업체명/분류는 위의 (supplier_name, ingredient_name), (category, 단가) 인덱스가 있으면 그것을 사용
+    (4, "식자재 조회 인덱스", ("ingredients",), _index_migration("ingredients", {
+        "idx_ingredients_code": ("ingredient_code",),
+        "idx_ingredients_supplier": ("supplier_name",),
+        "idx_ingredients_category": ("category",),
+    })),
+    (5, "식자재 전문 검색 인덱스", ("ingredients",), ensure_search_index),
+    (6, "식자재 변경 카운터", ("ingredients",), ensure_change_counter),
+    (7, "업체별/분류별 식자재 통계 테이블", ("ingredients",), ensure_stats_tables),
+    (8, "사용자 조회 인덱스", ("users",), _index_migration("users", {
+        "idx_users_username": ("username",),
+    })),
+    (9, "협력업체 조회 인덱스", ("suppliers",), _index_migration("suppliers", {
+        "idx_suppliers_name": ("name",),
+        "idx_suppliers_business_number": ("business_number",),
+        "idx_suppliers_supplier_code": ("supplier_code",),
+    })),
+    (10, "메뉴 레시피 조회 인덱스", ("menu_recipes",), _index_migration("menu_recipes", {
+        "idx_menu_recipes_active": ("is_active",),
+    })),
+    (11, "메뉴 레시피 재료 조회 인덱스", ("menu_recipe_ingredients",), _index_migration("menu_recipe_ingredients", {
+        "idx_menu_recipe_ingredients_recipe": ("recipe_id",),
+    })),
+    (12, "급식수 타임라인 조회 인덱스", ("meal_count_timeline",), _index_migration("meal_count_timeline", {
+        "idx_meal_count_timeline_site_date": ("site_id", "date"),
+        "idx_meal_count_timeline_date": ("date",),
+        "idx_meal_count_timeline_site_name_date": ("site_name", "target_date"),
+        "idx_meal_count_timeline_target_date": ("target_date",),
+    })),
+    (13, "사업장 조회 인덱스", ("business_locations",), _index_migration("business_locations", {
+        "idx_business_locations_site_code": ("site_code",),
+    })),
+    (14, "사용자 사업장 권한 조회 인덱스", ("user_site_permissions",), _index_migration("user_site_permissions", {
+        "idx_user_site_permissions_user": ("user_id",),
+    })),
+    (15, "단가 재계산 작업 테이블", (), ensure_recalc_job_table),
+    (16, "규격 파싱 캐시 테이블", (), ensure_parse_cache_table),
+    (17, "자동완성 변경 로그/트리거", ("ingredients",), ensure_change_log),
+    (18, "패턴 재학습 작업 테이블", (), ensure_checkpoint_table),
+]
+
+
+def ensure_version_table(cursor):
+    """schema_version 테이블 확인 및 생성"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def applied_versions(cursor) -> List[int]:
+    """적용한 마이그레이션 번호 목록"""
+    cursor.execute("SELECT version FROM schema_version ORDER BY version")
+    return [row[0] for row in cursor.fetchall()]
+
+
+def run_migrations(db_path: str = DATABASE_PATH) -> List[int]:
+    """
+    적용하지 않은 마이그레이션 실행
+
+    Returns:
+        이번에 적용한 마이그레이션 번호 목록
+    """
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.isolation_level = None  # 트랜잭션은 직접 관리 (BEGIN IMMEDIATE)
+    applied_now = []
+    try:
+        cursor = conn.cursor()
+        ensure_version_table(cursor)
+        for version, name, requires, migrate in MIGRATIONS:
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                cursor.execute("SELECT 1 FROM schema_version WHERE version = ?", (version,))
+                if cursor.fetchone() is not None:
+                    cursor.execute("COMMIT")
+                    continue
+                placeholders = ", ".join("?" * len(requires))
+                cursor.execute(f"SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ({placeholders})",
+                               requires)
+                missing = set(requires) - {row[0] for row in cursor.fetchall()}
+                if missing:
+                    cursor.execute("COMMIT")
+                    print(f"스키마 마이그레이션 {version} 보류 ({name}): {', '.join(sorted(missing))} 테이블 없음")
+                    continue
+                migrate(cursor)
+                cursor.execute("INSERT INTO schema_version (version, name) VALUES (?, ?)", (version, name))
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            applied_now.append(version)
+            print(f"스키마 마이그레이션 {version} 적용: {name}")
+    finally:
+        conn.close()
+    return applied_now
+
+
+def ensure_schema(db_path: str = DATABASE_PATH):
+    """DB 경로별로 한 번만 마이그레이션 실행 (서버 밖 스크립트/작업에서 호출해도 부담 없음)"""
+    if db_path in _ensured_paths:
+        return
+    with _ensure_lock:
+        if db_path in _ensured_paths:
+            return
+        run_migrations(db_path)
+        _ensured_paths.add(db_path)
+
+
+def is_missing_table(error: Exception) -> bool:
+    """테이블이 없어서 난 오류인지 (선택 테이블은 미리 확인하지 않고 조회 실패로 판단)"""
+    return isinstance(error, sqlite3.OperationalError) and str(error).startswith("no such table")
@@ -0,0 +1,271 @@
+"""
+규격 파싱 영속 캐시 (spec_parse_cache 테이블)
+- 키: sha1(정규화된 규격 + 단위) + 파서 버전
+- 값: 구조화된 파싱 결과 (SpecParse, 파싱 불가도 저장)
+- 프로세스 첫 조회 때 현재 버전 항목을 한 번에 읽어 메모리 LRU를 채움
+- 새로 파싱한 결과는 모아서 백그라운드에서 한 트랜잭션으로 저장
+
+uvicorn 워커나 재계산 워커 프로세스가 새로 떠도 다른 프로세스가 이미 파싱한
+규격은 다시 파싱하지 않습니다. 파서 규칙이 바뀌면 spec_parser.PARSER_VERSION만
+올리면 되며, 이전 버전 항목은 조회되지 않습니다.
+"""
+import atexit
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from db_writer import get_writer
+from spec_parser import (
+    PARSE_CACHE_SIZE, PARSER_VERSION, SpecParse, peek_parse_cache, prime_parse_cache, set_parse_store
+)
+
+DATABASE_PATH = os.getenv("DAHAM_DB_PATH", "daham_meal.db")
+
+# 새 파싱 결과 쓰기 버퍼: 누적 건수 또는 경과 시간 중 먼저 도달하는 조건에서 저장
+FLUSH_BATCH_SIZE = 500
+FLUSH_INTERVAL_SECONDS = 5.0
+
+# SQLite 바인드 변수 제한(999) 이하로 나눠 조회
+KEY_QUERY_CHUNK = 900
+
+Key = Tuple[str, str]
+
+_RESULT_COLUMNS = "key_hash, parsed, quantity, parsed_unit, total, measure, rule, confidence"
+
+
+def key_hash(key: Key) -> str:
+    """정규화된 (규격, 단위) 키의 해시"""
+    spec_text, unit_text = key
+    return hashlib.sha1(f"{spec_text}\x1f{unit_text}".encode('utf-8')).hexdigest()
+
+
+def ensure_table(cursor):
+    """spec_parse_cache 테이블 생성 (서버 시작 시 schema_migrations가 호출)"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS spec_parse_cache (
+            key_hash TEXT NOT NULL,
+            parser_version INTEGER NOT NULL,
+            specification TEXT,
+            unit TEXT,
+            parsed INTEGER NOT NULL,
+            quantity REAL,
+            parsed_unit TEXT,
+            total REAL,
+            measure TEXT,
+            rule TEXT,
+            confidence REAL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (key_hash, parser_version)
+        )
+    """)
+
+
+def _row_to_result(row) -> Optional[SpecParse]:
+    _hash, parsed, quantity, unit, total, measure, rule, confidence = row
+    if not parsed:
+        return None
+    return SpecParse(quantity, unit, total, measure, rule, confidence)
+
+
+def _insert_rows(cursor, rows: list):
+    """파싱 결과 저장 (쓰기 스레드에서 실행)"""
+    cursor.executemany("""
+        INSERT OR IGNORE INTO spec_parse_cache
+        (key_hash, parser_version, specification, unit,
+         parsed, quantity, parsed_unit, total, measure, rule, confidence)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+
+
+class SpecParseStore:
+    """spec_parser에 연결되는 영속 캐시 저장소"""
+
+    def __init__(self, db_path: str = DATABASE_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._pending: Dict[Key, Optional[SpecParse]] = {}
+        self._flush_timer = None
+        self._warmed = False
+        # 현재 버전 항목을 모두 메모리에 읽었으면 메모리에 없는 키는 조회하지 않음
+        self._complete = False
+        # 스레드별 조회 연결 (캐시 미스마다 새로 연결하면 파싱보다 비쌈)
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.db_path)
+        return conn
+
+    def _query(self, sql: str, params) -> list:
+        try:
+            return self._connection().execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            # 조회 실패는 캐시 미스로 처리 (파싱해서 계산)
+            print(f"규격 파싱 캐시 조회 실패: {e}")
+            return []
+
+    def warm(self):
+        """현재 파서 버전 항목을 최근 것부터 메모리 LRU 크기만큼 한 번에 로드"""
+        rows = self._query(f"""
+            SELECT specification, unit, {_RESULT_COLUMNS}
+            FROM spec_parse_cache
+            WHERE parser_version = ?
+            ORDER BY created_at DESC
+            LIMIT ?
+        """, (PARSER_VERSION, PARSE_CACHE_SIZE + 1))
+
+        self._complete = len(rows) <= PARSE_CACHE_SIZE
+        prime_parse_cache(((row[0], row[1]), _row_to_result(row[2:])) for row in reversed(rows[:PARSE_CACHE_SIZE]))
+        self._warmed = True
+
+    def load(self, key: Key) -> Tuple[bool, Optional[SpecParse]]:
+        """키 하나 조회 (첫 호출 때 전체 로드)"""
+        if not self._warmed:
+            self.warm()
+            hit, result = peek_parse_cache(key)
+            if hit:
+                return True, result
+
+        with self._lock:
+            if key in self._pending:
+                return True, self._pending[key]
+
+        if self._complete:
+            return False, None
+
+        rows = self._query(f"""
+            SELECT {_RESULT_COLUMNS} FROM spec_parse_cache
+            WHERE parser_version = ? AND key_hash = ?
+        """, (PARSER_VERSION, key_hash(key)))
+        if rows:
+            return True, _row_to_result(rows[0])
+        return False, None
+
+    def load_many(self, keys: Iterable[Key]) -> Dict[Key, Optional[SpecParse]]:
+        """키 목록 일괄 조회 (900개 단위 쿼리)"""
+        by_hash = {key_hash(key): key for key in keys}
+        hashes = list(by_hash)
+        found = {}
+
+        for i in range(0, len(hashes), KEY_QUERY_CHUNK):
+            chunk = hashes[i:i + KEY_QUERY_CHUNK]
+            rows = self._query(f"""
+                SELECT {_RESULT_COLUMNS} FROM spec_parse_cache
+                WHERE parser_version = ? AND key_hash IN ({", ".join("?" * len(chunk))})
+            """, [PARSER_VERSION, *chunk])
+            for row in rows:
+                found[by_hash[row[0]]] = _row_to_result(row)
+
+        return found
+
+    def _schedule_flush(self):
+        """버퍼 크기/시간 조건에 따라 백그라운드 플러시 예약 (락 안에서 호출)
+
+        호출한 쪽이 쓰기 트랜잭션을 연 상태일 수 있으므로 그 자리에서 저장하지 않습니다.
+        """
+        delay = 0 if len(self._pending) >= FLUSH_BATCH_SIZE else FLUSH_INTERVAL_SECONDS
+        if self._flush_timer is not None:
+            if delay or not self._flush_timer.interval:
+                return
+            self._flush_timer.cancel()
+        self._flush_timer = threading.Timer(delay, self.flush)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+
+    def save(self, key: Key, result: Optional[SpecParse]):
+        """새 파싱 결과를 버퍼에 추가"""
+        with self._lock:
+            self._pending[key] = result
+            self._schedule_flush()
+
+    def save_many(self, entries: Iterable[Tuple[Key, Optional[SpecParse]]]):
+        """다른 프로세스에서 파싱한 결과를 버퍼에 추가"""
+        for key, result in entries:
+            self.save(key, result)
+
+    def flush(self):
+        """버퍼의 파싱 결과를 한 트랜잭션으로 저장"""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        rows = []
+        for key, result in pending.items():
+            if result is None:
+                values = (0, None, None, None, None, None, None)
+            else:
+                values = (1, result.quantity, result.unit, result.total,
+                          result.measure, result.rule, result.confidence)
+            rows.append((key_hash(key), PARSER_VERSION, key[0], key[1], *values))
+
+        try:
+            get_writer(self.db_path).write(_insert_rows, rows)
+        except Exception as e:
+            print(f"규격 파싱 캐시 저장 실패: {e}")
+            # 실패한 내용은 버퍼로 되돌려 다음 플러시에서 재시도
+            with self._lock:
+                for key, result in pending.items():
+                    self._pending.setdefault(key, result)
+
+
+class ParseCollector:
+    """
+    DB 없이 새 파싱 결과만 모으는 저장소 (재계산 워커 프로세스용)
+
+    워커는 부모가 넘겨준 캐시 항목으로 메모리 캐시를 채우고, 새로 파싱한 결과는
+    take_pending()으로 부모에게 돌려줘 부모의 단일 연결이 저장합니다.
+    """
+
+    def __init__(self):
+        self._pending: Dict[Key, Optional[SpecParse]] = {}
+
+    def load(self, key: Key) -> Tuple[bool, Optional[SpecParse]]:
+        return False, None
+
+    def load_many(self, keys: Iterable[Key]) -> Dict[Key, Optional[SpecParse]]:
+        return {}
+
+    def save(self, key: Key, result: Optional[SpecParse]):
+        self._pending[key] = result
+
+    def take_pending(self) -> list:
+        """모은 파싱 결과를 꺼내 비움 - [(키, 결과), ...]"""
+        pending, self._pending = self._pending, {}
+        return list(pending.items())
+
+
+_store: Optional[SpecParseStore] = None
+_install_lock = threading.Lock()
+
+
+def install_parse_store(db_path: str = DATABASE_PATH) -> SpecParseStore:
+    """
+    이 프로세스의 spec_parser에 영속 캐시 연결
+
+    같은 DB로 이미 연결되어 있으면 기존 저장소를 그대로 사용합니다.
+    """
+    global _store
+    with _install_lock:
+        if _store is not None and _store.db_path == db_path:
+            return _store
+        if _store is not None:
+            _store.flush()
+        _store = SpecParseStore(db_path)
+        set_parse_store(_store)
+        return _store
+
+
+def flush_parse_store():
+    """새로 파싱한 결과를 즉시 저장"""
+    if _store is not None:
+        _store.flush()
+
+
+atexit.register(flush_parse_store)
@@ -0,0 +1,511 @@
+"""
+규격(specification) 파싱 엔진
+- 정규식 사전 컴파일 (호출마다 재생성하지 않음)
+- 규칙 테이블 기반 단일 디스패치
+- (규격, 단위) 정규화 키 기반 LRU 캐시
+- 영속 캐시(spec_parse_cache 테이블) 연결 시 캐시 미스는 테이블에서 먼저 조회
+
+단위당 단가(price_per_unit)와 g당 단가(price_per_gram) 모두 이 모듈의 파싱 결과를
+사용합니다. 규칙 순서가 곧 우선순위이므로 순서를 바꾸지 마세요.
+"""
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+
+# 84,000여 개 식자재의 고유 규격 문자열은 수천 개 수준
+PARSE_CACHE_SIZE = 16384
+
+# 규칙/결과가 바뀌면 올려야 저장된 단위당 단가가 재계산 대상이 됩니다
+PARSER_VERSION = 1
+
+ParseResult = Tuple[float, str, float]
+
+# 파싱된 단위 -> 측정 기준 (g / ml / 개수)
+_WEIGHT_UNITS = ('kg', 'g', 'mg')
+_VOLUME_UNITS = ('l', 'ml', 'ℓ', '㎖')
+
+# ± 오차 범위 제거 (예: "34±1g" -> "34g")
+_TOLERANCE_RE = re.compile(r'(\d+)±\d+')
+_DIGIT_RE = re.compile(r'\d')
+
+
+class SpecRule:
+    """규격 파싱 규칙 (컴파일된 정규식 + 결과 변환 함수)"""
+
+    __slots__ = ('name', 'regex', 'handler', 'requires', 'needs_digit', 'confidence')
+
+    def __init__(self, name: str, pattern: str, handler: Callable, requires: Tuple[str, ...] = (),
+                 confidence: float = 0.9):
+        self.name = name
+        self.regex = re.compile(pattern, re.IGNORECASE)
+        self.handler = handler
+        # 규격에 반드시 포함되어야 하는 문자 (없으면 정규식 실행 생략)
+        self.requires = requires
+        self.needs_digit = r'\d' in pattern
+        # 규칙이 판매 단위 전체량을 맞게 잡을 가능성 (범용 규칙일수록 낮음)
+        self.confidence = confidence
+
+
+class SpecParse(NamedTuple):
+    """규격 파싱 결과"""
+    quantity: float     # 포장/묶음 수
+    unit: str           # 매칭된 단위 (예: 'kg', 'g_pieces', 'pieces')
+    total: float        # 전체량 (g / ml / 개수)
+    measure: str        # 전체량 기준: 'g' | 'ml' | 'pieces'
+    rule: str           # 매칭된 규칙 이름
+    confidence: float   # 규칙 신뢰도
+
+    @property
+    def grams(self) -> Optional[float]:
+        """전체 중량(g) - 중량 규격이 아니면 None"""
+        return self.total if self.measure == 'g' else None
+
+    @property
+    def milliliters(self) -> Optional[float]:
+        """전체 부피(ml) - 부피 규격이 아니면 None"""
+        return self.total if self.measure == 'ml' else None
+
+    @property
+    def pieces(self) -> Optional[float]:
+        """전체 개수 - 개수 규격이 아니면 None"""
+        return self.total if self.measure == 'pieces' else None
+
+    def as_tuple(self) -> ParseResult:
+        """기존 (수량, 단위, 전체값) 형식"""
+        return self.quantity, self.unit, self.total
+
+
+def _measure(unit: str) -> str:
+    """파싱된 단위의 측정 기준"""
+    base = unit[:-len('_pieces')] if unit.endswith('_pieces') else unit
+    if base in _WEIGHT_UNITS:
+        return 'g'
+    if base in _VOLUME_UNITS:
+        return 'ml'
+    return 'pieces'
+
+
+# ==============================================================================
+# 결과 변환 함수
+# ==============================================================================
+
+def _total_weight(value_group: int, unit_group: int):
+    """전체 무게가 명시된 패턴 - kg는 g로 변환"""
+    def handler(match):
+        value = float(match.group(value_group))
+        unit = match.group(unit_group).lower()
+        total = value * 1000 if unit == 'kg' else value
+        return 1, 'g', total
+    # 벡터화 파서(spec_parser_vectorized)에서 같은 그룹을 사용
+    handler.groups = (value_group, unit_group)
+    return handler
+
+
+def _weight_times_count(match):
+    """무게 × 개수 패턴 (예: "200G*10입") - g로 변환"""
+    value = float(match.group(1))
+    unit = match.group(2).lower()
+    count = float(match.group(3))
+    total = value * 1000 * count if unit == 'kg' else value * count
+    return 1, 'g', total
+
+
+def _pieces_ea_box(match):
+    """"50입*4EA/BOX" 형태 - 개수 × EA수"""
+    total = float(match.group(1)) * float(match.group(2))
+    return total, 'pieces', total
+
+
+def _piece_count(match):
+    """"10입", "500매입" 형태 - 입 앞의 숫자가 총 개수"""
+    return 1, 'pieces', float(match.group(1))
+
+
+def _single_piece(match):
+    """"입" 단독 - 1개로 간주"""
+    return 1, 'pieces', 1
+
+
+def _weight_multiple(match):
+    """"120g_3입" 형태 - 무게 × 수량"""
+    value = float(match.group(1))
+    unit = match.group(2).lower()
+    count = float(match.group(3))
+
+    if unit == 'kg':
+        total = value * 1000 * count
+    elif unit == 'mg':
+        total = (value / 1000) * count
+    else:
+        total = value * count
+
+    return count, f"{unit}_pieces", total
+
+
+def _weight_per_ea(match):
+    """"21KG/EA" 형태"""
+    return 1, 'kg', float(match.group(1)) * 1000
+
+
+def _volume_multiple(match):
+    """"700ml_50입" 형태 - 부피 × 수량"""
+    value = float(match.group(1))
+    unit = match.group(2).lower()
+    count = float(match.group(3))
+    total = value * 1000 * count if unit == 'l' else value * count
+    return count, f"{unit}_pieces", total
+
+
+def _measure_times_quantity(match):
+    """"1kg*10ea", "18L*1ea" 형태 - g/ml로 변환"""
+    value = float(match.group(1))
+    unit = match.group(2).lower()
+    quantity = float(match.group(3))
+
+    if unit in ('kg', 'l'):
+        total = value * 1000 * quantity
+    elif unit == 'mg':
+        total = (value / 1000) * quantity
+    else:
+        total = value * quantity
+
+    return quantity, unit, total
+
+
+def _measure_only(match):
+    """"1kg", "300ML" 형태 - g/ml로 변환"""
+    value = float(match.group(1))
+    unit = match.group(2).lower()
+
+    if unit in ('kg', 'l', 'ℓ'):
+        total = value * 1000
+    elif unit == 'mg':
+        total = value / 1000
+    else:
+        total = value
+
+    return 1, unit, total
+
+
+# ==============================================================================
+# 규칙 테이블 (순서 = 우선순위)
+# ==============================================================================
+
+SPEC_RULES = [
+    # 특수 패턴
+    # "2KG(200G*10EA)/BOX" -> 2000g (전체 무게 우선)
+    SpecRule('total_with_detail',
+             r'(\d+(?:\.\d+)?)\s*(KG|kg)\s*\((\d+)\s*(G|g)\s*[*×xX]\s*(\d+)\s*(EA|ea|입)?\)',
+             _total_weight(1, 2), ('(',)),
+    # "1.5KG(150G*10EA)/PAC" -> 1500g (전체 무게 우선)
+    SpecRule('total_weight_priority',
+             r'(\d+(?:\.\d+)?)\s*(KG|kg)\s*\(.*?\)',
+             _total_weight(1, 2), ('(',)),
+    # "(왕돈까스_300g*5입 1.5Kg/EA)" -> 1500g (전체 무게 사용)
+    SpecRule('parenthesis_with_total',
+             r'\([^)]*?(\d+)\s*(g|kg)\s*[*×xX]\s*(\d+)\s*입\s+(\d+(?:\.\d+)?)\s*(Kg|kg|g)\s*/\s*EA\)',
+             _total_weight(4, 5), ('(', '입')),
+    # "(71입 1Kg/EA)" -> 1000g (전체 무게 사용)
+    SpecRule('pieces_with_total_ea',
+             r'\((\d+)\s*입\s+(\d+(?:\.\d+)?)\s*(Kg|kg|g)\s*/\s*EA\)',
+             _total_weight(2, 3), ('(', '입')),
+    # "300G*5입/EA" -> 1500g
+    SpecRule('weight_pieces_ea',
+             r'(\d+)\s*(G|g|KG|kg)\s*[*×xX]\s*(\d+)\s*입\s*/\s*EA',
+             _weight_times_count, ('입',)),
+    # "130G*18입/2.34KG" -> 2340g (전체 무게 사용)
+    SpecRule('weight_pieces_total',
+             r'(\d+)\s*(G|g)\s*[*×xX]\s*(\d+)\s*입\s*/\s*(\d+(?:\.\d+)?)\s*(KG|kg)',
+             _total_weight(4, 5), ('입',)),
+    # "2KG*5입/BOX" -> 10000g, "2KG*1입/BOX" -> 2000g
+    SpecRule('weight_pieces_box',
+             r'(\d+(?:\.\d+)?)\s*(KG|kg)\s*[*×xX]\s*(\d+)\s*입\s*/\s*BOX',
+             _weight_times_count, ('입',)),
+    # "200G*10입" -> 2000g
+    SpecRule('simple_weight_pieces',
+             r'(\d+)\s*(G|g|KG|kg)\s*[*×xX]\s*(\d+)\s*입(?![/])',
+             _weight_times_count, ('입',)),
+    # "50입*4EA/BOX" -> 200개
+    SpecRule('pieces_ea_box',
+             r'(\d+)\s*입\s*[*×xX]\s*(\d+)\s*EA\s*/\s*BOX',
+             _pieces_ea_box, ('입',)),
+    # "10입" 같은 단순 입 패턴
+    SpecRule('simple_pieces', r'^(\d+)\s*입\s*$', _piece_count, ('입',)),
+    # "입" 단독 -> 1개
+    SpecRule('single_piece', r'^입\s*$', _single_piece, ('입',), confidence=0.5),
+    # "800G(80G*10입)" -> 800g
+    SpecRule('total_weight_with_detail',
+             r'(\d+(?:\.\d+)?)\s*(G|g|KG|kg)\s*\([^)]*\)',
+             _total_weight(1, 2), ('(',)),
+    # "(130g*10입 저장용 1.3Kg/EA)" -> 1300g
+    SpecRule('detail_with_total',
+             r'\((\d+(?:\.\d+)?)\s*(g|kg)\s*[*×xX]\s*(\d+)\s*입.*?(\d+(?:\.\d+)?)\s*(Kg|kg|g)\s*/\s*EA\)',
+             _total_weight(4, 5), ('(', '입')),
+    # "(100g*10입 1Kg/EA)" -> 1000g
+    SpecRule('detail_with_total_simple',
+             r'\((\d+(?:\.\d+)?)\s*(g|kg)\s*[*×xX]\s*(\d+)\s*입\s+(\d+(?:\.\d+)?)\s*(Kg|kg|g)\s*/\s*EA\)',
+             _total_weight(4, 5), ('(', '입')),
+    # "(80g*10입 800g/EA)" -> 800g
+    SpecRule('detail_with_total_simple',
+             r'\((\d+(?:\.\d+)?)\s*(g|kg)\s*[*×xX]\s*(\d+)\s*입\s+(\d+(?:\.\d+)?)\s*(g|kg)\s*/\s*EA\)',
+             _total_weight(4, 5), ('(', '입')),
+    # "120g_3입" -> 360g
+    SpecRule('weight_multiple',
+             r'(\d+(?:\.\d+)?)\s*(g|kg|mg)\s*[_\-]\s*(\d+)\s*입',
+             _weight_multiple, ('입',)),
+    # "500매입" -> 500개
+    SpecRule('pieces', r'(\d+)\s*매입', _piece_count, ('매입',)),
+    # "300입" -> 300개 (다른 패턴에 매칭되지 않은 경우)
+    SpecRule('pieces', r'(\d+)\s*입', _piece_count, ('입',), confidence=0.7),
+    # "21KG/EA" -> 21kg
+    SpecRule('weight_per_ea',
+             r'(\d+(?:\.\d+)?)\s*(KG|kg|Kg)\s*/\s*EA',
+             _weight_per_ea, ('/',)),
+    # "700ml_50입" -> 35000ml
+    SpecRule('volume_multiple',
+             r'(\d+(?:\.\d+)?)\s*(ml|ML|l|L)\s*[_\-]\s*(\d+)\s*입',
+             _volume_multiple, ('입',)),
+
+    # 일반 패턴
+    # "1kg*10ea"
+    SpecRule('weight_qty',
+             r'(\d+(?:\.\d+)?)\s*(kg|g|mg|KG|G|MG)\s*[*×xX]\s*(\d+)\s*(ea|pac|개|포|봉|박스|box)?',
+             _measure_times_quantity, confidence=0.8),
+    # "18L*1ea"
+    SpecRule('volume_qty',
+             r'(\d+(?:\.\d+)?)\s*(L|l|ml|ML|ℓ|㎖)\s*[*×xX]\s*(\d+)\s*(ea|pac|개|포|봉|박스|box)?',
+             _measure_times_quantity, confidence=0.8),
+    # "1kg"
+    SpecRule('weight_only', r'(\d+(?:\.\d+)?)\s*(kg|g|mg|KG|G|MG)\b', _measure_only, confidence=0.8),
+    # "1L", "300ML", "415ml"
+    SpecRule('volume_only', r'(\d+(?:\.\d+)?)\s*(L|l|ml|ML|ℓ|㎖|Ml|mL)\b', _measure_only, confidence=0.8),
+    # 전체 문자열이 숫자+ML인 경우
+    SpecRule('volume_simple', r'^(\d+(?:\.\d+)?)\s*(ML|ml|Ml|mL)$', _measure_only, confidence=0.8),
+]
+
+
+# ==============================================================================
+# 파싱
+# ==============================================================================
+
+def normalize_key(spec_text: str, unit_text: str = None) -> Tuple[str, str]:
+    """캐시 키 정규화 - 앞뒤 공백 제거, 단위는 대문자"""
+    return spec_text.strip(), (unit_text or '').strip().upper()
+
+
+def match_rule(spec_text: str) -> Tuple[Optional[SpecRule], Optional[re.Match]]:
+    """
+    정리된 규격에 처음으로 매칭되는 규칙 탐색
+
+    Returns:
+        (규칙, 매치 객체) 또는 (None, None)
+    """
+    has_digit = _DIGIT_RE.search(spec_text) is not None
+
+    for rule in SPEC_RULES:
+        if rule.needs_digit and not has_digit:
+            continue
+        if rule.requires and not all(token in spec_text for token in rule.requires):
+            continue
+        match = rule.regex.search(spec_text)
+        if match:
+            return rule, match
+
+    return None, None
+
+
+def _clean_spec(spec_text: str) -> str:
+    """± 오차 범위 제거"""
+    if '±' in spec_text:
+        return _TOLERANCE_RE.sub(r'\1', spec_text)
+    return spec_text
+
+
+def _compute_parse(spec_text: str, unit_text: str) -> Optional[SpecParse]:
+    """정규화된 키로 실제 파싱 (캐시 없음)"""
+    rule, match = match_rule(_clean_spec(spec_text))
+    if rule is None:
+        # EA 단위이지만 규격에서 수량/무게 정보를 찾을 수 없는 경우도 계산 불가
+        return None
+    quantity, unit, total = rule.handler(match)
+    return SpecParse(quantity, unit, total, _measure(unit), rule.name, rule.confidence)
+
+
+# ==============================================================================
+# 캐시
+# ==============================================================================
+
+class ParseCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class _ParseCache:
+    """프로세스별 LRU 캐시 (영속 캐시에서 읽은 결과를 미리 채울 수 있음)"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str]) -> Tuple[bool, Optional[SpecParse]]:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return True, self._data[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key: Tuple[str, str], result: Optional[SpecParse]):
+        with self._lock:
+            self._data[key] = result
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def peek(self, key: Tuple[str, str]) -> Tuple[bool, Optional[SpecParse]]:
+        """통계/순서 변경 없이 조회"""
+        with self._lock:
+            if key in self._data:
+                return True, self._data[key]
+            return False, None
+
+    def info(self) -> ParseCacheInfo:
+        with self._lock:
+            return ParseCacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_cache = _ParseCache(PARSE_CACHE_SIZE)
+
+# 영속 캐시 저장소 (spec_parse_cache.SpecParseStore) - 없으면 프로세스 메모리 캐시만 사용
+_store = None
+
+
+def set_parse_store(store):
+    """
+    영속 캐시 저장소 연결 (None이면 해제)
+
+    저장소는 load(key) -> (찾음 여부, 결과), load_many(keys) -> {key: 결과},
+    save(key, 결과)를 제공해야 합니다. key는 normalize_key() 결과입니다.
+    """
+    global _store
+    _store = store
+
+
+def prime_parse_cache(entries: Iterable[Tuple[Tuple[str, str], Optional[SpecParse]]]):
+    """영속 캐시에서 읽은 (정규화 키, 결과)로 메모리 캐시 채우기"""
+    for key, result in entries:
+        _cache.put(key, result)
+
+
+def peek_parse_cache(key: Tuple[str, str]) -> Tuple[bool, Optional[SpecParse]]:
+    """메모리 캐시 조회 (적중 통계에 포함하지 않음)"""
+    return _cache.peek(key)
+
+
+def _parse_normalized(spec_text: str, unit_text: str) -> Optional[SpecParse]:
+    """정규화된 키로 파싱 (LRU -> 영속 캐시 -> 파싱 순)"""
+    key = (spec_text, unit_text)
+    hit, result = _cache.get(key)
+    if hit:
+        return result
+
+    store = _store
+    if store is None:
+        result = _compute_parse(spec_text, unit_text)
+    else:
+        found, result = store.load(key)
+        if not found:
+            result = _compute_parse(spec_text, unit_text)
+            store.save(key, result)
+
+    _cache.put(key, result)
+    return result
+
+
+def lookup_parses(pairs: Iterable[Tuple[str, str]]) -> Dict[int, Optional[SpecParse]]:
+    """
+    (규격, 단위) 목록 중 이미 파싱된 결과 일괄 조회 (배치 처리 전 호출)
+
+    메모리 캐시에 없는 키는 영속 캐시에서 한 번에 읽어 메모리 캐시에 채웁니다.
+    파싱은 하지 않습니다.
+
+    Returns:
+        {입력 위치: 결과} - 메모리/영속 캐시에 있는 항목만
+    """
+    keys = {}
+    for index, (spec_text, unit_text) in enumerate(pairs):
+        if spec_text:
+            keys[index] = normalize_key(spec_text, unit_text)
+
+    found = {}
+    missing = []
+    for index, key in keys.items():
+        hit, result = _cache.peek(key)
+        if hit:
+            found[index] = result
+        else:
+            missing.append(index)
+
+    store = _store
+    if store is not None and missing:
+        stored = store.load_many({keys[index] for index in missing})
+        prime_parse_cache(stored.items())
+        for index in missing:
+            if keys[index] in stored:
+                found[index] = stored[keys[index]]
+
+    return found
+
+
+def parse(spec_text: str, unit_text: str = None) -> Optional[SpecParse]:
+    """
+    규격 파싱 (구조화된 결과)
+
+    Args:
+        spec_text: 규격 텍스트 (예: "120g_3입", "500매입", "21KG/EA")
+        unit_text: 단위 텍스트 (예: "EA", "BOX", "PAC")
+
+    Returns:
+        SpecParse 또는 None
+    """
+    if not spec_text:
+        return None
+    return _parse_normalized(*normalize_key(spec_text, unit_text))
+
+
+def parse_specification(spec_text: str, unit_text: str = None) -> Optional[ParseResult]:
+    """
+    규격 파싱
+
+    Args:
+        spec_text: 규격 텍스트 (예: "120g_3입", "500매입", "21KG/EA")
+        unit_text: 단위 텍스트 (예: "EA", "BOX", "PAC")
+
+    Returns:
+        (수량, 단위, 전체값) 또는 None
+    """
+    result = parse(spec_text, unit_text)
+    return result.as_tuple() if result else None
+
+
+def parse_cache_info() -> ParseCacheInfo:
+    """LRU 캐시 통계 (hits, misses, maxsize, currsize)"""
+    return _cache.info()
+
+
+def clear_parse_cache():
+    """LRU 캐시 초기화 (영속 캐시는 유지)"""
+    _cache.clear()
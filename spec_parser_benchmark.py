@@ -0,0 +1,362 @@
+"""
+규격 파싱 벤치마크 / 정확도 측정
+- 정답 코퍼스: improved_unit_price_calculator.TEST_CASES(수작업 정답) + 공급업체 단가표 규격 기준값
+- 속도: 초당 파싱 수, 규격별 지연시간 p50/p99, 캐시 적중률, 열 단위 파싱 속도
+- 정확도: 매칭된 규칙별 정답률
+- 결과는 JSON 리포트로 저장 (파서 변경 전후 비교용)
+
+사용법:
+    python spec_parser_benchmark.py --build-corpus   # 단가표에서 코퍼스 생성 (기준값 = 현재 파서 결과)
+    python spec_parser_benchmark.py                  # 벤치마크 실행, 리포트 저장
+    python spec_parser_benchmark.py --fail-under 0.95
+
+단가표 규격의 기준값은 코퍼스를 만들 당시의 파서 결과입니다. 파서를 고친 뒤
+기준값이 달라진 항목은 리포트의 failures에서 확인하고, 맞게 고친 것이면
+--build-corpus로 다시 만드세요. TEST_CASES 항목은 아래 EXAMPLE_EXPECTED가 정답입니다.
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import statistics
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from spec_parser import PARSER_VERSION, clear_parse_cache, parse, parse_cache_info
+from spec_parser_vectorized import parse_totals
+from improved_unit_price_calculator import TEST_CASES
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+UPLOAD_DIR = os.path.join(BASE_DIR, "sample data", "upload")
+CORPUS_PATH = os.path.join(BASE_DIR, "spec_parser_corpus.json")
+REPORT_PATH = "spec_parser_benchmark_report.json"
+
+# 규칙별로 코퍼스에 넣는 최대 규격 수 (형태가 다른 규격 우선)
+CORPUS_PER_RULE = 200
+
+# 리포트에 남기는 오답 수
+MAX_FAILURES = 100
+
+# TEST_CASES 정답 - 단가 계산의 기준량 (전체량, 기준)
+# 단위가 KG이면 규격과 무관하게 1000g 기준
+EXAMPLE_EXPECTED = {
+    "120g_3입": (360, 'g'),
+    "500매입": (500, 'pieces'),
+    "검정_대_190*85mm_300입": (300, 'pieces'),
+    "백색_190mm_300입": (300, 'pieces'),
+    "PP_158파이*60mm_700ml_50입": (50, 'pieces'),
+    "21KG/EA": (21000, 'g'),
+    "9.5KG/EA": (9500, 'g'),
+    "300ML": (300, 'ml'),
+    "415ml": (415, 'ml'),
+    "500ML": (500, 'ml'),
+    "냉동/100g내외": (1000, 'g'),
+    "냉동/80g내외": (1000, 'g'),
+    "80g내외": (1000, 'g'),
+    "180G내외": (1000, 'g'),
+    "(1±0.2cm두께 돈까스용 KG)": (1000, 'g'),
+    "냉동/80g내외/500g포장": (500, 'g'),
+    "(34±1g*29±1입 1Kg/EA)": (1000, 'g'),
+    "2KG*1입/BOX": (2000, 'g'),
+    "(71±3입 1Kg/EA)": (1000, 'g'),
+    "200G*10입": (2000, 'g'),
+    "(리뉴얼_200g*10입 2Kg/EA)": (2000, 'g'),
+    "130G*18입/2.34KG": (2340, 'g'),
+    "2KG*5입/BOX": (10000, 'g'),
+    "50입*4EA/BOX": (200, 'pieces'),
+    "300G*5입/EA": (1500, 'g'),
+    "(왕돈까스_300g*5입 1.5Kg/EA)": (1500, 'g'),
+    "(산양유가함유된_100g*10입 1Kg/EA)": (1000, 'g'),
+    "10입": (10, 'pieces'),
+    "입": (1, 'pieces'),
+}
+
+UNPARSED = 'unparsed'
+UNIT_KG = 'unit_kg'
+
+
+# ==============================================================================
+# 코퍼스
+# ==============================================================================
+
+def load_sheet_specs(upload_dir: str = UPLOAD_DIR) -> List[Tuple[str, str]]:
+    """
+    공급업체 단가표의 규격/단위 열 추출 (시트 상단에서 '규격' 헤더 행 탐색)
+
+    Returns:
+        [(규격, 단위), ...] - 단가표 행 순서 그대로 (중복 포함)
+    """
+    rows = []
+    for path in sorted(glob.glob(os.path.join(upload_dir, "*.xlsx"))):
+        try:
+            sheets = pd.read_excel(path, sheet_name=None, header=None, dtype=str)
+        except Exception as e:
+            print(f"단가표 읽기 실패: {os.path.basename(path)} - {e}")
+            continue
+
+        for df in sheets.values():
+            for r in range(min(15, len(df))):
+                header = [str(value).strip() for value in df.iloc[r].values]
+                if '규격' not in header:
+                    continue
+                body = df.iloc[r + 1:]
+                specs = body.iloc[:, header.index('규격')]
+                units = body.iloc[:, header.index('단위')] if '단위' in header else pd.Series(None, index=body.index)
+                for spec, unit in zip(specs, units):
+                    if isinstance(spec, str) and spec.strip():
+                        rows.append((spec, unit if isinstance(unit, str) else ''))
+                break
+    return rows
+
+
+def price_basis(spec: str, unit: str) -> Tuple[Optional[float], Optional[str], str]:
+    """
+    단가 계산 기준량 (calculate_unit_price_improved와 같은 규칙)
+
+    Returns:
+        (전체량, 기준, 규칙 이름) - 파싱 불가면 (None, None, 'unparsed')
+    """
+    if unit and unit.strip().upper() == 'KG':
+        return 1000.0, 'g', UNIT_KG
+    result = parse(spec, unit)
+    if result is None or result.total <= 0:
+        return None, None, UNPARSED
+    return float(result.total), result.measure, result.rule
+
+
+def _shape(spec: str) -> str:
+    """규격 형태 (숫자/한글 묶음을 한 글자로) - 같은 형식의 규격을 한 번만 넣기 위함"""
+    return re.sub(r'[가-힣]+', '가', re.sub(r'\d+(?:\.\d+)?', '9', spec))
+
+
+def build_corpus(upload_dir: str = UPLOAD_DIR) -> Dict:
+    """TEST_CASES 정답 + 단가표 규격(형태별 대표, 규칙별 상한) 코퍼스 생성"""
+    cases = []
+    for spec, unit, _price, description in TEST_CASES:
+        total, measure = EXAMPLE_EXPECTED[spec]
+        cases.append({
+            "spec": spec, "unit": unit, "source": "examples",
+            "expected_total": float(total), "expected_measure": measure, "note": description
+        })
+
+    seen_shapes = set()
+    per_rule = defaultdict(int)
+    for spec, unit in load_sheet_specs(upload_dir):
+        shape = (_shape(spec.strip()), unit.strip().upper())
+        if shape in seen_shapes:
+            continue
+        seen_shapes.add(shape)
+
+        total, measure, rule = price_basis(spec, unit)
+        if per_rule[rule] >= CORPUS_PER_RULE:
+            continue
+        per_rule[rule] += 1
+        cases.append({
+            "spec": spec, "unit": unit, "source": "sheets",
+            "expected_total": total, "expected_measure": measure
+        })
+
+    return {
+        "parser_version": PARSER_VERSION,
+        "generated_at": datetime.now().isoformat(),
+        "cases": cases
+    }
+
+
+def save_corpus(corpus: Dict, path: str = CORPUS_PATH):
+    """코퍼스 저장 (항목당 한 줄 - 기준값 변경을 diff로 확인)"""
+    cases = corpus["cases"]
+    header = {key: value for key, value in corpus.items() if key != "cases"}
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(header, ensure_ascii=False)[:-1] + ', "cases": [\n')
+        f.write(",\n".join(json.dumps(case, ensure_ascii=False) for case in cases))
+        f.write("\n]}\n")
+
+
+def load_corpus(path: str = CORPUS_PATH) -> Dict:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+# ==============================================================================
+# 측정
+# ==============================================================================
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure_speed(rows: List[Tuple[str, str]]) -> Dict:
+    """
+    파싱 속도 측정
+
+    - cold: 캐시를 비우고 고유 규격마다 한 번씩 파싱 (규격별 지연시간)
+    - stream: 캐시를 비우고 단가표 행 순서대로 전체 파싱 (실제 업로드/재계산과 같은 중복 분포)
+    - vectorized: 규격 열 전체를 spec_parser_vectorized로 파싱
+    """
+    unique_rows = list(dict.fromkeys(rows))
+
+    clear_parse_cache()
+    latencies = []
+    for spec, unit in unique_rows:
+        start = time.perf_counter()
+        parse(spec, unit)
+        latencies.append((time.perf_counter() - start) * 1_000_000)
+    latencies.sort()
+    cold_seconds = sum(latencies) / 1_000_000
+
+    clear_parse_cache()
+    start = time.perf_counter()
+    for spec, unit in rows:
+        parse(spec, unit)
+    stream_seconds = time.perf_counter() - start
+    info = parse_cache_info()
+    lookups = info.hits + info.misses
+
+    specs = pd.Series([spec for spec, _unit in rows], dtype=object)
+    start = time.perf_counter()
+    parse_totals(specs)
+    vectorized_seconds = time.perf_counter() - start
+
+    return {
+        "rows": len(rows),
+        "unique_specs": len(unique_rows),
+        "cold": {
+            "parses_per_second": round(len(unique_rows) / cold_seconds) if cold_seconds else 0,
+            "latency_us": {
+                "p50": round(_percentile(latencies, 0.50), 2),
+                "p99": round(_percentile(latencies, 0.99), 2),
+                "max": round(latencies[-1], 2) if latencies else 0.0,
+                "mean": round(statistics.fmean(latencies), 2) if latencies else 0.0
+            }
+        },
+        "stream": {
+            "parses_per_second": round(len(rows) / stream_seconds) if stream_seconds else 0,
+            "elapsed_seconds": round(stream_seconds, 4),
+            "cache_hits": info.hits,
+            "cache_misses": info.misses,
+            "cache_hit_ratio": round(info.hits / lookups, 4) if lookups else 0.0
+        },
+        "vectorized": {
+            "rows_per_second": round(len(rows) / vectorized_seconds) if vectorized_seconds else 0,
+            "elapsed_seconds": round(vectorized_seconds, 4)
+        }
+    }
+
+
+def _same_total(actual: Optional[float], expected: Optional[float]) -> bool:
+    if actual is None or expected is None:
+        return actual is None and expected is None
+    return abs(actual - expected) <= 1e-6 * max(1.0, abs(expected))
+
+
+def measure_accuracy(cases: List[Dict]) -> Dict:
+    """
+    코퍼스 정확도 (전체량과 기준이 모두 같아야 정답)
+
+    규칙별 정답률은 실제로 매칭된 규칙 기준이며, 파싱하지 못한 항목은 'unparsed'로 집계합니다.
+    """
+    by_rule = defaultdict(lambda: {"total": 0, "correct": 0})
+    by_source = defaultdict(lambda: {"total": 0, "correct": 0})
+    failures = []
+
+    for case in cases:
+        total, measure, rule = price_basis(case["spec"], case["unit"])
+        correct = _same_total(total, case["expected_total"]) and measure == case["expected_measure"]
+
+        for bucket in (by_rule[rule], by_source[case["source"]]):
+            bucket["total"] += 1
+            bucket["correct"] += int(correct)
+
+        if not correct and len(failures) < MAX_FAILURES:
+            failures.append({
+                "spec": case["spec"], "unit": case["unit"], "source": case["source"], "rule": rule,
+                "expected_total": case["expected_total"], "expected_measure": case["expected_measure"],
+                "actual_total": total, "actual_measure": measure
+            })
+
+    def with_ratio(buckets):
+        return {
+            key: {**value, "accuracy": round(value["correct"] / value["total"], 4)}
+            for key, value in sorted(buckets.items())
+        }
+
+    correct_count = sum(bucket["correct"] for bucket in by_source.values())
+    return {
+        "cases": len(cases),
+        "correct": correct_count,
+        "accuracy": round(correct_count / len(cases), 4) if cases else 0.0,
+        "by_source": with_ratio(by_source),
+        "by_rule": with_ratio(by_rule),
+        "failures": failures
+    }
+
+
+def run_benchmark(corpus_path: str = CORPUS_PATH, upload_dir: str = UPLOAD_DIR) -> Dict:
+    """코퍼스 정확도 + 단가표 규격 열 속도 측정 리포트"""
+    corpus = load_corpus(corpus_path)
+    cases = corpus["cases"]
+
+    rows = load_sheet_specs(upload_dir) if os.path.isdir(upload_dir) else []
+    speed_source = "sheets"
+    if not rows:
+        rows = [(case["spec"], case["unit"]) for case in cases]
+        speed_source = "corpus"
+
+    return {
+        "generated_at": datetime.now().isoformat(),
+        "parser_version": PARSER_VERSION,
+        "corpus_parser_version": corpus.get("parser_version"),
+        "python": sys.version.split()[0],
+        "speed_source": speed_source,
+        "speed": measure_speed(rows),
+        "accuracy": measure_accuracy(cases)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="규격 파싱 벤치마크 / 정확도 측정")
+    parser.add_argument("--build-corpus", action="store_true", help="단가표에서 코퍼스를 다시 생성")
+    parser.add_argument("--corpus", default=CORPUS_PATH, help="코퍼스 경로")
+    parser.add_argument("--upload-dir", default=UPLOAD_DIR, help="공급업체 단가표 폴더")
+    parser.add_argument("--output", default=REPORT_PATH, help="리포트 저장 경로")
+    parser.add_argument("--fail-under", type=float, help="전체 정확도가 이 값보다 낮으면 종료 코드 1")
+    args = parser.parse_args()
+
+    if args.build_corpus:
+        corpus = build_corpus(args.upload_dir)
+        save_corpus(corpus, args.corpus)
+        print(f"코퍼스 생성: {len(corpus['cases']):,}개 -> {args.corpus}")
+        return
+
+    report = run_benchmark(args.corpus, args.upload_dir)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    speed, accuracy = report["speed"], report["accuracy"]
+    print(f"규격 {speed['rows']:,}행 (고유 {speed['unique_specs']:,}개, {report['speed_source']})")
+    print(f"  cold   : {speed['cold']['parses_per_second']:,} 파싱/초 | "
+          f"p50 {speed['cold']['latency_us']['p50']}us | p99 {speed['cold']['latency_us']['p99']}us")
+    print(f"  stream : {speed['stream']['parses_per_second']:,} 파싱/초 | "
+          f"캐시 적중률 {speed['stream']['cache_hit_ratio']:.1%}")
+    print(f"  열 단위: {speed['vectorized']['rows_per_second']:,} 행/초")
+    print(f"정확도: {accuracy['correct']:,}/{accuracy['cases']:,} ({accuracy['accuracy']:.2%})")
+    for rule, stats in accuracy["by_rule"].items():
+        print(f"  {rule:28s} {stats['correct']:>5}/{stats['total']:<5} {stats['accuracy']:.2%}")
+    print(f"리포트 저장: {args.output}")
+
+    if args.fail_under is not None and accuracy["accuracy"] < args.fail_under:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
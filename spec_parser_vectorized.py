@@ -0,0 +1,229 @@
+"""
+규격(specification) 열 단위 파싱
+- spec_parser의 규칙 테이블을 그대로 사용 (같은 정규식, 같은 우선순위)
+- 규칙마다 남은 행 전체에 str.extract 한 번, 무게/부피/개수 환산은 NumPy 연산
+- 벡터 환산이 없는 규칙에 걸린 행만 스칼라 파서로 처리
+- 단위를 함께 넘기면 이미 파싱된 규격(메모리/spec_parse_cache)은 한 번에 읽어 정규식 생략
+
+엑셀 업로드처럼 DataFrame으로 들어오는 공급업체 단가표에 사용하며,
+calculate_unit_price_improved()를 행마다 호출한 것과 같은 결과를 반환합니다.
+"""
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from spec_parser import (
+    SPEC_RULES, SpecRule, _TOLERANCE_RE, lookup_parses, parse_specification,
+    _measure_only, _measure_times_quantity, _piece_count, _pieces_ea_box,
+    _single_piece, _volume_multiple, _weight_multiple, _weight_per_ea, _weight_times_count
+)
+
+
+# ==============================================================================
+# 결과 변환 (spec_parser 변환 함수의 NumPy 버전 - 전체값만 계산)
+# ==============================================================================
+# m: str.extract 결과 (0번 열 = 전체 매치, k번 열 = k번 그룹)
+
+def _number(m: pd.DataFrame, group: int) -> np.ndarray:
+    return m[group].astype(float).to_numpy()
+
+
+def _unit(m: pd.DataFrame, group: int) -> np.ndarray:
+    return m[group].str.lower().to_numpy()
+
+
+def _vec_total_weight(value_group: int, unit_group: int) -> Callable:
+    def vec(m):
+        value = _number(m, value_group)
+        return np.where(_unit(m, unit_group) == 'kg', value * 1000, value)
+    return vec
+
+
+def _vec_weight_times_count(m):
+    value, count = _number(m, 1), _number(m, 3)
+    return np.where(_unit(m, 2) == 'kg', value * 1000 * count, value * count)
+
+
+def _vec_pieces_ea_box(m):
+    return _number(m, 1) * _number(m, 2)
+
+
+def _vec_piece_count(m):
+    return _number(m, 1)
+
+
+def _vec_single_piece(m):
+    return np.ones(len(m))
+
+
+def _vec_weight_multiple(m):
+    value, unit, count = _number(m, 1), _unit(m, 2), _number(m, 3)
+    return np.select([unit == 'kg', unit == 'mg'],
+                     [value * 1000 * count, (value / 1000) * count],
+                     value * count)
+
+
+def _vec_weight_per_ea(m):
+    return _number(m, 1) * 1000
+
+
+def _vec_volume_multiple(m):
+    value, count = _number(m, 1), _number(m, 3)
+    return np.where(_unit(m, 2) == 'l', value * 1000 * count, value * count)
+
+
+def _vec_measure_times_quantity(m):
+    value, unit, quantity = _number(m, 1), _unit(m, 2), _number(m, 3)
+    return np.select([np.isin(unit, ('kg', 'l')), unit == 'mg'],
+                     [value * 1000 * quantity, (value / 1000) * quantity],
+                     value * quantity)
+
+
+def _vec_measure_only(m):
+    value, unit = _number(m, 1), _unit(m, 2)
+    return np.select([np.isin(unit, ('kg', 'l', 'ℓ')), unit == 'mg'],
+                     [value * 1000, value / 1000],
+                     value)
+
+
+_VECTOR_HANDLERS: Dict[Callable, Callable] = {
+    _weight_times_count: _vec_weight_times_count,
+    _pieces_ea_box: _vec_pieces_ea_box,
+    _piece_count: _vec_piece_count,
+    _single_piece: _vec_single_piece,
+    _weight_multiple: _vec_weight_multiple,
+    _weight_per_ea: _vec_weight_per_ea,
+    _volume_multiple: _vec_volume_multiple,
+    _measure_times_quantity: _vec_measure_times_quantity,
+    _measure_only: _vec_measure_only,
+}
+
+
+def vector_handler(rule: SpecRule) -> Optional[Callable]:
+    """규칙의 NumPy 변환 함수 (없으면 None - 스칼라 파서로 처리)"""
+    groups = getattr(rule.handler, 'groups', None)
+    if groups is not None:
+        return _vec_total_weight(*groups)
+    return _VECTOR_HANDLERS.get(rule.handler)
+
+
+# ==============================================================================
+# 파싱
+# ==============================================================================
+
+def parse_totals(specs: pd.Series, units: Optional[pd.Series] = None) -> pd.Series:
+    """
+    규격 열 파싱
+
+    Args:
+        specs: 규격 Series
+        units: 단위 Series (주면 파싱 캐시 조회 - 캐시 키가 (규격, 단위))
+
+    Returns:
+        전체값 Series (g / ml / 개수, 파싱 불가는 NaN) - 입력과 같은 인덱스
+    """
+    totals = pd.Series(np.nan, index=specs.index, dtype=float)
+
+    text = specs[specs.notna()].astype(str).str.strip()
+    text = text[text != '']
+    if text.empty:
+        return totals
+
+    # 같은 규격은 한 번만 파싱
+    codes, uniques = pd.factorize(text)
+    unique_totals = pd.Series(np.nan, index=range(len(uniques)), dtype=float)
+    pending = pd.Series(uniques)
+
+    if units is not None:
+        # 규격별 첫 행의 단위로 캐시 조회 (규격 파싱 결과는 단위와 무관)
+        _, first_rows = np.unique(codes, return_index=True)
+        first_units = units.reindex(text.index).to_numpy()[first_rows]
+        cached = lookup_parses(
+            (spec, unit if isinstance(unit, str) else None) for spec, unit in zip(uniques, first_units)
+        )
+        for index, result in cached.items():
+            unique_totals[index] = result.total if result else np.nan
+        pending = pending.drop(list(cached))
+
+    if not pending.empty:
+        unique_totals[pending.index] = _parse_unique(pending)
+    totals[text.index] = unique_totals.to_numpy()[codes]
+    return totals
+
+
+def _parse_unique(text: pd.Series) -> pd.Series:
+    """정리된(공백 제거, 중복 없는) 규격 Series 파싱"""
+    totals = pd.Series(np.nan, index=text.index, dtype=float)
+
+    # ± 오차 범위 제거
+    tolerance = text.str.contains('±', regex=False)
+    if tolerance.any():
+        text[tolerance] = text[tolerance].str.replace(_TOLERANCE_RE.pattern, r'\1', regex=True)
+
+    has_digit = text.str.contains(r'\d', regex=True)
+    remaining = text
+    residue = []
+
+    for rule in SPEC_RULES:
+        if remaining.empty:
+            break
+
+        candidates = remaining
+        if rule.needs_digit:
+            candidates = candidates[has_digit[candidates.index]]
+        for token in rule.requires:
+            candidates = candidates[candidates.str.contains(token, regex=False)]
+        if candidates.empty:
+            continue
+
+        # 전체를 그룹으로 감싸 0번 열로 매치 여부 판단
+        m = candidates.str.extract(f"({rule.regex.pattern})", flags=rule.regex.flags)
+        m = m[m[0].notna()]
+        if m.empty:
+            continue
+
+        vec = vector_handler(rule)
+        if vec is None:
+            residue.extend(m.index)
+        else:
+            totals[m.index] = vec(m)
+        remaining = remaining.drop(m.index)
+
+    for index in residue:
+        result = parse_specification(text[index])
+        totals[index] = result[2] if result else np.nan
+
+    return totals
+
+
+def calculate_unit_prices_vectorized(prices: pd.Series, specs: pd.Series, units: pd.Series) -> pd.Series:
+    """
+    단위당 가격 열 계산 (calculate_unit_price_improved의 열 단위 버전)
+
+    Args:
+        prices: 입고가 Series
+        specs: 규격 Series
+        units: 단위 Series
+
+    Returns:
+        단위당 가격 Series (계산 불가는 NaN)
+    """
+    prices = pd.to_numeric(prices, errors='coerce').astype(float)
+    prices = prices.where(prices != 0)
+
+    # 단위가 KG이면 규격과 무관하게 1000g당 가격
+    is_kg = units.map(lambda unit: isinstance(unit, str) and unit.upper() == 'KG')
+
+    totals = parse_totals(specs[~is_kg], units[~is_kg])
+    totals = totals.where(totals > 0)
+
+    result = pd.Series(np.nan, index=prices.index, dtype=float)
+    result[is_kg] = prices[is_kg] / 1000
+    result[totals.index] = prices[totals.index] / totals
+    return result
+
+
+def to_db_values(values: pd.Series) -> list:
+    """NaN을 None으로 바꾼 리스트 (DB 저장용)"""
+    return [None if pd.isna(value) else float(value) for value in values]
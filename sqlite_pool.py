@@ -0,0 +1,147 @@
+"""
+SQLite 연결 풀 (★test_samsung_api.py 공용)
+- 요청마다 sqlite3.connect/close 하던 연결을 재사용 (연결 생성 비용, 빈 페이지 캐시 제거)
+- PRAGMA는 연결을 만들 때 한 번만 적용 (WAL, synchronous=NORMAL, cache_size, mmap_size, temp_store)
+- pool.connect()는 sqlite3.Connection을 그대로 돌려주고 close()하면 닫지 않고 풀로 반환
+  → 기존 conn = sqlite3.connect(...) / conn.close() 코드를 그대로 쓸 수 있음
+- with pool.connection() as conn: 형태로도 사용 (블록이 끝나면 반환)
+- 반환 시 커밋하지 않은 변경은 롤백하고 row_factory/text_factory를 기본값으로 되돌림
+  (close() 때 미커밋 변경이 버려지던 기존 동작과 같음)
+
+대기 없는(크기 제한 없는) 풀입니다: 빈 연결이 없으면 새로 만들고, 반환된 연결은 max_idle개까지만
+보관합니다. 동시에 열리는 연결 수는 호출하는 쪽이 정합니다 - 동기 핸들러는 DB 스레드 풀
+(DAHAM_DB_THREADS)만큼, async 핸들러는 연결을 든 채 await하는 요청 수만큼입니다. 이벤트 루프에서
+빌리는 핸들러가 있어 반환을 기다리게 하면 루프가 멈추므로 상한을 두지 않습니다 (peak_in_use로 확인).
+close()를 빠뜨린 연결은 가비지 컬렉션 때 실제로 닫히므로 풀이 고갈되지 않습니다.
+foreign_keys는 켜지 않습니다 (기존 핸들러는 외래 키 검사 없이 동작해 왔음).
+풀 연결의 커서는 실행 시간을 query_stats에 집계합니다.
+"""
+import os
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+from query_stats import InstrumentedConnection
+
+DATABASE_PATH = os.getenv("DAHAM_DB_PATH", "daham_meal.db")
+
+POOL_MAX_IDLE = 16
+POOL_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",        # 읽기와 쓰기가 서로 막지 않음
+    "PRAGMA synchronous=NORMAL",      # WAL에서는 안전하고 커밋이 빠름
+    "PRAGMA cache_size=-20000",       # 연결당 페이지 캐시 20MB
+    "PRAGMA mmap_size=268435456",     # 256MB까지 메모리 맵 읽기 (OS 페이지 캐시 공유)
+    "PRAGMA temp_store=MEMORY",       # 정렬/임시 테이블을 메모리에서
+)
+
+
+class PooledConnection(InstrumentedConnection):
+    """close()하면 풀로 반환되는 연결"""
+
+    _pool = None
+    _checked_out = False
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.release(self)
+        else:
+            super().close()
+
+    def close_now(self):
+        """풀로 반환하지 않고 실제로 닫기"""
+        self._pool = None
+        super().close()
+
+
+class SQLitePool:
+    """SQLite 연결 풀"""
+
+    def __init__(self, db_path: str = DATABASE_PATH, max_idle: int = POOL_MAX_IDLE, timeout: float = 5.0):
+        self.db_path = db_path
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self._idle: List[PooledConnection] = []
+        self._in_use = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._stats = {"checkouts": 0, "reused": 0, "created": 0, "returned": 0, "discarded": 0,
+                       "rollbacks": 0, "peak_in_use": 0}
+
+    def _create(self) -> PooledConnection:
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False,
+                               factory=PooledConnection)
+        for pragma in POOL_PRAGMAS:
+            conn.execute(pragma).fetchall()
+        return conn
+
+    def connect(self) -> PooledConnection:
+        """연결 빌리기 (close()로 반환, 빈 연결이 없으면 기다리지 않고 새로 만듦)"""
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        reused = conn is not None
+        if conn is None:
+            conn = self._create()
+        conn._pool = self
+        conn._checked_out = True
+        with self._lock:
+            self._in_use.add(conn)
+            stats = self._stats
+            stats["checkouts"] += 1
+            stats["reused" if reused else "created"] += 1
+            stats["peak_in_use"] = max(stats["peak_in_use"], len(self._in_use))
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[PooledConnection]:
+        """with 블록 동안 연결 빌리기"""
+        conn = self.connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def release(self, conn: PooledConnection):
+        """연결 반환 (두 번 반환해도 무시)"""
+        if not conn._checked_out:
+            return
+        conn._checked_out = False
+        rolled_back = conn.in_transaction
+        try:
+            if rolled_back:
+                conn.rollback()
+            conn.row_factory = None
+            conn.text_factory = str
+        except sqlite3.Error:
+            # 깨진 연결은 버림
+            conn.close_now()
+            with self._lock:
+                self._in_use.discard(conn)
+                self._stats["discarded"] += 1
+            return
+        with self._lock:
+            self._in_use.discard(conn)
+            self._stats["rollbacks"] += rolled_back
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                self._stats["returned"] += 1
+                return
+            self._stats["discarded"] += 1
+        conn.close_now()
+
+    def close_all(self):
+        """보관 중인 연결 모두 닫기 (사용 중인 연결은 반환될 때 다시 보관됨)"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close_now()
+
+    def stats(self) -> Dict:
+        """풀 지표 (빌린 횟수, 재사용/생성 수, 동시 사용 최대치, 크기)"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["idle"] = len(self._idle)
+            stats["in_use"] = len(self._in_use)
+        stats["size"] = stats["idle"] + stats["in_use"]
+        stats["max_idle"] = self.max_idle
+        return stats
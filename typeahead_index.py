@@ -0,0 +1,415 @@
+"""
+식자재명/메뉴명 자동완성 인덱스 (메모리)
+- ingredients.ingredient_name, menu_recipes.recipe_name 의 고유 이름을 색인
+- 이름마다 자모 분해 문자열과 초성 문자열을 미리 계산해 정렬 배열로 보관
+- 'ㄷㅈㄱㄱ' → 돼지고기 (초성), '돼지곡' → 돼지고기 (입력 중인 글자도 자모 단위 일치)
+- 키 입력마다 SQLite를 조회하지 않음: 쓰기는 트리거가 search_typeahead_log에 기록하고
+  백그라운드 스레드가 1초마다 읽어 인덱스에 반영
+
+검색 순서: 앞부분 일치(정렬 배열 이분 탐색) → 중간 일치(키를 이어 붙인 문자열에서 find)
+중간 일치는 입력 중인 마지막 글자를 뺀 원문으로 먼저 후보를 찾고 자모로 확인합니다
+(자모 문자열은 원문보다 3배 길어 전체를 훑으면 느림).
+"""
+import bisect
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from db_writer import get_writer
+
+DATABASE_PATH = os.getenv("DAHAM_DB_PATH", "daham_meal.db")
+
+# 변경 로그 확인 주기 (초)
+REFRESH_INTERVAL_SECONDS = 1.0
+
+# 추가분이 이만큼 쌓이면 정렬 배열을 다시 만듦 (그 전까지는 추가분만 순차 검색)
+COMPACT_THRESHOLD = 2000
+
+# 변경 로그 보관 건수 - 이보다 뒤처진 프로세스는 전체 재색인
+LOG_KEEP_ROWS = 100000
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+SOURCES = ('ingredient', 'recipe')
+
+# 한글 음절 분해 (호환용 자모로 변환, 겹모음/겹받침은 입력 순서대로 풀어씀)
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNGSEONG = ["ㅏ", "ㅐ", "ㅑ", "ㅒ", "ㅓ", "ㅔ", "ㅕ", "ㅖ", "ㅗ", "ㅗㅏ", "ㅗㅐ", "ㅗㅣ", "ㅛ", "ㅜ",
+              "ㅜㅓ", "ㅜㅔ", "ㅜㅣ", "ㅠ", "ㅡ", "ㅡㅣ", "ㅣ"]
+_JONGSEONG = ["", "ㄱ", "ㄲ", "ㄱㅅ", "ㄴ", "ㄴㅈ", "ㄴㅎ", "ㄷ", "ㄹ", "ㄹㄱ", "ㄹㅁ", "ㄹㅂ", "ㄹㅅ", "ㄹㅌ",
+              "ㄹㅍ", "ㄹㅎ", "ㅁ", "ㅂ", "ㅂㅅ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+# 직접 입력된 겹모음/겹받침 자모
+_COMPAT_JAMO = {"ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+                "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+                "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ"}
+_CONSONANTS = set(_CHOSEONG)
+
+
+def _normalize(text: str) -> str:
+    return "".join((text or "").lower().split())
+
+
+def decompose(text: str) -> str:
+    """자모 분해 문자열 ('돼지' → 'ㄷㅗㅐㅈㅣ', 한글 외 문자는 소문자로 유지, 공백 제거)"""
+    out = []
+    for ch in _normalize(text):
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(_CHOSEONG[code // 588])
+            out.append(_JUNGSEONG[(code % 588) // 28])
+            out.append(_JONGSEONG[code % 28])
+        else:
+            out.append(_COMPAT_JAMO.get(ch, ch))
+    return "".join(out)
+
+
+def choseong(text: str) -> str:
+    """초성 문자열 ('돼지고기' → 'ㄷㅈㄱㄱ', 한글 외 문자는 소문자로 유지, 공백 제거)"""
+    out = []
+    for ch in _normalize(text):
+        code = ord(ch) - 0xAC00
+        out.append(_CHOSEONG[code // 588] if 0 <= code < 11172 else ch)
+    return "".join(out)
+
+
+def is_choseong_query(text: str) -> bool:
+    """자음만으로 된 검색어인지 (초성 검색)"""
+    text = _normalize(text)
+    return bool(text) and all(ch in _CONSONANTS for ch in text)
+
+
+class _KeyIndex:
+    """
+    검색 키 하나(자모 또는 초성)의 정렬 배열
+
+    keys/ids는 키 순 정렬, blob은 키를 '\\n'으로 이어 붙인 문자열(중간 일치 검색용).
+    """
+
+    def __init__(self, pairs: List[Tuple[str, int]]):
+        pairs.sort()
+        self.keys = [key for key, _ in pairs]
+        self.ids = [entry_id for _, entry_id in pairs]
+        self.offsets = []
+        position = 0
+        for key in self.keys:
+            self.offsets.append(position)
+            position += len(key) + 1
+        self.blob = "\n".join(self.keys)
+
+    def prefix(self, query: str):
+        """앞부분이 일치하는 항목 id (키 순)"""
+        i = bisect.bisect_left(self.keys, query)
+        while i < len(self.keys) and self.keys[i].startswith(query):
+            yield self.ids[i]
+            i += 1
+
+    def contains(self, query: str, skip_prefix: bool = True):
+        """포함하는 항목 id (skip_prefix면 앞부분 일치 제외, 키 순)"""
+        position = self.blob.find(query)
+        while position != -1:
+            i = bisect.bisect_right(self.offsets, position) - 1
+            if not skip_prefix or position > self.offsets[i]:
+                yield self.ids[i]
+            # 같은 키 안의 다음 위치는 건너뜀
+            next_key = self.offsets[i + 1] if i + 1 < len(self.offsets) else len(self.blob)
+            position = self.blob.find(query, next_key)
+
+
+class TypeaheadIndex:
+    """
+    식자재명/메뉴명 자동완성 인덱스
+
+    항목은 (출처, 이름) 단위로 한 번만 저장하고 같은 이름의 행 수를 세어 둡니다.
+    행 수가 0이 된 항목은 검색에서 제외하고 다음 재구성 때 정리합니다.
+    """
+
+    def __init__(self, db_path: str = DATABASE_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._entries: List[Tuple[str, str]] = []        # id → (출처, 이름)
+        self._entry_ids: Dict[Tuple[str, str], int] = {}
+        self._counts: List[int] = []
+        self._jamo: Optional[_KeyIndex] = None
+        self._choseong: Optional[_KeyIndex] = None
+        self._text: Optional[_KeyIndex] = None
+        self._jamo_keys: List[str] = []                   # id → 자모 분해 문자열
+        self._pending: List[Tuple[str, str, int]] = []    # 마지막 재구성 이후 추가된 (자모, 초성, id)
+        self._last_log_id = 0
+        self._refresh_thread = None
+        self.loaded = False
+
+    # ---------- 구성 ----------
+
+    def load(self):
+        """DB에서 전체 이름을 읽어 인덱스 재구성"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            cursor = conn.cursor()
+            # 로그 위치와 이름 목록을 같은 시점 기준으로 읽음
+            cursor.execute("BEGIN")
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM search_typeahead_log")
+            last_log_id = cursor.fetchone()[0]
+            names = {}
+            for source, sql in _source_queries(cursor).items():
+                for name, count in cursor.execute(sql):
+                    if name and name.strip():
+                        names[(source, name)] = count
+        finally:
+            conn.close()
+
+        with self._lock:
+            self._entries = list(names)
+            self._entry_ids = {entry: i for i, entry in enumerate(self._entries)}
+            self._counts = list(names.values())
+            self._last_log_id = last_log_id
+            self._rebuild()
+            self.loaded = True
+
+    def _rebuild(self):
+        """정렬 배열 재구성 (락 안에서 호출) - 행 수가 0인 항목 정리"""
+        live = [entry for entry, count in zip(self._entries, self._counts) if count > 0]
+        counts = [count for count in self._counts if count > 0]
+        self._entries = live
+        self._entry_ids = {entry: i for i, entry in enumerate(live)}
+        self._counts = counts
+        self._jamo_keys = [decompose(name) for _, name in live]
+        self._jamo = _KeyIndex([(key, i) for i, key in enumerate(self._jamo_keys)])
+        self._text = _KeyIndex([(_normalize(name), i) for i, (_, name) in enumerate(live)])
+        self._choseong = _KeyIndex([(choseong(name), i) for i, (_, name) in enumerate(live)])
+        self._pending = []
+
+    def _apply(self, source: str, name: str, delta: int):
+        """이름 하나의 행 수 증감 (락 안에서 호출)"""
+        if not name or not name.strip():
+            return
+        entry = (source, name)
+        entry_id = self._entry_ids.get(entry)
+        if entry_id is None:
+            if delta <= 0:
+                return
+            entry_id = len(self._entries)
+            self._entries.append(entry)
+            self._entry_ids[entry] = entry_id
+            self._counts.append(0)
+            self._jamo_keys.append(decompose(name))
+            self._pending.append((self._jamo_keys[-1], choseong(name), entry_id))
+        self._counts[entry_id] = max(0, self._counts[entry_id] + delta)
+
+    def refresh(self) -> int:
+        """
+        변경 로그에서 새 변경분만 읽어 인덱스에 반영
+
+        Returns:
+            반영한 변경 건수 (로그가 정리되어 이어 읽을 수 없으면 전체 재색인 후 -1)
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT MIN(id) FROM search_typeahead_log")
+            min_id = cursor.fetchone()[0]
+            if min_id is not None and min_id > self._last_log_id + 1:
+                conn.close()
+                self.load()
+                return -1
+            changes = cursor.execute("""
+                SELECT id, source, name, delta FROM search_typeahead_log
+                WHERE id > ? ORDER BY id
+            """, (self._last_log_id,)).fetchall()
+        finally:
+            conn.close()
+
+        if not changes:
+            return 0
+        with self._lock:
+            for _log_id, source, name, delta in changes:
+                self._apply(source, name, delta)
+            self._last_log_id = changes[-1][0]
+            if len(self._pending) >= COMPACT_THRESHOLD:
+                self._rebuild()
+        return len(changes)
+
+    def start_refresh(self, interval: float = REFRESH_INTERVAL_SECONDS):
+        """백그라운드에서 주기적으로 변경 로그 반영 (오래된 로그 정리 포함)"""
+        if self._refresh_thread is not None:
+            return
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    if self.refresh():
+                        prune_change_log(self.db_path)
+                except Exception as e:
+                    print(f"자동완성 인덱스 갱신 실패: {e}")
+
+        self._refresh_thread = threading.Thread(target=loop, daemon=True)
+        self._refresh_thread.start()
+
+    # ---------- 검색 ----------
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT, source: Optional[str] = None) -> List[Dict]:
+        """
+        자동완성 후보 상위 limit개
+
+        Args:
+            query: 입력 중인 검색어 (자음만 입력하면 초성 검색)
+            source: 'ingredient' 또는 'recipe' (없으면 둘 다)
+
+        Returns:
+            [{"text", "source", "match", "count"}, ...] - 앞부분 일치가 먼저
+        """
+        limit = max(1, min(limit, MAX_LIMIT))
+        if is_choseong_query(query):
+            key, mode, index_attr = choseong(query), "choseong", "_choseong"
+        else:
+            key, mode, index_attr = decompose(query), "jamo", "_jamo"
+        if not key:
+            return []
+
+        with self._lock:
+            index = getattr(self, index_attr)
+            if index is None:
+                return []
+            pending = [(cho if mode == "choseong" else jamo, i) for jamo, cho, i in self._pending]
+
+            results, seen = [], set()
+
+            def collect(entry_ids, match):
+                for entry_id in entry_ids:
+                    if len(results) >= limit:
+                        return
+                    if entry_id in seen or self._counts[entry_id] <= 0:
+                        continue
+                    entry_source, name = self._entries[entry_id]
+                    if source and entry_source != source:
+                        continue
+                    seen.add(entry_id)
+                    results.append({"text": name, "source": entry_source, "match": match,
+                                    "count": self._counts[entry_id]})
+
+            collect(sorted(i for k, i in pending if k.startswith(key)), "prefix")
+            collect(index.prefix(key), "prefix")
+            collect((i for k, i in pending if key in k), "contains")
+            collect(self._contains(query, key, mode), "contains")
+        return results
+
+    def _contains(self, query: str, key: str, mode: str):
+        """중간 일치 항목 id (락 안에서 호출)"""
+        text = _normalize(query)[:-1]
+        if mode == "choseong" or not text:
+            return self._choseong.contains(key) if mode == "choseong" else self._jamo.contains(key)
+        # 마지막 글자 앞까지는 완성된 글자이므로 원문에서 후보를 찾고 자모로 확인
+        return (i for i in self._text.contains(text, skip_prefix=False) if key in self._jamo_keys[i])
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": sum(1 for count in self._counts if count > 0),
+                "pending": len(self._pending),
+                "last_log_id": self._last_log_id,
+            }
+
+
+def _source_queries(cursor) -> Dict[str, str]:
+    """출처별 (이름, 행 수) 조회 SQL - menu_recipes가 없으면 식자재만"""
+    queries = {'ingredient': """
+        SELECT ingredient_name, COUNT(*) FROM ingredients GROUP BY ingredient_name
+    """}
+    recipe_columns = _columns(cursor, 'menu_recipes')
+    if 'recipe_name' in recipe_columns:
+        active = "WHERE COALESCE(is_active, 1) = 1" if 'is_active' in recipe_columns else ""
+        queries['recipe'] = f"SELECT recipe_name, COUNT(*) FROM menu_recipes {active} GROUP BY recipe_name"
+    return queries
+
+
+def _columns(cursor, table: str) -> List[str]:
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [row[1] for row in cursor.fetchall()]
+
+
+def ensure_change_log(cursor):
+    """자동완성 변경 로그 테이블과 기록 트리거 생성 (서버 시작 시 schema_migrations가 호출)"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS search_typeahead_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source TEXT NOT NULL,
+            name TEXT,
+            delta INTEGER NOT NULL
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS typeahead_ingredient_insert AFTER INSERT ON ingredients BEGIN
+            INSERT INTO search_typeahead_log (source, name, delta) VALUES ('ingredient', new.ingredient_name, 1);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS typeahead_ingredient_delete AFTER DELETE ON ingredients BEGIN
+            INSERT INTO search_typeahead_log (source, name, delta) VALUES ('ingredient', old.ingredient_name, -1);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS typeahead_ingredient_update AFTER UPDATE OF ingredient_name ON ingredients
+        WHEN old.ingredient_name IS NOT new.ingredient_name BEGIN
+            INSERT INTO search_typeahead_log (source, name, delta) VALUES ('ingredient', old.ingredient_name, -1);
+            INSERT INTO search_typeahead_log (source, name, delta) VALUES ('ingredient', new.ingredient_name, 1);
+        END
+    """)
+
+    recipe_columns = _columns(cursor, 'menu_recipes')
+    if 'recipe_name' not in recipe_columns:
+        return
+    # 소프트 삭제(is_active = 0)된 메뉴는 자동완성에서 제외
+    if 'is_active' in recipe_columns:
+        old_active, new_active = "COALESCE(old.is_active, 1) = 1", "COALESCE(new.is_active, 1) = 1"
+        update_of = "recipe_name, is_active"
+    else:
+        old_active = new_active = "1"
+        update_of = "recipe_name"
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS typeahead_recipe_insert AFTER INSERT ON menu_recipes
+        WHEN {new_active} BEGIN
+            INSERT INTO search_typeahead_log (source, name, delta) VALUES ('recipe', new.recipe_name, 1);
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS typeahead_recipe_delete AFTER DELETE ON menu_recipes
+        WHEN {old_active} BEGIN
+            INSERT INTO search_typeahead_log (source, name, delta) VALUES ('recipe', old.recipe_name, -1);
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS typeahead_recipe_update AFTER UPDATE OF {update_of} ON menu_recipes BEGIN
+            INSERT INTO search_typeahead_log (source, name, delta)
+            SELECT 'recipe', old.recipe_name, -1 WHERE {old_active};
+            INSERT INTO search_typeahead_log (source, name, delta)
+            SELECT 'recipe', new.recipe_name, 1 WHERE {new_active};
+        END
+    """)
+
+
+def prune_change_log(db_path: str = DATABASE_PATH):
+    """최근 LOG_KEEP_ROWS건만 남기고 변경 로그 정리 (쓰기 스레드에서 커밋)"""
+    get_writer(db_path).write(lambda cursor: cursor.execute("""
+        DELETE FROM search_typeahead_log
+        WHERE id <= (SELECT MAX(id) FROM search_typeahead_log) - ?
+    """, (LOG_KEEP_ROWS,)))
+
+
+_index: Optional[TypeaheadIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_typeahead_index(db_path: str = DATABASE_PATH) -> TypeaheadIndex:
+    """이 프로세스의 자동완성 인덱스 (처음 호출 때 로드하고 백그라운드 갱신 시작)"""
+    global _index
+    with _index_lock:
+        if _index is None or _index.db_path != db_path:
+            index = TypeaheadIndex(db_path)
+            index.load()
+            index.start_refresh()
+            _index = index
+        return _index
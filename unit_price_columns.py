@@ -0,0 +1,68 @@
+"""
+저장된 단위당/g당 단가 정렬·범위 조회
+- price_per_unit, price_per_gram 컬럼이 목록 정렬과 단가 범위 조회의 기준 값
+  (입력/계산 버전이 바뀐 행은 unit_price_recalculator가 증분 재계산)
+- 단가가 없는 행은 가장 큰 값으로 취급 (오름차순이면 맨 뒤)
+  → 정렬 키 (컬럼 IS NULL, 컬럼, id)와 같은 식 인덱스로 OFFSET/커서 모두 인덱스 순서대로 조회
+- 분류/업체 필터 + 단가 정렬·범위는 복합 인덱스 사용
+- 인덱스는 서버 시작 시 schema_migrations가 생성
+"""
+from typing import List, Optional, Tuple
+
+from keyset_pagination import SortOrder
+from unit_price_recalculator import ensure_tracking_columns
+
+# 정렬 가능한 단가 컬럼
+UNIT_PRICE_COLUMNS = ("price_per_unit", "price_per_gram")
+
+UNIT_PRICE_INDEXES = {
+    "idx_ingredients_price_per_unit": "ingredients((price_per_unit IS NULL), price_per_unit)",
+    "idx_ingredients_price_per_gram": "ingredients((price_per_gram IS NULL), price_per_gram)",
+    "idx_ingredients_category_unit_price": "ingredients(category, (price_per_unit IS NULL), price_per_unit)",
+    "idx_ingredients_supplier_unit_price": "ingredients(supplier_name, (price_per_unit IS NULL), price_per_unit)",
+}
+
+
+def ensure_unit_price_indexes(cursor):
+    """단가 컬럼/추적 컬럼과 정렬 인덱스 확인 및 생성"""
+    ensure_tracking_columns(cursor)
+    for name, target in UNIT_PRICE_INDEXES.items():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+
+
+def unit_price_order(column: str = "price_per_unit", descending: bool = False,
+                     priced_only: bool = False) -> SortOrder:
+    """
+    단가 정렬 (단가 없는 행은 가장 큰 값)
+
+    Args:
+        priced_only: 단가 범위 조건으로 NULL이 없을 때 - 앞 키 (컬럼 IS NULL)를 빼야
+                     SQLite가 범위 탐색한 인덱스 순서를 그대로 사용 (임시 정렬 없음)
+    """
+    if column not in UNIT_PRICE_COLUMNS:
+        raise ValueError(f"정렬할 수 없는 단가 컬럼입니다: {column}")
+    name = f"{column}_{'desc' if descending else 'asc'}"
+    if priced_only:
+        return SortOrder(f"{name}_priced", [(column, False)], descending)
+    return SortOrder(name, [(f"({column} IS NULL)", False), (column, True)], descending)
+
+
+def unit_price_range(min_price: Optional[float], max_price: Optional[float],
+                     column: str = "price_per_unit") -> Tuple[List[str], list]:
+    """
+    단가 범위 조건 (WHERE 조건 목록, 파라미터)
+
+    (컬럼 IS NULL) = 0을 함께 넣어 정렬 인덱스의 앞 키로 범위 탐색이 되도록 합니다.
+    """
+    if column not in UNIT_PRICE_COLUMNS:
+        raise ValueError(f"조회할 수 없는 단가 컬럼입니다: {column}")
+    if min_price is None and max_price is None:
+        return [], []
+    conditions, params = [f"({column} IS NULL) = 0"], []
+    if min_price is not None:
+        conditions.append(f"{column} >= ?")
+        params.append(min_price)
+    if max_price is not None:
+        conditions.append(f"{column} <= ?")
+        params.append(max_price)
+    return conditions, params
@@ -0,0 +1,489 @@
+"""
+식자재 단위당 단가 증분 재계산
+- 단가 계산에 사용한 입력(입고가|규격|단위)과 계산 버전을 행에 함께 저장
+- 입력이 바뀌었거나 파서/학습 패턴 버전이 바뀐 행만 재계산
+  (학습 패턴은 DB에 저장된 것만 사용 → 어느 워커/CLI가 계산해도 같은 버전, 같은 값)
+- executemany 배치 업데이트 (배치마다 쓰기 스레드에서 커밋 → 업로드/수정과 잠금 경합 없음)
+- 대량 재계산은 id 구간별로 프로세스 풀(spawn)에서 계산하고 쓰기 스레드로 저장
+- 백그라운드 작업은 API/CLI로만 시작하고, DB의 작업 테이블로 한 번에 하나만 실행
+- 규격 파싱 결과는 배치마다 spec_parse_cache에서 한 번에 읽고, 새로 파싱한 결과는 저장
+
+재계산은 읽기 전용 계산(학습 기록 없음)을 사용하므로 결과는 입력과 버전만으로
+결정됩니다. 패턴 학습은 등록/수정, 피드백, 재학습에서만 일어납니다.
+"""
+import argparse
+import json
+import multiprocessing
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from itertools import repeat
+from typing import Callable, Dict, List, Optional, Tuple
+
+from spec_parser import PARSER_VERSION, lookup_parses, normalize_key, prime_parse_cache, set_parse_store
+from spec_parse_cache import ParseCollector, install_parse_store
+from db_writer import get_writer
+from improved_unit_price_calculator import calculate_price_per_gram
+from learning_price_calculator import (
+    DATABASE_PATH, LearningPriceCalculator, calculate_unit_price_readonly, flush_learning_buffer
+)
+
+UPDATE_BATCH_SIZE = 1000
+
+# 워커 한 번에 넘기는 행 수 (id 순으로 연속된 구간) - 이보다 적으면 풀 없이 계산
+PARALLEL_CHUNK_SIZE = 2000
+
+# 단가 계산에 쓰인 입력 값 (저장된 값과 비교해 변경 여부 판단)
+CALC_INPUT_SQL = "IFNULL(purchase_price, '') || '|' || IFNULL(specification, '') || '|' || IFNULL(unit, '')"
+
+# 재계산 대상 (입고가와 규격이 있는 행)
+PRICED_ROWS_SQL = "purchase_price > 0 AND specification IS NOT NULL AND specification != ''"
+
+
+# DB 경로별 저장된 패턴 계산기: {db_path: (패턴 테이블 지문, 계산기, 계산 버전)}
+_calculators = {}
+_calculators_lock = threading.Lock()
+
+
+def _patterns_fingerprint(db_path: str) -> Optional[Tuple]:
+    """패턴 테이블 요약 (행 수, 성공/실패 합계) - 바뀌었을 때만 패턴을 다시 로드"""
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("""
+            SELECT COUNT(*), TOTAL(success_count), TOTAL(failure_count) FROM price_calculation_patterns
+        """).fetchone()
+    except sqlite3.OperationalError:
+        return None  # 패턴 테이블 없음
+    finally:
+        conn.close()
+
+
+def load_calculator(db_path: str = DATABASE_PATH) -> Tuple[LearningPriceCalculator, str]:
+    """
+    DB에 저장된 학습 패턴으로 만든 계산기와 계산 버전 (파서 버전 + 패턴 버전)
+
+    워커/CLI 프로세스마다 메모리에서 학습한 패턴이 서로 다르므로 재계산은 저장된 패턴만
+    사용합니다. 이 프로세스가 버퍼에 쌓아 둔 학습은 먼저 저장합니다.
+    """
+    flush_learning_buffer()
+    fingerprint = _patterns_fingerprint(db_path)
+    with _calculators_lock:
+        cached = _calculators.get(db_path)
+        if cached is None or cached[0] != fingerprint:
+            calculator = LearningPriceCalculator(db_path)
+            cached = _calculators[db_path] = (
+                fingerprint, calculator, f"{PARSER_VERSION}:{calculator.pattern_version()}"
+            )
+    return cached[1], cached[2]
+
+
+def current_calc_version(db_path: str = DATABASE_PATH) -> str:
+    """현재 단가 계산 버전 (파서 버전 + DB에 저장된 학습 패턴 버전)"""
+    return load_calculator(db_path)[1]
+
+
+def ensure_tracking_columns(cursor):
+    """단가 계산 추적 컬럼 확인 및 추가"""
+    cursor.execute("PRAGMA table_info(ingredients)")
+    columns = [col[1] for col in cursor.fetchall()]
+    if 'price_per_unit' not in columns:
+        cursor.execute("ALTER TABLE ingredients ADD COLUMN price_per_unit REAL")
+    if 'price_per_gram' not in columns:
+        cursor.execute("ALTER TABLE ingredients ADD COLUMN price_per_gram REAL")
+    if 'price_calc_input' not in columns:
+        cursor.execute("ALTER TABLE ingredients ADD COLUMN price_calc_input TEXT")
+    if 'price_calc_version' not in columns:
+        cursor.execute("ALTER TABLE ingredients ADD COLUMN price_calc_version TEXT")
+
+
+def select_stale_rows(cursor, calc_version: str, force: bool = False,
+                      supplier_name: str = None) -> List[Tuple]:
+    """
+    재계산이 필요한 행 조회
+
+    Returns:
+        [(id, 규격, 단위, 입고가, 계산 입력 값), ...]
+    """
+    conditions = [PRICED_ROWS_SQL]
+    params = []
+
+    if not force:
+        conditions.append(f"(price_calc_version IS NOT ? OR price_calc_input IS NOT ({CALC_INPUT_SQL}))")
+        params.append(calc_version)
+
+    if supplier_name:
+        conditions.append("supplier_name = ?")
+        params.append(supplier_name)
+
+    cursor.execute(f"""
+        SELECT id, specification, unit, purchase_price, {CALC_INPUT_SQL}
+        FROM ingredients
+        WHERE {" AND ".join(conditions)}
+        ORDER BY id
+    """, params)
+    return cursor.fetchall()
+
+
+def compute_updates(rows: List[Tuple], calc_version: str,
+                    evaluate: Callable = calculate_unit_price_readonly) -> Tuple[List[Tuple], int]:
+    """
+    행 목록의 단위당 단가/g당 단가 계산 (규격 파싱 결과는 캐시되어 한 번만 파싱)
+
+    Returns:
+        (UPDATE 파라미터 목록, 계산 성공 수)
+    """
+    # 배치의 규격 파싱 결과를 영속 캐시에서 한 번에 읽어 둠
+    lookup_parses((spec, unit) for _id, spec, unit, _price, _input in rows)
+
+    updates = []
+    success_count = 0
+    for ing_id, spec, unit, price, calc_input in rows:
+        unit_price = evaluate(price, spec, unit)
+        if unit_price is not None:
+            success_count += 1
+        price_per_gram = calculate_price_per_gram(price, spec, unit)
+        updates.append((unit_price, price_per_gram, calc_input, calc_version, ing_id))
+    return updates, success_count
+
+
+def write_updates(cursor, updates: List[Tuple]):
+    """
+    계산 결과 배치 저장
+
+    계산에 실패한 행은 단가를 NULL로 저장합니다 (이전 입력으로 계산한 단가가 정렬/범위 조회에
+    남지 않게 함). 추적 값은 갱신하므로 입력이나 계산 버전이 바뀔 때 다시 대상이 됩니다.
+    """
+    cursor.executemany("""
+        UPDATE ingredients
+        SET price_per_unit = ?,
+            price_per_gram = ?,
+            price_calc_input = ?,
+            price_calc_version = ?
+        WHERE id = ?
+    """, updates)
+
+
+def recalculate_unit_prices(db_path: str = DATABASE_PATH, force: bool = False,
+                            supplier_name: Optional[str] = None) -> Dict:
+    """
+    변경된 식자재만 단위당 단가 재계산
+
+    Args:
+        db_path: 데이터베이스 경로
+        force: True면 변경 여부와 관계없이 전체 재계산
+        supplier_name: 지정하면 해당 공급업체 행만 대상
+
+    Returns:
+        재계산 결과 요약
+    """
+    start_time = time.time()
+    calculator, calc_version = load_calculator(db_path)
+    parse_store = install_parse_store(db_path)
+    from schema_migrations import ensure_schema  # schema_migrations가 이 모듈을 import하므로 여기서 import
+    ensure_schema(db_path)  # 추적 컬럼
+
+    conn = sqlite3.connect(db_path)
+    rows = select_stale_rows(conn.cursor(), calc_version, force, supplier_name)
+    conn.close()
+    writer = get_writer(db_path)
+    updated_count = 0
+
+    for i in range(0, len(rows), UPDATE_BATCH_SIZE):
+        updates, success_count = compute_updates(rows[i:i + UPDATE_BATCH_SIZE], calc_version,
+                                                 calculator.evaluate)
+        writer.write(write_updates, updates)
+        updated_count += success_count
+
+    parse_store.flush()
+
+    return {
+        "stale_count": len(rows),
+        "updated_count": updated_count,
+        "failed_count": len(rows) - updated_count,
+        "calc_version": calc_version,
+        "elapsed_seconds": round(time.time() - start_time, 3)
+    }
+
+
+# ==============================================================================
+# 병렬 재계산
+# ==============================================================================
+
+# 워커 프로세스별 계산기 (부모 프로세스의 패턴 스냅샷으로 생성)
+_worker_calculator = None
+_worker_parses = None
+
+
+def _init_worker(patterns: List[Tuple[str, str, Dict]]):
+    """워커 초기화 - 부모가 DB에서 읽은 패턴 스냅샷 로드 (부모와 같은 값을 계산)"""
+    global _worker_calculator, _worker_parses
+    _worker_calculator = LearningPriceCalculator(patterns=patterns)
+    # 워커는 DB에 접근하지 않음 - 캐시 항목은 구간과 함께 받고 새 파싱 결과는 돌려줌
+    _worker_parses = ParseCollector()
+    set_parse_store(_worker_parses)
+
+
+def _chunk_parses(parse_store, rows: List[Tuple]) -> list:
+    """구간의 규격 파싱 캐시 항목 (구간당 한 번 조회)"""
+    keys = {normalize_key(spec, unit) for _id, spec, unit, _price, _input in rows if spec}
+    return list(parse_store.load_many(keys).items())
+
+
+def _compute_chunk(rows: List[Tuple], cached_parses: list, calc_version: str) -> Tuple[List[Tuple], int, list]:
+    """워커에서 id 구간 하나 계산 - 새로 파싱한 규격은 부모가 저장하도록 함께 반환"""
+    prime_parse_cache(cached_parses)
+    updates, success_count = compute_updates(rows, calc_version, _worker_calculator.evaluate)
+    return updates, success_count, _worker_parses.take_pending()
+
+
+def recalculate_unit_prices_parallel(db_path: str = DATABASE_PATH, force: bool = False,
+                                     supplier_name: Optional[str] = None, workers: Optional[int] = None,
+                                     progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+    """
+    재계산 대상을 id 구간으로 나눠 프로세스 풀에서 계산
+
+    규격 파싱은 순수 CPU 작업이므로 프로세스로 나누고, 저장은 이 프로세스의
+    쓰기 스레드가 구간 결과를 받는 대로 배치로 처리합니다. 워커는 이 프로세스가 DB에서
+    읽은 패턴 스냅샷을 쓰므로 recalculate_unit_prices()와 같은 값을 저장합니다.
+    규격 파싱 캐시는 이 프로세스가 구간마다 한 번 읽어 워커에 넘기고, 워커가 새로
+    파싱한 결과도 이 프로세스가 저장합니다 (워커는 DB에 접근하지 않음).
+
+    Args:
+        db_path: 데이터베이스 경로
+        force: True면 변경 여부와 관계없이 전체 재계산
+        supplier_name: 지정하면 해당 공급업체 행만 대상
+        workers: 워커 프로세스 수 (기본: CPU 수)
+        progress: 구간 저장 후 호출되는 콜백 (처리 행 수, 전체 행 수)
+
+    Returns:
+        재계산 결과 요약 (초당 처리 행 수 포함)
+    """
+    start_time = time.time()
+    calculator, calc_version = load_calculator(db_path)
+    patterns = calculator.snapshot()
+    parse_store = install_parse_store(db_path)
+    from schema_migrations import ensure_schema  # schema_migrations가 이 모듈을 import하므로 여기서 import
+    ensure_schema(db_path)  # 추적 컬럼
+
+    conn = sqlite3.connect(db_path)
+    rows = select_stale_rows(conn.cursor(), calc_version, force, supplier_name)
+    conn.close()
+    writer = get_writer(db_path)
+    chunks = [rows[i:i + PARALLEL_CHUNK_SIZE] for i in range(0, len(rows), PARALLEL_CHUNK_SIZE)]
+    processed = 0
+    updated_count = 0
+
+    def save(updates, success_count):
+        nonlocal processed, updated_count
+        writer.write(write_updates, updates)
+        processed += len(updates)
+        updated_count += success_count
+        if progress:
+            progress(processed, len(rows))
+
+    try:
+        if len(chunks) <= 1:
+            for chunk in chunks:
+                save(*compute_updates(chunk, calc_version, calculator.evaluate))
+        else:
+            # 구간별 캐시 조회는 작업 제출 시 모두 끝나므로 이후 저장과 겹치지 않음
+            cached = [_chunk_parses(parse_store, chunk) for chunk in chunks]
+            # 서버 프로세스는 스레드(쓰기 스레드, DB 스레드 풀)가 돌고 있어 fork하지 않고 새 프로세스로 시작
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                     initializer=_init_worker, initargs=(patterns,)) as pool:
+                for updates, success_count, parses in pool.map(_compute_chunk, chunks, cached,
+                                                               repeat(calc_version)):
+                    save(updates, success_count)
+                    parse_store.save_many(parses)
+    finally:
+        parse_store.flush()
+
+    elapsed = time.time() - start_time
+    return {
+        "stale_count": len(rows),
+        "updated_count": updated_count,
+        "failed_count": len(rows) - updated_count,
+        "calc_version": calc_version,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(len(rows) / elapsed) if elapsed > 0 else 0
+    }
+
+
+# ==============================================================================
+# 백그라운드 작업
+# ==============================================================================
+
+# 실행 중인 작업의 마지막 진행 기록(updated_at) 후 이 시간이 지나면 중단된 작업으로 보고 새로 시작
+JOB_LEASE_SECONDS = 120
+
+_JOB_COLUMNS = ('job_id', 'status', 'processed', 'total', 'started_at', 'updated_at',
+                'finished_at', 'result', 'error')
+
+
+def ensure_recalc_job_table(cursor):
+    """재계산 작업 상태 테이블 확인 및 생성 (워커/CLI 모두 같은 테이블로 실행 중인 작업을 확인)"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS unit_price_recalc_jobs (
+            job_id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            processed INTEGER DEFAULT 0,
+            total INTEGER,
+            started_at TEXT,
+            updated_at TEXT,
+            finished_at TEXT,
+            result TEXT,
+            error TEXT
+        )
+    """)
+
+
+def _row_to_job(row) -> Dict:
+    job = dict(zip(_JOB_COLUMNS, row))
+    if job['result']:
+        job['result'] = json.loads(job['result'])
+    return job
+
+
+def _select_job(cursor, job_id: str) -> Optional[Dict]:
+    cursor.execute(f"SELECT {', '.join(_JOB_COLUMNS)} FROM unit_price_recalc_jobs WHERE job_id = ?", (job_id,))
+    row = cursor.fetchone()
+    return _row_to_job(row) if row else None
+
+
+def _claim_job(cursor, job_id: str) -> Tuple[bool, Dict]:
+    """
+    실행 중인 작업이 없으면 새 작업 등록 (쓰기 스레드에서 실행)
+
+    쓰기 스레드의 BEGIN IMMEDIATE 트랜잭션 안에서 확인하고 등록하므로 여러 워커/CLI가
+    동시에 시작해도 하나만 등록됩니다. 진행 기록이 JOB_LEASE_SECONDS 넘게 멈춘 작업은
+    중단된 것으로 표시하고 새로 시작합니다.
+
+    Returns:
+        (새로 등록했는지, 등록한 작업 또는 이미 실행 중인 작업)
+    """
+    now = datetime.now()
+    cursor.execute(f"""
+        SELECT {', '.join(_JOB_COLUMNS)} FROM unit_price_recalc_jobs
+        WHERE status = 'running' ORDER BY started_at DESC LIMIT 1
+    """)
+    row = cursor.fetchone()
+    if row:
+        job = _row_to_job(row)
+        if (job['updated_at'] or '') >= (now - timedelta(seconds=JOB_LEASE_SECONDS)).isoformat():
+            return False, job
+        cursor.execute("UPDATE unit_price_recalc_jobs SET status = 'interrupted', finished_at = ? WHERE job_id = ?",
+                       (now.isoformat(), job['job_id']))
+
+    cursor.execute("""
+        INSERT INTO unit_price_recalc_jobs (job_id, status, processed, started_at, updated_at)
+        VALUES (?, 'running', 0, ?, ?)
+    """, (job_id, now.isoformat(), now.isoformat()))
+    return True, _select_job(cursor, job_id)
+
+
+def _update_job(cursor, job_id: str, values: Dict):
+    """작업 진행/상태 저장 (쓰기 스레드에서 실행)"""
+    assignments = ", ".join(f"{column} = ?" for column in values)
+    cursor.execute(f"UPDATE unit_price_recalc_jobs SET {assignments} WHERE job_id = ?",
+                   (*values.values(), job_id))
+
+
+def claim_recalculation_job(db_path: str = DATABASE_PATH) -> Tuple[bool, Dict]:
+    """재계산 작업 실행 권한 확보 (다른 워커/CLI가 실행 중이면 그 작업을 반환)"""
+    from schema_migrations import ensure_schema  # schema_migrations가 이 모듈을 import하므로 여기서 import
+    ensure_schema(db_path)  # 작업 테이블
+    return get_writer(db_path).write(_claim_job, uuid.uuid4().hex[:12])
+
+
+def run_recalculation_job(job_id: str, db_path: str = DATABASE_PATH, force: bool = False,
+                          supplier_name: Optional[str] = None, workers: Optional[int] = None,
+                          progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+    """
+    확보한 작업으로 병렬 재계산 실행 - 구간을 저장할 때마다 진행 상황과 실행 시각(updated_at)을 기록
+
+    Returns:
+        종료된 작업 상태
+    """
+    writer = get_writer(db_path)
+
+    def save_progress(processed, total):
+        writer.write(_update_job, job_id, {
+            'processed': processed, 'total': total, 'updated_at': datetime.now().isoformat()
+        })
+        if progress:
+            progress(processed, total)
+
+    values = {'status': 'completed'}
+    try:
+        values['result'] = json.dumps(
+            recalculate_unit_prices_parallel(db_path, force, supplier_name, workers, save_progress)
+        )
+    except Exception as e:
+        print(f"단가 재계산 작업 실패: {e}")
+        values = {'status': 'failed', 'error': str(e)}
+    finally:
+        values['finished_at'] = values['updated_at'] = datetime.now().isoformat()
+        writer.write(_update_job, job_id, values)
+    return get_recalculation_job(job_id, db_path)
+
+
+def start_recalculation_job(db_path: str = DATABASE_PATH, force: bool = False,
+                            supplier_name: Optional[str] = None, workers: Optional[int] = None) -> Dict:
+    """
+    병렬 재계산 백그라운드 작업 시작
+
+    이미 실행 중인 작업이 있으면 (다른 워커나 CLI에서 실행 중이어도) 새로 시작하지 않고
+    그 작업을 반환합니다.
+    """
+    claimed, job = claim_recalculation_job(db_path)
+    if claimed:
+        threading.Thread(
+            target=run_recalculation_job, args=(job['job_id'], db_path, force, supplier_name, workers),
+            daemon=True
+        ).start()
+    return job
+
+
+def get_recalculation_job(job_id: str, db_path: str = DATABASE_PATH) -> Optional[Dict]:
+    """재계산 작업 상태 조회 (다른 워커가 시작한 작업도 조회됨)"""
+    conn = sqlite3.connect(db_path)
+    try:
+        return _select_job(conn.cursor(), job_id)
+    except sqlite3.OperationalError:
+        return None  # 작업 테이블 없음 (마이그레이션 전)
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="식자재 단위당 단가 재계산")
+    parser.add_argument("--db", default=DATABASE_PATH, help="데이터베이스 경로")
+    parser.add_argument("--force", action="store_true", help="변경 여부와 관계없이 전체 재계산")
+    parser.add_argument("--supplier", help="해당 공급업체 식자재만 재계산")
+    parser.add_argument("--workers", type=int, help="워커 프로세스 수 (기본: CPU 수)")
+    args = parser.parse_args()
+
+    claimed, job = claim_recalculation_job(args.db)
+    if not claimed:
+        print(f"이미 실행 중인 재계산 작업이 있습니다: {job['job_id']} (시작 {job['started_at']})")
+        raise SystemExit(1)
+
+    def progress(processed, total):
+        print(f"\r진행: {processed:,}/{total:,}", end='')
+
+    job = run_recalculation_job(job['job_id'], args.db, args.force, args.supplier, args.workers, progress)
+    print()
+    if job['status'] != 'completed':
+        print(f"재계산 실패: {job['error']}")
+        raise SystemExit(1)
+    result = job['result']
+    print(f"재계산 대상: {result['stale_count']:,}개 | 성공: {result['updated_count']:,}개 | "
+          f"실패: {result['failed_count']:,}개")
+    print(f"소요 시간: {result['elapsed_seconds']}초 | 처리 속도: {result['rows_per_second']:,} 행/초")
+
+
+if __name__ == "__main__":
+    main()
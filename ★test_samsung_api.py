@@ -15,7 +15,6 @@ import json
 import os
 import hashlib
 import datetime
-import re
 from typing import Optional, List, Dict
 import sys
 import traceback
@@ -27,8 +26,26 @@ try:
     from image_processor import ImageProcessor
 except ImportError:
     ImageProcessor = None  # 나중에 설치하면 사용
-from improved_unit_price_calculator import calculate_unit_price_improved as original_calculate_unit_price_improved, parse_specification_improved
-from learning_price_calculator import calculate_unit_price_with_learning, record_manual_correction, get_calculation_stats
+from improved_unit_price_calculator import calculate_unit_price_improved as original_calculate_unit_price_improved, calculate_price_per_gram
+from learning_price_calculator import calculate_unit_price_with_learning, calculate_unit_price_readonly, record_manual_correction, get_calculation_stats
+from unit_price_recalculator import (
+    recalculate_unit_prices, start_recalculation_job, get_recalculation_job
+)
+from unit_price_columns import UNIT_PRICE_COLUMNS, unit_price_order, unit_price_range
+from ingredient_export import EXPORT_FORMATS, export_response, iter_export_rows
+from catalog_snapshot import fetch_snapshot_page, get_catalog_snapshot, refresh_catalog_snapshot
+from grid_response import check_layout, grid_response, grid_rows, select_fields
+from sqlite_pool import SQLitePool
+from db_executor import db_endpoint, db_executor_stats, run_db
+from db_writer import get_writer
+from query_stats import query_stats, reset_query_stats, reset_route, set_route, slow_queries, SLOW_QUERY_MS
+from spec_parse_cache import install_parse_store
+from ingredient_search import search_condition, relevance_join
+from keyset_pagination import SortOrder, fetch_keyset_page, fetch_offset_page
+from count_cache import cached_count
+from schema_migrations import ensure_schema, is_missing_table
+from typeahead_index import get_typeahead_index, SOURCES as TYPEAHEAD_SOURCES, DEFAULT_LIMIT as TYPEAHEAD_DEFAULT_LIMIT
+from pattern_retrain_job import start_retrain_job, resume_retrain_job, get_retrain_job
 import httpx
 
 app = FastAPI()
@@ -74,15 +91,11 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
 
 def get_current_user(token_data: TokenData = Depends(verify_token)):
     """현재 로그인된 사용자 정보 조회"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-
-    user = cursor.execute("""
-        SELECT * FROM users WHERE username = ? AND is_active = 1
-    """, (token_data.username,)).fetchone()
-
-    conn.close()
+    with db_pool.connection() as conn:
+        conn.row_factory = sqlite3.Row
+        user = conn.execute("""
+            SELECT * FROM users WHERE username = ? AND is_active = 1
+        """, (token_data.username,)).fetchone()
 
     if user is None:
         raise HTTPException(status_code=401, detail="User not found")
@@ -149,57 +162,18 @@ class SupplierUpdate(BaseModel):
 # 데이터베이스 경로를 환경 변수 또는 기본값으로 설정
 DATABASE_PATH = os.getenv("DAHAM_DB_PATH", "daham_meal.db")
 
-# 단위당 단가 계산 함수
-def calculate_unit_price_old(price, specification):
-    """규격을 파싱하여 단위당 단가 계산"""
-    if not price or price == 0 or not specification:
-        return None
-
-    patterns = [
-        # 무게 * 수량 패턴 (예: 1kg*10ea, 500g*20pac)
-        r'(\d+(?:\.\d+)?)\s*(kg|g|mg)\s*[*×xX]\s*(\d+)',
-        # 부피 * 수량 패턴 (예: 18L*1ea, 500ml*24개)
-        r'(\d+(?:\.\d+)?)\s*(L|l|ml|ML)\s*[*×xX]\s*(\d+)',
-        # 무게만 있는 패턴 (예: 1kg, 500g)
-        r'(\d+(?:\.\d+)?)\s*(kg|g|mg)(?:\s|$)',
-        # 부피만 있는 패턴 (예: 1L, 500ml)
-        r'(\d+(?:\.\d+)?)\s*(L|l|ml|ML)(?:\s|$)',
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, specification, re.IGNORECASE)
-        if match:
-            groups = match.groups()
-
-            if len(groups) >= 3:  # 무게/부피 * 수량
-                value = float(groups[0])
-                unit = groups[1].lower()
-                quantity = float(groups[2])
-            elif len(groups) == 2:  # 무게/부피만
-                value = float(groups[0])
-                unit = groups[1].lower()
-                quantity = 1
-            else:
-                continue
-
-            # 단위를 그램/ml로 통일
-            if unit in ['kg']:
-                total_value = value * 1000 * quantity
-            elif unit in ['g']:
-                total_value = value * quantity
-            elif unit in ['mg']:
-                total_value = value / 1000 * quantity
-            elif unit in ['l']:
-                total_value = value * 1000 * quantity
-            elif unit in ['ml']:
-                total_value = value * quantity
-            else:
-                continue
+# 요청 핸들러 공용 연결 풀 (PRAGMA는 연결 생성 시 한 번만, close()하면 풀로 반환)
+db_pool = SQLitePool(DATABASE_PATH)
+
+# 단일 쓰기 스레드 (업로드/재계산/학습 저장과 같은 쓰기 연결로 순서대로 그룹 커밋)
+db_writer = get_writer(DATABASE_PATH)
 
-            if total_value > 0:
-                return float(price) / total_value
+# 규격 파싱 결과를 spec_parse_cache 테이블과 공유 (워커/재시작 후에도 재파싱 없음)
+install_parse_store(DATABASE_PATH)
 
-    return None
+# 스키마 마이그레이션 (추적 컬럼, 조회/정렬 인덱스, 전문 검색 인덱스, 변경 카운터, 통계 테이블)
+# schema_version에 기록된 것은 건너뜀 → 요청 처리 중에는 스키마 확인/변경 없음
+ensure_schema(DATABASE_PATH)
 
 # CORS 설정 추가
 app.add_middleware(
@@ -210,6 +184,23 @@ app.add_middleware(
     allow_headers=["*"],  # 모든 헤더 허용
 )
 
+@app.middleware("http")
+async def track_query_route(request: Request, call_next):
+    """쿼리 통계/느린 쿼리 로그에 호출 라우트 기록
+
+    라우팅은 call_next 안에서 일어나므로 기록할 때 매칭된 라우트 템플릿(/api/users/{user_id})을 읽음
+    → 경로 파라미터 값마다 라우트가 따로 집계되지 않음
+    """
+    def route_label():
+        route = request.scope.get("route")
+        return f"{request.method} {route.path if route else request.url.path}"
+
+    token = set_route(route_label)
+    try:
+        return await call_next(request)
+    finally:
+        reset_route(token)
+
 @app.get("/favicon.ico")
 async def favicon():
     """Return empty favicon to avoid 404 errors"""
@@ -243,10 +234,11 @@ async def serve_supplier_login_page():
 # ========== 인증 API ==========
 
 @app.post("/api/auth/login")
-async def login(user_credentials: UserLogin):
+@db_endpoint
+def login(user_credentials: UserLogin):
     """사용자 로그인"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -267,12 +259,12 @@ async def login(user_credentials: UserLogin):
         # JWT 토큰 생성
         access_token = create_access_token(data={"sub": user['username']})
 
+        conn.close()
+
         # 로그인 시간 업데이트
-        cursor.execute("""
+        db_writer.write(lambda cursor: cursor.execute("""
             UPDATE users SET last_login = datetime('now') WHERE id = ?
-        """, (user['id'],))
-        conn.commit()
-        conn.close()
+        """, (user['id'],)))
 
         return {
             "success": True,
@@ -318,10 +310,11 @@ async def logout(current_user: dict = Depends(get_current_user)):
     }
 
 @app.post("/api/auth/supplier-login")
-async def supplier_login(supplier_credentials: SupplierLogin):
+@db_endpoint
+def supplier_login(supplier_credentials: SupplierLogin):
     """협력업체 로그인"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -387,7 +380,7 @@ async def test_samsung_welstory():
     """삼성웰스토리 식자재 데이터 직접 조회"""
     try:
         # 데이터베이스 연결
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
         
         # 삼성웰스토리 공급업체 정보 조회
@@ -449,11 +442,45 @@ async def test_samsung_welstory():
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+# 업체별 식자재 현황 그리드 열 (페이지에서 찾는 열 이름, DB 컬럼, 값 변환)
+SUPPLIER_GRID_COLUMNS = [
+    ('분류(대분류)', 'category', lambda v: v or ''),
+    ('기본식자재(세분류)', 'sub_category', lambda v: v or ''),
+    ('고유코드', 'ingredient_code', lambda v: v or ''),
+    ('식자재명', 'ingredient_name', lambda v: v or ''),
+    ('원산지', 'origin', lambda v: v or ''),
+    ('게시유무', 'posting_status', lambda v: v or ''),
+    ('규격', 'specification', lambda v: v or ''),
+    ('단위', 'unit', lambda v: v or ''),
+    ('면세', 'tax_type', lambda v: v or ''),  # 면세여부 아닌 면세
+    ('선발주일', 'delivery_days', lambda v: v or ''),
+    ('입고가', 'purchase_price', lambda v: float(v) if v is not None else 0.0),
+    ('판매가', 'selling_price', lambda v: float(v) if v is not None else 0.0),
+    ('거래처명', 'supplier_name', lambda v: v or ''),
+    ('비고', 'notes', lambda v: v or ''),
+    ('등록일', 'created_date', lambda v: v or ''),
+    # 데이터베이스에 저장된 g당 단가 (단위당 단가와 함께 계산/저장됨)
+    ('g당단가', 'price_per_gram', lambda v: round(v if v is not None else 0.0, 2)),
+]
+
 @app.get("/all-ingredients-for-suppliers")
-async def get_all_ingredients_for_suppliers(page: int = 1, limit: int = 100, supplier_filter: str = None):
-    """모든 식자재를 업체별로 그룹화해서 반환 (업체별 식자재 현황 박스용)"""
+@db_endpoint
+def get_all_ingredients_for_suppliers(request: Request, page: int = 1, limit: int = 100, supplier_filter: str = None,
+                                            page_cursor: str = Query(None, alias="cursor"), estimate_total: bool = False,
+                                            fields: str = None, layout: str = "rows"):
+    """모든 식자재를 업체별로 그룹화해서 반환 (업체별 식자재 현황 박스용)
+
+    cursor를 주면 페이지 번호 대신 커서 기준으로 조회 (깊은 페이지도 첫 페이지와 같은 속도)
+    estimate_total=true면 전체 건수를 다시 세지 않고 마지막 캐시 값을 사용
+    fields=식자재명,입고가처럼 열을 지정하면 그 열만 조회/응답
+    layout=columns면 열 이름은 columns에 한 번만, ingredients는 값 배열로 응답 (그리드에 그대로 사용)
+    """
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        grid_columns = {name: (column, convert) for name, column, convert in SUPPLIER_GRID_COLUMNS}
+        names = select_fields([name for name, _, _ in SUPPLIER_GRID_COLUMNS], fields)
+        check_layout(layout)
+
+        conn = db_pool.connect()
         cursor = conn.cursor()
         
         # 기본 WHERE 조건
@@ -462,82 +489,37 @@ async def get_all_ingredients_for_suppliers(page: int = 1, limit: int = 100, sup
         
         # 공급업체 필터 추가
         if supplier_filter:
-            where_conditions.append("supplier_name LIKE ?")
-            params.append(f"%{supplier_filter}%")
+            condition, condition_params = search_condition(supplier_filter, ("supplier_name",))
+            where_conditions.append(condition)
+            params.extend(condition_params)
         
-        # 전체 데이터 수 확인
-        count_query = f"SELECT COUNT(*) FROM ingredients WHERE {' AND '.join(where_conditions)}"
-        cursor.execute(count_query, params)
-        total_count = cursor.fetchone()[0]
+        # 전체 데이터 수 확인 (같은 조건은 테이블이 바뀔 때까지 캐시)
+        total_count, total_is_estimate = cached_count(cursor, "FROM ingredients", where_conditions, params, estimate_total)
         
         # 페이지네이션 계산
         offset = (page - 1) * limit
         total_pages = (total_count + limit - 1) // limit
         
-        # 페이지 컬럼 구조에 맞춘 식자재 조회 (g당 단가 계산 포함)
-        query = f"""
-            SELECT 
-                category,
-                sub_category,
-                ingredient_code,
-                ingredient_name,
-                origin,
-                posting_status,
-                specification,
-                unit,
-                tax_type,
-                delivery_days,
-                purchase_price,
-                selling_price,
-                supplier_name,
-                notes,
-                created_date,
-                price_per_unit
-            FROM ingredients 
-            WHERE {' AND '.join(where_conditions)}
-            ORDER BY supplier_name, ingredient_name
-            LIMIT ? OFFSET ?
-        """
-        params.extend([limit, offset])
-        cursor.execute(query, params)
-        
-        ingredients_data = cursor.fetchall()
-        
-        # 데이터를 한국어 컬럼명으로 변환
-        ingredients = []
-        
-        for row in ingredients_data:
-            # 데이터베이스에서 계산된 단위당 단가를 직접 사용
-            price_per_unit = row[15] if row[15] is not None else 0.0
-            
-            ingredient_dict = {
-                '분류(대분류)': row[0] or '',
-                '기본식자재(세분류)': row[1] or '',
-                '고유코드': row[2] or '',
-                '식자재명': row[3] or '',
-                '원산지': row[4] or '',
-                '게시유무': row[5] or '',
-                '규격': row[6] or '',  # 페이지에서 찾는 컬럼명
-                '단위': row[7] or '',  # 페이지에서 찾는 컬럼명
-                '면세': row[8] or '',  # 페이지에서 찾는 컬럼명 (면세여부 아닌 면세)
-                '선발주일': row[9] or '',  # 페이지에서 찾는 컬럼명
-                '입고가': float(row[10]) if row[10] is not None else 0.0,
-                '판매가': float(row[11]) if row[11] is not None else 0.0,
-                '거래처명': row[12] or '',
-                '비고': row[13] or '',
-                '등록일': row[14] or '',
-                'g당단가': round(price_per_gram, 2)
-            }
-            ingredients.append(ingredient_dict)
+        # 요청한 열만 조회 (페이지 컬럼 구조 순서)
+        columns_sql = ", ".join(grid_columns[name][0] for name in names)
+        order = SortOrder("supplier_name", [("supplier_name", False), ("ingredient_name", True)])
+        if page_cursor:
+            ingredients_data, next_cursor, prev_cursor = fetch_keyset_page(
+                cursor, columns_sql, "FROM ingredients", where_conditions, params, order, limit, page_cursor)
+        else:
+            ingredients_data, next_cursor, prev_cursor = fetch_offset_page(
+                cursor, columns_sql, "FROM ingredients", where_conditions, params, order, limit, offset, total_count)
+
+        # 데이터를 한국어 컬럼명으로 변환 (layout=columns면 값 배열 그대로)
+        converters = [grid_columns[name][1] for name in names]
+        ingredients = grid_rows(names, ([convert(value) for convert, value in zip(converters, row)]
+                                        for row in ingredients_data), layout)
         
         # 업체별 통계
         cursor.execute("""
-            SELECT 
-                supplier_name,
-                COUNT(*) as ingredient_count
-            FROM ingredients 
-            WHERE supplier_name IS NOT NULL AND supplier_name != ''
-            GROUP BY supplier_name
+            SELECT supplier_name, ingredient_count
+            FROM ingredient_supplier_stats
+            WHERE supplier_name != ''
             ORDER BY ingredient_count DESC
         """)
         
@@ -546,23 +528,29 @@ async def get_all_ingredients_for_suppliers(page: int = 1, limit: int = 100, sup
             supplier_stats[row[0]] = row[1]
         
         conn.close()
-        
-        return {
+
+        response_data = {
             "success": True,
             "ingredients": ingredients,
             "supplier_stats": supplier_stats,
             "pagination": {
-                "current_page": page,
+                "current_page": None if page_cursor else page,
                 "total_pages": total_pages,
                 "total_items": total_count,
+                "total_is_estimate": total_is_estimate,
                 "items_per_page": limit,
-                "has_next": page < total_pages,
-                "has_prev": page > 1
+                "has_next": next_cursor is not None,
+                "has_prev": prev_cursor is not None,
+                "next_cursor": next_cursor,
+                "prev_cursor": prev_cursor
             },
             "total_ingredients": len(ingredients),
             "total_suppliers": len(supplier_stats)
         }
-        
+        if layout == "columns":
+            response_data["columns"] = names
+        return grid_response(request, response_data)
+
     except Exception as e:
         return {"success": False, "error": str(e)}
 
@@ -570,7 +558,7 @@ async def get_all_ingredients_for_suppliers(page: int = 1, limit: int = 100, sup
 async def get_admin_users():
     """관리자용 사용자 목록 조회"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -607,7 +595,7 @@ async def get_admin_users():
 async def get_admin_business_locations():
     """관리자용 사업장 목록 조회"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -647,21 +635,24 @@ async def get_admin_business_locations():
 async def get_admin_suppliers():
     """관리자용 협력업체 목록 조회"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         conn.text_factory = lambda x: x.decode('utf-8', errors='replace') if isinstance(x, bytes) else x
         cursor = conn.cursor()
 
-        # suppliers 테이블이 있는지 확인
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='suppliers'")
-        suppliers_table_exists = cursor.fetchone()
-
-        if suppliers_table_exists:
+        # suppliers 테이블 조회 (테이블이 없으면 조회 실패 → 통계 테이블 사용)
+        try:
             cursor.execute("""
                 SELECT id, name, representative, headquarters_phone, email, is_active
                 FROM suppliers
                 ORDER BY name ASC
             """)
+            suppliers_table_exists = True
+        except sqlite3.OperationalError as e:
+            if not is_missing_table(e):
+                raise
+            suppliers_table_exists = False
 
+        if suppliers_table_exists:
             suppliers_data = cursor.fetchall()
             suppliers = []
 
@@ -675,12 +666,11 @@ async def get_admin_suppliers():
                     "active": bool(supplier[5])
                 })
         else:
-            # suppliers 테이블이 없으면 ingredients에서 추출
+            # suppliers 테이블이 없으면 식자재 업체별 통계에서 추출
             cursor.execute("""
-                SELECT DISTINCT supplier_name, COUNT(*) as ingredient_count
-                FROM ingredients 
-                WHERE supplier_name IS NOT NULL AND supplier_name != ''
-                GROUP BY supplier_name
+                SELECT supplier_name, ingredient_count
+                FROM ingredient_supplier_stats
+                WHERE supplier_name != ''
                 ORDER BY supplier_name ASC
             """)
             
@@ -709,36 +699,76 @@ async def get_admin_suppliers():
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+def admin_ingredient_query(search: str = None, category: str = None, supplier: str = None,
+                           sort_by: str = None, sort_order: str = "asc",
+                           min_unit_price: float = None, max_unit_price: float = None):
+    """관리자 식자재 목록/내보내기 공통 검색 조건과 정렬
+
+    Returns:
+        (FROM 절, WHERE 조건 목록, 파라미터, SortOrder)
+    """
+    where_conditions = []
+    params = []
+    search_join, join_params = "", []
+
+    if search:
+        search_columns = ("ingredient_name", "ingredient_code")
+        # 관련도 정렬은 FTS 결과와 JOIN (검색 조건 포함), 짧은 검색어는 LIKE로 처리
+        joined = relevance_join(search, search_columns) if sort_by == "relevance" else None
+        if joined:
+            search_join, join_params = joined
+        else:
+            condition, condition_params = search_condition(search, search_columns)
+            where_conditions.append(condition)
+            params.extend(condition_params)
+
+    if category:
+        where_conditions.append("category = ?")
+        params.append(category)
+
+    if supplier:
+        where_conditions.append("supplier_name = ?")
+        params.append(supplier)
+
+    # 단위당 단가 범위 (단가가 없는 행은 제외)
+    range_conditions, range_params = unit_price_range(min_unit_price, max_unit_price)
+    where_conditions.extend(range_conditions)
+    params.extend(range_params)
+
+    # 정렬 조건 설정 (정렬 컬럼 + id 기준 커서)
+    descending = sort_order.lower() != "asc"
+    order = SortOrder("id", descending=True)  # 기본 정렬
+    if sort_by in UNIT_PRICE_COLUMNS:
+        # 저장된 단가 컬럼 정렬 (단가 없는 행은 가장 큰 값, 범위 조건이 있으면 단가 있는 행만)
+        order = unit_price_order(sort_by, descending, priced_only=sort_by == "price_per_unit" and bool(range_conditions))
+    elif sort_by == "purchase_price":
+        order = SortOrder(f"purchase_price_{sort_order.lower()}", [("purchase_price", True)], descending)
+    elif sort_by == "ingredient_name":
+        order = SortOrder(f"ingredient_name_{sort_order.lower()}", [("ingredient_name", True)], descending)
+    elif sort_by == "relevance" and search_join:
+        # bm25 점수 (작을수록 관련도 높음)
+        order = SortOrder("relevance", [("fts.fts_rank", False)])
+
+    return f"FROM ingredients {search_join}", where_conditions, join_params + params, order
+
 @app.get("/api/admin/ingredients-new")
-async def get_admin_ingredients_new(page: int = 1, per_page: int = 20, search: str = None, category: str = None, supplier: str = None, sort_by: str = None, sort_order: str = "asc"):
-    """관리자용 식자재 목록 (페이징, 검색, 필터링)"""
+@db_endpoint
+def get_admin_ingredients_new(page: int = 1, per_page: int = 20, search: str = None, category: str = None, supplier: str = None, sort_by: str = None, sort_order: str = "asc",
+                                    page_cursor: str = Query(None, alias="cursor"), estimate_total: bool = False,
+                                    min_unit_price: float = None, max_unit_price: float = None):
+    """관리자용 식자재 목록 (페이징, 검색, 필터링)
+
+    cursor를 주면 페이지 번호 대신 커서 기준으로 조회 (응답의 next_cursor/prev_cursor 사용)
+    estimate_total=true면 전체 건수를 다시 세지 않고 마지막 캐시 값을 사용
+    sort_by=price_per_unit/price_per_gram과 min_unit_price/max_unit_price는 저장된 단가 컬럼 기준
+    """
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
-        # WHERE 조건 구성
-        where_conditions = []
-        params = []
-
-        if search:
-            where_conditions.append("(ingredient_name LIKE ? OR ingredient_code LIKE ?)")
-            params.append(f"%{search}%")
-            params.append(f"%{search}%")
-
-        if category:
-            where_conditions.append("category = ?")
-            params.append(category)
-
-        if supplier:
-            where_conditions.append("supplier_name = ?")
-            params.append(supplier)
-
-        where_clause = "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
-
-        # 총 개수 조회
-        count_query = f"SELECT COUNT(*) FROM ingredients {where_clause}"
-        cursor.execute(count_query, params)
-        total_count = cursor.fetchone()[0]
+        # 검색 조건과 정렬 (내보내기와 공통)
+        from_sql, where_conditions, params, order = admin_ingredient_query(
+            search, category, supplier, sort_by, sort_order, min_unit_price, max_unit_price)
 
         # 페이징 계산 - 검색 시에는 제한 해제, 일반 조회 시에만 제한
         if search or supplier or category:
@@ -747,24 +777,10 @@ async def get_admin_ingredients_new(page: int = 1, per_page: int = 20, search: s
         else:
             # 일반 조회 시에만 제한 적용
             per_page = min(per_page, 1000)
-        total_pages = (total_count + per_page - 1) // per_page
         offset = (page - 1) * per_page
 
-        # 정렬 조건 설정
-        order_clause = "ORDER BY id DESC"  # 기본 정렬
-        if sort_by == "price_per_unit":
-            # 단위당 단가 정렬은 데이터 조회 후 Python에서 처리
-            order_clause = "ORDER BY purchase_price, specification"
-        elif sort_by == "purchase_price":
-            direction = "ASC" if sort_order.lower() == "asc" else "DESC"
-            order_clause = f"ORDER BY purchase_price {direction}"
-        elif sort_by == "ingredient_name":
-            direction = "ASC" if sort_order.lower() == "asc" else "DESC"
-            order_clause = f"ORDER BY ingredient_name {direction}"
-
         # 데이터 조회
-        data_query = f"""
-            SELECT
+        columns_sql = """
                 id,
                 category,
                 sub_category,
@@ -780,30 +796,35 @@ async def get_admin_ingredients_new(page: int = 1, per_page: int = 20, search: s
                 selling_price,
                 supplier_name,
                 notes,
-                created_at
-            FROM ingredients
-            {where_clause}
-            {order_clause}
-            LIMIT ? OFFSET ?
+                created_at,
+                price_per_unit,
+                price_per_gram
         """
+        # 검색어/커서가 없으면 열 단위 스냅샷에서 필터·정렬·페이징 (해당 페이지 행만 DB에서 조회)
+        snapshot = None if (search or page_cursor) else get_catalog_snapshot(cursor, DATABASE_PATH)
+        if snapshot is not None:
+            rows, next_cursor, prev_cursor, total_count = fetch_snapshot_page(
+                cursor, snapshot, columns_sql, order, category, supplier, min_unit_price, max_unit_price,
+                sort_by, sort_order, offset, per_page)
+            total_is_estimate = False
+        else:
+            # 총 개수 조회 (같은 조건은 테이블이 바뀔 때까지 캐시)
+            total_count, total_is_estimate = cached_count(cursor, from_sql, where_conditions, params, estimate_total)
+            if page_cursor:
+                rows, next_cursor, prev_cursor = fetch_keyset_page(
+                    cursor, columns_sql, from_sql, where_conditions, params, order, per_page, page_cursor)
+            else:
+                rows, next_cursor, prev_cursor = fetch_offset_page(
+                    cursor, columns_sql, from_sql, where_conditions, params, order, per_page, offset, total_count)
+        total_pages = (total_count + per_page - 1) // per_page
 
-        cursor.execute(data_query, params + [per_page, offset])
         ingredients = []
 
-        for row in cursor.fetchall():
-            # 단위당 단가 계산 - 대량 로딩시에는 학습 시스템 비활성화 (성능상 이유)
-            purchase_price = row[11] or 0
-            specification = row[7] or ""
-            unit = row[8] or ""
-
-            # 성능상 이유로 모든 대량 조회에서 학습 시스템 비활성화
-            if per_page >= 100:  # 100개 이상일 때는 빠른 계산 사용
-                # 빠른 기본 계산만 수행
-                from improved_unit_price_calculator import calculate_unit_price_improved
-                price_per_unit = calculate_unit_price_improved(purchase_price, specification, unit)
-            else:
-                # 소량 조회시에만 학습 시스템 사용
-                price_per_unit = calculate_unit_price_with_learning(purchase_price, specification, unit, row[0])
+        for row in rows:
+            # 저장된 단위당 단가 (아직 계산되지 않은 행만 읽기 전용 계산 - 학습 데이터 기록 없음)
+            price_per_unit = row[16]
+            if price_per_unit is None:
+                price_per_unit = calculate_unit_price_readonly(row[11] or 0, row[7] or "", row[8] or "")
 
             ingredients.append({
                 "id": row[0],
@@ -822,76 +843,81 @@ async def get_admin_ingredients_new(page: int = 1, per_page: int = 20, search: s
                 "supplier_name": row[13] or "-",
                 "notes": row[14] or "-",
                 "created_at": row[15] or "",
-                "price_per_unit": price_per_unit  # 실시간 계산된 단위당 단가
+                "price_per_unit": price_per_unit,
+                "price_per_gram": row[17]
             })
 
-        # 단위당 단가로 정렬이 요청된 경우 Python에서 정렬
-        if sort_by == "price_per_unit":
-            reverse_order = sort_order.lower() == "desc"
-            ingredients.sort(key=lambda x: x["price_per_unit"] if x["price_per_unit"] is not None else float('inf'), reverse=reverse_order)
-
         conn.close()
         
         return {
             "success": True,
             "ingredients": ingredients,
             "pagination": {
-                "current_page": page,
+                "current_page": None if page_cursor else page,
                 "total_pages": total_pages,
                 "total_items": total_count,
+                "total_is_estimate": total_is_estimate,
                 "items_per_page": per_page,
-                "has_next": page < total_pages,
-                "has_prev": page > 1
+                "has_next": next_cursor is not None,
+                "has_prev": prev_cursor is not None,
+                "next_cursor": next_cursor,
+                "prev_cursor": prev_cursor
             }
         }
         
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+@app.get("/api/admin/ingredients-new/export")
+async def export_admin_ingredients(format: str = "csv", search: str = None, category: str = None, supplier: str = None,
+                                   sort_by: str = None, sort_order: str = "asc",
+                                   min_unit_price: float = None, max_unit_price: float = None):
+    """관리자용 식자재 목록 내보내기 (목록과 같은 검색/필터/정렬, 전체 행을 CSV 또는 XLSX로 스트리밍)"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 형식입니다: {format} (csv, xlsx)")
+
+    from_sql, where_conditions, params, order = admin_ingredient_query(
+        search, category, supplier, sort_by, sort_order, min_unit_price, max_unit_price)
+    batches = iter_export_rows(DATABASE_PATH, from_sql, where_conditions, params, order.order_by())
+    return export_response(batches, format, "식자재목록")
+
 @app.post("/api/admin/ingredients")
 async def create_ingredient(ingredient_data: dict):
     """관리자용 식자재 추가"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-
         # 단위당 단가 자동 계산
         purchase_price = ingredient_data.get('purchase_price', 0)
         specification = ingredient_data.get('specification', '')
         unit = ingredient_data.get('unit', '')
         unit_price = calculate_unit_price_with_learning(purchase_price, specification, unit)
+        price_per_gram = calculate_price_per_gram(purchase_price, specification, unit)
 
         print(f"식자재 추가")
         print(f"   입고가: {purchase_price}, 규격: {specification}, 단위: {unit}")
         print(f"   계산된 단위당 단가: {unit_price}")
 
-        # price_per_unit 컬럼 확인 및 추가
-        cursor.execute("PRAGMA table_info(ingredients)")
-        columns = [col[1] for col in cursor.fetchall()]
-        if 'price_per_unit' not in columns:
-            cursor.execute("ALTER TABLE ingredients ADD COLUMN price_per_unit REAL")
-
-        cursor.execute("""
-            INSERT INTO ingredients (
-                ingredient_name, category, supplier_name,
-                purchase_price, selling_price, unit, origin, specification,
-                price_per_unit, created_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
-        """, (
-            ingredient_data.get('name'),
-            ingredient_data.get('category'),
-            ingredient_data.get('supplier'),
-            purchase_price,
-            ingredient_data.get('selling_price', 0),
-            ingredient_data.get('unit'),
-            ingredient_data.get('origin'),
-            specification,
-            unit_price
-        ))
+        def insert(cursor):
+            cursor.execute("""
+                INSERT INTO ingredients (
+                    ingredient_name, category, supplier_name,
+                    purchase_price, selling_price, unit, origin, specification,
+                    price_per_unit, price_per_gram, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
+            """, (
+                ingredient_data.get('name'),
+                ingredient_data.get('category'),
+                ingredient_data.get('supplier'),
+                purchase_price,
+                ingredient_data.get('selling_price', 0),
+                ingredient_data.get('unit'),
+                ingredient_data.get('origin'),
+                specification,
+                unit_price,
+                price_per_gram
+            ))
+            return cursor.lastrowid
 
-        ingredient_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        ingredient_id = await db_writer.write_async(insert)
 
         # 활동 로그 기록
         log_activity(
@@ -911,9 +937,6 @@ async def create_ingredient(ingredient_data: dict):
 async def update_ingredient(ingredient_id: int, ingredient_data: dict):
     """관리자용 식자재 수정 - 단위당 단가 자동 계산 및 저장"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-
         # 단위당 단가 계산
         purchase_price = ingredient_data.get('purchase_price', 0)
         specification = ingredient_data.get('specification', '')
@@ -921,12 +944,13 @@ async def update_ingredient(ingredient_id: int, ingredient_data: dict):
 
         # 학습 기반 단위당 단가 계산 (ingredient_id 포함)
         calculated_price_per_unit = calculate_unit_price_with_learning(purchase_price, specification, unit, ingredient_id)
+        price_per_gram = calculate_price_per_gram(purchase_price, specification, unit)
 
         print(f"식자재 수정 - ID: {ingredient_id}")
         print(f"   입고가: {purchase_price}, 규격: {specification}, 단위: {unit}")
         print(f"   계산된 단위당 단가: {calculated_price_per_unit}")
 
-        cursor.execute("""
+        await db_writer.write_async(lambda cursor: cursor.execute("""
             UPDATE ingredients SET
                 ingredient_name = ?,
                 category = ?,
@@ -937,6 +961,7 @@ async def update_ingredient(ingredient_id: int, ingredient_data: dict):
                 origin = ?,
                 specification = ?,
                 price_per_unit = ?,
+                price_per_gram = ?,
                 updated_at = CURRENT_TIMESTAMP
             WHERE id = ?
         """, (
@@ -949,11 +974,9 @@ async def update_ingredient(ingredient_id: int, ingredient_data: dict):
             ingredient_data.get('origin'),
             specification,
             calculated_price_per_unit,  # 계산된 단위당 단가 저장
+            price_per_gram,
             ingredient_id
-        ))
-
-        conn.commit()
-        conn.close()
+        )))
 
         return {
             "success": True,
@@ -966,62 +989,46 @@ async def update_ingredient(ingredient_id: int, ingredient_data: dict):
         return {"success": False, "error": str(e)}
 
 @app.post("/api/admin/ingredients/recalculate-unit-prices")
-async def recalculate_all_unit_prices():
-    """모든 식자재의 단위당 단가 재계산"""
+@db_endpoint
+def recalculate_all_unit_prices(force: bool = False, supplier: str = None):
+    """변경된 식자재의 단위당 단가 재계산 (force=true면 전체)"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-
-        # price_per_unit 컬럼 확인 및 추가
-        cursor.execute("PRAGMA table_info(ingredients)")
-        columns = [col[1] for col in cursor.fetchall()]
-        if 'price_per_unit' not in columns:
-            cursor.execute("ALTER TABLE ingredients ADD COLUMN price_per_unit REAL")
-
-        # 모든 식자재 조회 - unit 정보도 함께 조회
-        cursor.execute("""
-            SELECT id, specification, unit, purchase_price
-            FROM ingredients
-            WHERE purchase_price > 0 AND specification IS NOT NULL AND specification != ''
-        """)
-
-        ingredients = cursor.fetchall()
-        updated_count = 0
-
-        for ing_id, spec, unit, price in ingredients:
-            # 개선된 계산 로직 사용 - unit 정보도 함께 전달
-            unit_price = calculate_unit_price_with_learning(price, spec, unit, ing_id)
-            if unit_price is not None:
-                cursor.execute("""
-                    UPDATE ingredients
-                    SET price_per_unit = ?
-                    WHERE id = ?
-                """, (unit_price, ing_id))
-                updated_count += 1
-
-        conn.commit()
-        conn.close()
+        result = recalculate_unit_prices(DATABASE_PATH, force=force, supplier_name=supplier)
 
         return {
             "success": True,
-            "message": f"{updated_count}개 식자재의 단위당 단가가 재계산되었습니다.",
-            "updated_count": updated_count
+            "message": f"{result['updated_count']}개 식자재의 단위당 단가가 재계산되었습니다.",
+            **result
         }
 
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+@app.post("/api/admin/ingredients/recalculate-unit-prices/jobs")
+@db_endpoint
+def start_unit_price_recalculation_job(force: bool = False, supplier: str = None, workers: int = None):
+    """전체 카탈로그 단위당 단가 병렬 재계산 작업 시작 (백그라운드)"""
+    try:
+        job = start_recalculation_job(DATABASE_PATH, force=force, supplier_name=supplier, workers=workers)
+        return {"success": True, "job": job}
+
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+@app.get("/api/admin/ingredients/recalculate-unit-prices/jobs/{job_id}")
+@db_endpoint
+def get_unit_price_recalculation_job(job_id: str):
+    """단위당 단가 재계산 작업 상태 조회"""
+    job = get_recalculation_job(job_id, DATABASE_PATH)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다")
+    return {"success": True, "job": job}
+
 @app.delete("/api/admin/ingredients/{ingredient_id}")
 async def delete_ingredient(ingredient_id: int):
     """관리자용 식자재 삭제"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute("DELETE FROM ingredients WHERE id = ?", (ingredient_id,))
-        
-        conn.commit()
-        conn.close()
+        await db_writer.write_async(lambda cursor: cursor.execute("DELETE FROM ingredients WHERE id = ?", (ingredient_id,)))
         
         return {"success": True, "message": "식자재가 삭제되었습니다."}
         
@@ -1029,10 +1036,16 @@ async def delete_ingredient(ingredient_id: int):
         return {"success": False, "error": str(e)}
 
 @app.get("/ingredients")
-async def get_ingredients(page: int = 1, per_page: int = 20, search: str = None, category: str = None):
-    """사용자용 식자재 목록 조회 (페이징, 검색, 필터링) - 대용량 지원"""
+@db_endpoint
+def get_ingredients(page: int = 1, per_page: int = 20, search: str = None, category: str = None,
+                          page_cursor: str = Query(None, alias="cursor"), estimate_total: bool = False):
+    """사용자용 식자재 목록 조회 (페이징, 검색, 필터링) - 대용량 지원
+
+    cursor를 주면 페이지 번호 대신 커서 기준으로 조회 (응답의 next_cursor/prev_cursor 사용)
+    estimate_total=true면 전체 건수를 다시 세지 않고 마지막 캐시 값을 사용
+    """
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
         # WHERE 조건 구성
@@ -1040,27 +1053,23 @@ async def get_ingredients(page: int = 1, per_page: int = 20, search: str = None,
         params = []
 
         if search:
-            where_conditions.append("ingredient_name LIKE ?")
-            params.append(f"%{search}%")
+            condition, condition_params = search_condition(search, ("ingredient_name",))
+            where_conditions.append(condition)
+            params.extend(condition_params)
 
         if category:
             where_conditions.append("category = ?")
             params.append(category)
 
-        where_clause = "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
-
-        # 총 개수 조회
-        count_query = f"SELECT COUNT(*) FROM ingredients {where_clause}"
-        cursor.execute(count_query, params)
-        total_count = cursor.fetchone()[0]
+        # 총 개수 조회 (같은 조건은 테이블이 바뀔 때까지 캐시)
+        total_count, total_is_estimate = cached_count(cursor, "FROM ingredients", where_conditions, params, estimate_total)
 
         # 페이징 계산
         total_pages = (total_count + per_page - 1) // per_page
         offset = (page - 1) * per_page
 
-        # 데이터 조회 - 모든 필드 포함
-        data_query = f"""
-            SELECT
+        # 데이터 조회 - 모든 필드 포함 (id 내림차순)
+        columns_sql = """
                 id,
                 category,
                 sub_category,
@@ -1087,16 +1096,18 @@ async def get_ingredients(page: int = 1, per_page: int = 20, search: str = None,
                 updated_at,
                 price_per_gram,
                 price_per_unit
-            FROM ingredients
-            {where_clause}
-            ORDER BY id DESC
-            LIMIT ? OFFSET ?
         """
+        order = SortOrder("id", descending=True)
+        if page_cursor:
+            rows, next_cursor, prev_cursor = fetch_keyset_page(
+                cursor, columns_sql, "FROM ingredients", where_conditions, params, order, per_page, page_cursor)
+        else:
+            rows, next_cursor, prev_cursor = fetch_offset_page(
+                cursor, columns_sql, "FROM ingredients", where_conditions, params, order, per_page, offset, total_count)
 
-        cursor.execute(data_query, params + [per_page, offset])
         ingredients = []
 
-        for row in cursor.fetchall():
+        for row in rows:
             # 단위당 단가 계산 (이미 DB에 있으면 그 값 사용)
             purchase_price = row[11] or 0
             specification = row[7] or ""
@@ -1105,7 +1116,7 @@ async def get_ingredients(page: int = 1, per_page: int = 20, search: str = None,
 
             # DB에 값이 없으면 계산
             if db_price_per_unit is None:
-                price_per_unit = calculate_unit_price_with_learning(purchase_price, specification, unit)
+                price_per_unit = calculate_unit_price_readonly(purchase_price, specification, unit)
             else:
                 price_per_unit = db_price_per_unit
 
@@ -1144,12 +1155,15 @@ async def get_ingredients(page: int = 1, per_page: int = 20, search: str = None,
             "success": True,
             "ingredients": ingredients,
             "pagination": {
-                "current_page": page,
+                "current_page": None if page_cursor else page,
                 "total_pages": total_pages,
                 "total_items": total_count,
+                "total_is_estimate": total_is_estimate,
                 "items_per_page": per_page,
-                "has_next": page < total_pages,
-                "has_prev": page > 1
+                "has_next": next_cursor is not None,
+                "has_prev": prev_cursor is not None,
+                "next_cursor": next_cursor,
+                "prev_cursor": prev_cursor
             }
         }
 
@@ -1157,23 +1171,22 @@ async def get_ingredients(page: int = 1, per_page: int = 20, search: str = None,
         return {"success": False, "error": str(e)}
 
 @app.get("/api/admin/ingredients-summary")
-async def get_admin_ingredients_summary():
+@db_endpoint
+def get_admin_ingredients_summary():
     """관리자용 식자재 요약 통계"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
         
         # 총 식자재 수
-        cursor.execute("SELECT COUNT(*) FROM ingredients")
-        total_ingredients = cursor.fetchone()[0]
-        
+        total_ingredients, _ = cached_count(cursor, "FROM ingredients", [], [])
+
         # 카테고리별 통계
         cursor.execute("""
-            SELECT category, COUNT(*) as count
-            FROM ingredients
-            WHERE category IS NOT NULL AND category != ''
-            GROUP BY category
-            ORDER BY count DESC
+            SELECT category, ingredient_count
+            FROM ingredient_category_stats
+            WHERE category != ''
+            ORDER BY ingredient_count DESC
             LIMIT 10
         """)
         
@@ -1183,11 +1196,10 @@ async def get_admin_ingredients_summary():
         
         # 업체별 통계
         cursor.execute("""
-            SELECT supplier_name, COUNT(*) as count
-            FROM ingredients
-            WHERE supplier_name IS NOT NULL AND supplier_name != ''
-            GROUP BY supplier_name
-            ORDER BY count DESC
+            SELECT supplier_name, ingredient_count
+            FROM ingredient_supplier_stats
+            WHERE supplier_name != ''
+            ORDER BY ingredient_count DESC
             LIMIT 10
         """)
         
@@ -1231,7 +1243,7 @@ async def get_admin_ingredients_summary():
 async def get_dashboard_stats():
     """관리자 대시보드 통계 데이터"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
         
         # 사용자 수
@@ -1243,11 +1255,10 @@ async def get_dashboard_stats():
         total_sites = cursor.fetchone()[0]
         
         # 식자재 수
-        cursor.execute("SELECT COUNT(*) FROM ingredients")
-        total_ingredients = cursor.fetchone()[0]
-        
-        # 공급업체 수 
-        cursor.execute("SELECT COUNT(DISTINCT supplier_name) FROM ingredients WHERE supplier_name IS NOT NULL")
+        total_ingredients, _ = cached_count(cursor, "FROM ingredients", [], [])
+
+        # 공급업체 수
+        cursor.execute("SELECT COUNT(*) FROM ingredient_supplier_stats")
         total_suppliers = cursor.fetchone()[0]
         
         conn.close()
@@ -1286,7 +1297,7 @@ async def get_recent_activity():
 async def get_sites():
     """사업장 목록 조회"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         # UTF-8 텍스트 처리 설정 추가
         conn.text_factory = lambda x: x.decode('utf-8') if isinstance(x, bytes) else x
         cursor = conn.cursor()
@@ -1324,7 +1335,7 @@ async def get_sites():
 async def get_site(site_id: int):
     """개별 사업장 조회"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         # UTF-8 텍스트 처리 설정 추가
         conn.text_factory = lambda x: x.decode('utf-8') if isinstance(x, bytes) else x
         cursor = conn.cursor()
@@ -1365,56 +1376,48 @@ async def create_site(site_data: dict):
     try:
         print(f"[CREATE SITE] Received data: {site_data}")
 
-        conn = sqlite3.connect(DATABASE_PATH)
-        conn.text_factory = lambda x: x.decode('utf-8') if isinstance(x, bytes) else x
-        cursor = conn.cursor()
+        def insert(cursor):
+            # site_code 자동 생성 (번호 확인과 삽입을 같은 쓰기 트랜잭션에서)
+            site_code = site_data.get('site_code', '')
+            if not site_code:
+                # 기존 최대 번호 찾기
+                cursor.execute("""
+                    SELECT MAX(CAST(SUBSTR(site_code, 4) AS INTEGER))
+                    FROM business_locations
+                    WHERE site_code LIKE 'BIZ%'
+                """)
+                max_num = cursor.fetchone()[0]
+                next_num = (max_num or 0) + 1
+                site_code = f'BIZ{next_num:03d}'
+                print(f"[CREATE SITE] Generated site_code: {site_code}")
+
+            # site_code 중복 체크
+            cursor.execute("SELECT id FROM business_locations WHERE site_code = ?", (site_code,))
+            if cursor.fetchone():
+                print(f"[CREATE SITE] Duplicate site_code: {site_code}")
+                return site_code, False
 
-        # site_code 자동 생성
-        site_code = site_data.get('site_code', '')
-        if not site_code:
-            # 기존 최대 번호 찾기
+            # 삽입 쿼리
+            print(f"[CREATE SITE] Inserting with site_code={site_code}, name={site_data.get('name', '')}")
             cursor.execute("""
-                SELECT MAX(CAST(SUBSTR(site_code, 4) AS INTEGER))
-                FROM business_locations
-                WHERE site_code LIKE 'BIZ%'
-            """)
-            max_num = cursor.fetchone()[0]
-            next_num = (max_num or 0) + 1
-            site_code = f'BIZ{next_num:03d}'
-            print(f"[CREATE SITE] Generated site_code: {site_code}")
+                INSERT INTO business_locations (site_code, site_name, site_type, region, address, phone, manager_name, is_active)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                site_code,
+                site_data.get('name', ''),
+                site_data.get('type', ''),
+                site_data.get('parent_id', '전국'),
+                site_data.get('address', ''),
+                site_data.get('contact_info', ''),
+                site_data.get('manager_name', ''),
+                True
+            ))
+            return site_code, True
 
-        # site_code 중복 체크
-        cursor.execute("SELECT id FROM business_locations WHERE site_code = ?", (site_code,))
-        if cursor.fetchone():
-            print(f"[CREATE SITE] Duplicate site_code: {site_code}")
-            conn.close()
+        site_code, inserted = await db_writer.write_async(insert)
+        if not inserted:
             return {"success": False, "error": f"사업장 코드 '{site_code}'가 이미 존재합니다."}
 
-        # 삽입 쿼리
-        print(f"[CREATE SITE] Inserting with site_code={site_code}, name={site_data.get('name', '')}")
-        cursor.execute("""
-            INSERT INTO business_locations (site_code, site_name, site_type, region, address, phone, manager_name, is_active)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            site_code,
-            site_data.get('name', ''),
-            site_data.get('type', ''),
-            site_data.get('parent_id', '전국'),
-            site_data.get('address', ''),
-            site_data.get('contact_info', ''),
-            site_data.get('manager_name', ''),
-            True
-        ))
-
-        conn.commit()
-
-        # 삽입 확인
-        cursor.execute("SELECT COUNT(*) FROM business_locations WHERE site_code = ?", (site_code,))
-        count = cursor.fetchone()[0]
-        print(f"[CREATE SITE] After insert, found {count} records with site_code={site_code}")
-
-        conn.close()
-
         return {"success": True, "message": "사업장이 추가되었습니다", "site_code": site_code}
 
     except Exception as e:
@@ -1430,34 +1433,25 @@ async def update_site(site_id: int, site_data: dict):
         # 디버깅을 위해 받은 데이터 출력
         print(f"[UPDATE SITE {site_id}] Received data:", site_data)
 
-        conn = sqlite3.connect(DATABASE_PATH)  # 올바른 데이터베이스 경로 사용
-        conn.text_factory = lambda x: x.decode('utf-8') if isinstance(x, bytes) else x
-        cursor = conn.cursor()
-
-        # 필드명이 일치하도록 수정
-        cursor.execute("""
-            UPDATE business_locations
-            SET site_name = ?, site_type = ?, region = ?, manager_name = ?, manager_phone = ?, is_active = ?
-            WHERE id = ?
-        """, (
-            site_data.get('name', ''),
-            site_data.get('type', ''),
-            site_data.get('parent_id', '서울'),  # region 필드에 parent_id 값 사용
-            site_data.get('manager_name', ''),  # manager_name 추가
-            site_data.get('contact_info', ''),
-            1 if site_data.get('is_active', True) else 0,
-            site_id
-        ))
-
-        affected_rows = cursor.rowcount
-        conn.commit()
-
-        # 업데이트된 데이터 확인
-        cursor.execute("SELECT site_name, site_type, region FROM business_locations WHERE id = ?", (site_id,))
-        updated = cursor.fetchone()
-        print(f"[UPDATE SITE {site_id}] Updated data: {updated}, Affected rows: {affected_rows}")
+        def update(cursor):
+            # 필드명이 일치하도록 수정
+            cursor.execute("""
+                UPDATE business_locations
+                SET site_name = ?, site_type = ?, region = ?, manager_name = ?, manager_phone = ?, is_active = ?
+                WHERE id = ?
+            """, (
+                site_data.get('name', ''),
+                site_data.get('type', ''),
+                site_data.get('parent_id', '서울'),  # region 필드에 parent_id 값 사용
+                site_data.get('manager_name', ''),  # manager_name 추가
+                site_data.get('contact_info', ''),
+                1 if site_data.get('is_active', True) else 0,
+                site_id
+            ))
+            return cursor.rowcount
 
-        conn.close()
+        affected_rows = await db_writer.write_async(update)
+        print(f"[UPDATE SITE {site_id}] Affected rows: {affected_rows}")
 
         return {"success": True, "message": f"사업장이 수정되었습니다 (ID: {site_id})"}
 
@@ -1469,14 +1463,7 @@ async def update_site(site_id: int, site_data: dict):
 async def delete_site(site_id: int):
     """사업장 삭제"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        conn.text_factory = lambda x: x.decode('utf-8') if isinstance(x, bytes) else x
-        cursor = conn.cursor()
-        
-        cursor.execute("DELETE FROM business_locations WHERE id = ?", (site_id,))
-        
-        conn.commit()
-        conn.close()
+        await db_writer.write_async(lambda cursor: cursor.execute("DELETE FROM business_locations WHERE id = ?", (site_id,)))
         
         return {"success": True, "message": "사업장이 삭제되었습니다"}
         
@@ -1487,7 +1474,7 @@ async def delete_site(site_id: int):
 async def get_users():
     """사용자 목록 조회"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -1523,39 +1510,34 @@ async def get_users():
 async def get_suppliers_enhanced(page: int = 1, limit: int = 20, search: str = ""):
     """협력업체 목록 조회 (향상된 버전)"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
         
         # 검색 조건 추가
-        search_condition = ""
+        supplier_condition = ""
         params = []
         if search.strip():
-            search_condition = "WHERE supplier_name LIKE ?"
+            supplier_condition = "WHERE supplier_name LIKE ?"
             params.append(f"%{search}%")
-        
-        # 공급업체별 통계 조회
+
+        # 공급업체별 통계 조회 (트리거로 유지되는 업체별 통계 테이블)
         cursor.execute(f"""
-            SELECT 
+            SELECT
                 supplier_name,
-                COUNT(*) as ingredient_count,
-                AVG(purchase_price) as avg_price,
-                MIN(purchase_price) as min_price,
-                MAX(purchase_price) as max_price
-            FROM ingredients 
-            WHERE supplier_name IS NOT NULL {search_condition.replace('WHERE', 'AND') if search_condition else ''}
-            GROUP BY supplier_name
+                ingredient_count,
+                CASE WHEN price_count > 0 THEN price_sum / price_count END as avg_price,
+                min_price,
+                max_price
+            FROM ingredient_supplier_stats
+            {supplier_condition}
             ORDER BY ingredient_count DESC
             LIMIT ? OFFSET ?
         """, params + [limit, (page - 1) * limit])
-        
+
         suppliers = cursor.fetchall()
-        
+
         # 총 개수 조회
-        cursor.execute(f"""
-            SELECT COUNT(DISTINCT supplier_name) 
-            FROM ingredients 
-            WHERE supplier_name IS NOT NULL {search_condition}
-        """, params)
+        cursor.execute(f"SELECT COUNT(*) FROM ingredient_supplier_stats {supplier_condition}", params)
         
         total_count = cursor.fetchone()[0]
         total_pages = (total_count + limit - 1) // limit
@@ -1595,7 +1577,7 @@ async def get_suppliers_enhanced(page: int = 1, limit: int = 20, search: str = "
 async def get_customer_supplier_mappings():
     """고객-협력업체 매핑 목록 조회"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         conn.text_factory = lambda x: x.decode('utf-8', errors='replace') if isinstance(x, bytes) else x
         cursor = conn.cursor()
         
@@ -1656,7 +1638,7 @@ async def get_customer_supplier_mappings():
 async def get_customer_supplier_mapping(mapping_id: int):
     """특정 고객-협력업체 매핑 조회"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -1716,27 +1698,24 @@ async def get_customer_supplier_mapping(mapping_id: int):
 async def create_customer_supplier_mapping(mapping_data: dict):
     """고객-협력업체 매핑 생성"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            INSERT INTO customer_supplier_mappings
-            (customer_id, supplier_id, supplier_code, delivery_code, priority_order, is_primary_supplier, is_active, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            mapping_data.get('customer_id'),
-            mapping_data.get('supplier_id'),
-            mapping_data.get('supplier_code', ''),
-            mapping_data.get('delivery_code', ''),
-            mapping_data.get('priority_order', 1),
-            mapping_data.get('is_primary_supplier', False),
-            mapping_data.get('is_active', True),
-            mapping_data.get('notes', '')
-        ))
+        def insert(cursor):
+            cursor.execute("""
+                INSERT INTO customer_supplier_mappings
+                (customer_id, supplier_id, supplier_code, delivery_code, priority_order, is_primary_supplier, is_active, notes)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                mapping_data.get('customer_id'),
+                mapping_data.get('supplier_id'),
+                mapping_data.get('supplier_code', ''),
+                mapping_data.get('delivery_code', ''),
+                mapping_data.get('priority_order', 1),
+                mapping_data.get('is_primary_supplier', False),
+                mapping_data.get('is_active', True),
+                mapping_data.get('notes', '')
+            ))
+            return cursor.lastrowid
 
-        mapping_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        mapping_id = await db_writer.write_async(insert)
 
         return {
             "success": True,
@@ -1750,10 +1729,7 @@ async def create_customer_supplier_mapping(mapping_data: dict):
 async def update_customer_supplier_mapping(mapping_id: int, mapping_data: dict):
     """고객-협력업체 매핑 수정"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-
-        cursor.execute("""
+        await db_writer.write_async(lambda cursor: cursor.execute("""
             UPDATE customer_supplier_mappings
             SET customer_id = ?, supplier_id = ?, supplier_code = ?, delivery_code = ?, is_active = ?
             WHERE id = ?
@@ -1764,10 +1740,7 @@ async def update_customer_supplier_mapping(mapping_id: int, mapping_data: dict):
             mapping_data.get('delivery_code', ''),
             mapping_data.get('is_active', True),
             mapping_id
-        ))
-
-        conn.commit()
-        conn.close()
+        )))
 
         return {
             "success": True,
@@ -1780,13 +1753,8 @@ async def update_customer_supplier_mapping(mapping_id: int, mapping_data: dict):
 async def delete_customer_supplier_mapping(mapping_id: int):
     """고객-협력업체 매핑 삭제"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-
-        cursor.execute("DELETE FROM customer_supplier_mappings WHERE id = ?", (mapping_id,))
-
-        conn.commit()
-        conn.close()
+        await db_writer.write_async(lambda cursor: cursor.execute(
+            "DELETE FROM customer_supplier_mappings WHERE id = ?", (mapping_id,)))
 
         return {
             "success": True,
@@ -1800,7 +1768,7 @@ async def delete_customer_supplier_mapping(mapping_id: int):
 async def get_meal_pricing():
     """식단가 목록 조회"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         # UTF-8 디코딩을 위한 text_factory 설정
         conn.text_factory = lambda x: x.decode('utf-8', errors='replace') if isinstance(x, bytes) else x
         cursor = conn.cursor()
@@ -1865,33 +1833,29 @@ async def get_meal_pricing():
 async def create_meal_pricing(data: dict):
     """식단가 추가"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        conn.text_factory = lambda x: x.decode('utf-8', errors='replace') if isinstance(x, bytes) else x
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            INSERT INTO meal_pricing (
-                location_id, location_name, meal_plan_type, meal_type,
-                plan_name, apply_date_start, apply_date_end, selling_price,
-                material_cost_guideline, cost_ratio, is_active, created_at, updated_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'), datetime('now'))
-        """, (
-            data.get("location_id", 1),  # 기본값 1
-            data.get("location_name"),
-            data.get("meal_plan_type"),
-            data.get("meal_type"),
-            data.get("plan_name"),
-            data.get("apply_date_start"),
-            data.get("apply_date_end"),
-            data.get("selling_price"),
-            data.get("material_cost_guideline"),
-            data.get("cost_ratio", 50),
-            data.get("is_active", 1)
-        ))
+        def insert(cursor):
+            cursor.execute("""
+                INSERT INTO meal_pricing (
+                    location_id, location_name, meal_plan_type, meal_type,
+                    plan_name, apply_date_start, apply_date_end, selling_price,
+                    material_cost_guideline, cost_ratio, is_active, created_at, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'), datetime('now'))
+            """, (
+                data.get("location_id", 1),  # 기본값 1
+                data.get("location_name"),
+                data.get("meal_plan_type"),
+                data.get("meal_type"),
+                data.get("plan_name"),
+                data.get("apply_date_start"),
+                data.get("apply_date_end"),
+                data.get("selling_price"),
+                data.get("material_cost_guideline"),
+                data.get("cost_ratio", 50),
+                data.get("is_active", 1)
+            ))
+            return cursor.lastrowid
 
-        conn.commit()
-        new_id = cursor.lastrowid
-        conn.close()
+        new_id = await db_writer.write_async(insert)
 
         return {"success": True, "id": new_id}
 
@@ -1902,11 +1866,7 @@ async def create_meal_pricing(data: dict):
 async def update_meal_pricing(pricing_id: int, data: dict):
     """식단가 수정"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        conn.text_factory = lambda x: x.decode('utf-8', errors='replace') if isinstance(x, bytes) else x
-        cursor = conn.cursor()
-
-        cursor.execute("""
+        await db_writer.write_async(lambda cursor: cursor.execute("""
             UPDATE meal_pricing SET
                 location_name = ?,
                 meal_plan_type = ?,
@@ -1932,10 +1892,7 @@ async def update_meal_pricing(pricing_id: int, data: dict):
             data.get("cost_ratio"),
             data.get("is_active"),
             pricing_id
-        ))
-
-        conn.commit()
-        conn.close()
+        )))
 
         return {"success": True}
 
@@ -1946,14 +1903,7 @@ async def update_meal_pricing(pricing_id: int, data: dict):
 async def delete_meal_pricing(pricing_id: int):
     """식단가 삭제"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        conn.text_factory = lambda x: x.decode('utf-8', errors='replace') if isinstance(x, bytes) else x
-        cursor = conn.cursor()
-
-        cursor.execute("DELETE FROM meal_pricing WHERE id = ?", (pricing_id,))
-
-        conn.commit()
-        conn.close()
+        await db_writer.write_async(lambda cursor: cursor.execute("DELETE FROM meal_pricing WHERE id = ?", (pricing_id,)))
 
         return {"success": True}
 
@@ -1965,7 +1915,7 @@ async def delete_meal_pricing(pricing_id: int):
 async def get_all_users(page: int = 1, limit: int = 20, search: str = "", role: str = ""):
     """사용자 목록 조회 (페이징, 검색, 필터링)"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
         # WHERE 조건 구성
@@ -2045,7 +1995,7 @@ async def get_all_users(page: int = 1, limit: int = 20, search: str = "", role:
 async def get_user(user_id: int):
     """개별 사용자 조회"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -2091,7 +2041,7 @@ async def get_user(user_id: int):
 async def create_user(user_data: UserCreate):
     """사용자 추가"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
         # 필수 항목 검증
@@ -2114,34 +2064,36 @@ async def create_user(user_data: UserCreate):
         if cursor.fetchone():
             raise HTTPException(status_code=400, detail="이미 존재하는 사용자명입니다")
 
+        conn.close()
+
         # 비밀번호 해시화
         password_hash = hashlib.sha256(user_data.password.encode()).hexdigest()
 
         # 사용자 생성
-        cursor.execute("""
-            INSERT INTO users (
-                username, password_hash, role, contact_info, department,
-                position, managed_site, operator, semi_operator,
-                is_active, created_at, updated_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            user_data.username,
-            password_hash,
-            user_data.role,
-            user_data.contact_info,
-            user_data.department,
-            user_data.position,
-            user_data.managed_site,
-            False,  # operator
-            False,  # semi_operator
-            True,   # is_active
-            datetime.datetime.now().isoformat(),
-            datetime.datetime.now().isoformat()
-        ))
-
-        user_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        def insert(cursor):
+            cursor.execute("""
+                INSERT INTO users (
+                    username, password_hash, role, contact_info, department,
+                    position, managed_site, operator, semi_operator,
+                    is_active, created_at, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                user_data.username,
+                password_hash,
+                user_data.role,
+                user_data.contact_info,
+                user_data.department,
+                user_data.position,
+                user_data.managed_site,
+                False,  # operator
+                False,  # semi_operator
+                True,   # is_active
+                datetime.datetime.now().isoformat(),
+                datetime.datetime.now().isoformat()
+            ))
+            return cursor.lastrowid
+
+        user_id = await db_writer.write_async(insert)
 
         # 활동 로그 기록
         log_activity(
@@ -2167,7 +2119,7 @@ async def create_user(user_data: UserCreate):
 async def update_user(user_id: int, user_data: UserUpdate):
     """사용자 정보 수정"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
         # 사용자 존재 확인
@@ -2229,13 +2181,12 @@ async def update_user(user_id: int, user_data: UserUpdate):
         update_fields.append("updated_at = ?")
         params.append(datetime.datetime.now().isoformat())
 
+        conn.close()
+
         # 사용자 정보 업데이트
         params.append(user_id)
         update_query = f"UPDATE users SET {', '.join(update_fields)} WHERE id = ?"
-        cursor.execute(update_query, params)
-
-        conn.commit()
-        conn.close()
+        await db_writer.write_async(lambda cursor: cursor.execute(update_query, params))
 
         return {
             "success": True,
@@ -2251,7 +2202,7 @@ async def update_user(user_id: int, user_data: UserUpdate):
 async def delete_user(user_id: int):
     """사용자 삭제 (논리적 삭제 - is_active를 False로 설정)"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
         # 사용자 존재 확인
@@ -2260,15 +2211,14 @@ async def delete_user(user_id: int):
         if not user:
             raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다")
 
+        conn.close()
+
         # 논리적 삭제 (is_active를 False로 설정)
-        cursor.execute("""
+        await db_writer.write_async(lambda cursor: cursor.execute("""
             UPDATE users
             SET is_active = ?, updated_at = ?
             WHERE id = ?
-        """, (False, datetime.datetime.now().isoformat(), user_id))
-
-        conn.commit()
-        conn.close()
+        """, (False, datetime.datetime.now().isoformat(), user_id)))
 
         return {
             "success": True,
@@ -2284,7 +2234,7 @@ async def delete_user(user_id: int):
 async def activate_user(user_id: int):
     """사용자 활성화"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
         # 사용자 존재 확인
@@ -2293,15 +2243,14 @@ async def activate_user(user_id: int):
         if not user:
             raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다")
 
+        conn.close()
+
         # 사용자 활성화
-        cursor.execute("""
+        await db_writer.write_async(lambda cursor: cursor.execute("""
             UPDATE users
             SET is_active = ?, updated_at = ?
             WHERE id = ?
-        """, (True, datetime.datetime.now().isoformat(), user_id))
-
-        conn.commit()
-        conn.close()
+        """, (True, datetime.datetime.now().isoformat(), user_id)))
 
         return {
             "success": True,
@@ -2317,7 +2266,7 @@ async def activate_user(user_id: int):
 async def get_user_stats():
     """사용자 통계 정보"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
         # 전체 사용자 수
@@ -2373,7 +2322,7 @@ async def get_user_stats():
 async def get_users_stats():
     """사용자 통계 정보 반환"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
         # 전체 사용자 수
@@ -2398,36 +2347,31 @@ async def get_users_stats():
 async def create_user(user_data: dict):
     """새 사용자 생성"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
+        def insert(cursor):
+            cursor.execute("""
+                INSERT INTO users (username, contact_info, department, role, password_hash, notes, is_active)
+                VALUES (?, ?, ?, ?, ?, ?, 1)
+            """, (
+                user_data.get("username"),
+                user_data.get("contact_info"),
+                user_data.get("department"),
+                user_data.get("role"),
+                f"hashed_{user_data.get('password', 'default')}",  # 간단한 해시 처리
+                user_data.get("notes", "")
+            ))
 
-        cursor.execute("""
-            INSERT INTO users (username, contact_info, department, role, password_hash, notes, is_active)
-            VALUES (?, ?, ?, ?, ?, ?, 1)
-        """, (
-            user_data.get("username"),
-            user_data.get("contact_info"),
-            user_data.get("department"),
-            user_data.get("role"),
-            f"hashed_{user_data.get('password', 'default')}",  # 간단한 해시 처리
-            user_data.get("notes", "")
-        ))
-
-        conn.commit()
-
-        # 새로 생성된 사용자 ID 가져오기
-        new_user_id = cursor.lastrowid
-
-        # 사업장 권한 추가
-        if "site_permissions" in user_data:
-            for site_id in user_data["site_permissions"]:
-                cursor.execute("""
-                    INSERT INTO user_site_permissions (user_id, site_id, can_view, can_edit)
-                    VALUES (?, ?, 1, 0)
-                """, (new_user_id, site_id))
-            conn.commit()
+            # 새로 생성된 사용자 ID 가져오기
+            new_user_id = cursor.lastrowid
 
-        conn.close()
+            # 사업장 권한 추가
+            if "site_permissions" in user_data:
+                for site_id in user_data["site_permissions"]:
+                    cursor.execute("""
+                        INSERT INTO user_site_permissions (user_id, site_id, can_view, can_edit)
+                        VALUES (?, ?, 1, 0)
+                    """, (new_user_id, site_id))
+
+        await db_writer.write_async(insert)
 
         return {"success": True, "message": "사용자가 생성되었습니다."}
     except Exception as e:
@@ -2437,12 +2381,7 @@ async def create_user(user_data: dict):
 async def deactivate_user(user_id: int):
     """사용자 비활성화"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-
-        cursor.execute("UPDATE users SET is_active = 0 WHERE id = ?", (user_id,))
-        conn.commit()
-        conn.close()
+        await db_writer.write_async(lambda cursor: cursor.execute("UPDATE users SET is_active = 0 WHERE id = ?", (user_id,)))
 
         return {"success": True, "message": "사용자가 비활성화되었습니다."}
     except Exception as e:
@@ -2452,12 +2391,7 @@ async def deactivate_user(user_id: int):
 async def activate_user(user_id: int):
     """사용자 활성화"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-
-        cursor.execute("UPDATE users SET is_active = 1 WHERE id = ?", (user_id,))
-        conn.commit()
-        conn.close()
+        await db_writer.write_async(lambda cursor: cursor.execute("UPDATE users SET is_active = 1 WHERE id = ?", (user_id,)))
 
         return {"success": True, "message": "사용자가 활성화되었습니다."}
     except Exception as e:
@@ -2467,7 +2401,7 @@ async def activate_user(user_id: int):
 async def get_user(user_id: int):
     """특정 사용자 정보 반환"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -2500,39 +2434,33 @@ async def get_user(user_id: int):
 async def update_user(user_id: int, user_data: dict):
     """사용자 정보 수정"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
+        def update(cursor):
+            cursor.execute("""
+                UPDATE users
+                SET username = ?, contact_info = ?, department = ?, role = ?, notes = ?
+                WHERE id = ?
+            """, (
+                user_data.get("username"),
+                user_data.get("contact_info"),
+                user_data.get("department"),
+                user_data.get("role"),
+                user_data.get("notes", ""),
+                user_id
+            ))
 
-        cursor.execute("""
-            UPDATE users
-            SET username = ?, contact_info = ?, department = ?, role = ?, notes = ?
-            WHERE id = ?
-        """, (
-            user_data.get("username"),
-            user_data.get("contact_info"),
-            user_data.get("department"),
-            user_data.get("role"),
-            user_data.get("notes", ""),
-            user_id
-        ))
-
-        conn.commit()
-
-        # 사업장 권한 업데이트
-        if "site_permissions" in user_data:
-            # 기존 권한 삭제
-            cursor.execute("DELETE FROM user_site_permissions WHERE user_id = ?", (user_id,))
-
-            # 새로운 권한 추가
-            for site_id in user_data["site_permissions"]:
-                cursor.execute("""
-                    INSERT INTO user_site_permissions (user_id, site_id, can_view, can_edit)
-                    VALUES (?, ?, 1, 0)
-                """, (user_id, site_id))
+            # 사업장 권한 업데이트
+            if "site_permissions" in user_data:
+                # 기존 권한 삭제
+                cursor.execute("DELETE FROM user_site_permissions WHERE user_id = ?", (user_id,))
 
-            conn.commit()
+                # 새로운 권한 추가
+                for site_id in user_data["site_permissions"]:
+                    cursor.execute("""
+                        INSERT INTO user_site_permissions (user_id, site_id, can_view, can_edit)
+                        VALUES (?, ?, 1, 0)
+                    """, (user_id, site_id))
 
-        conn.close()
+        await db_writer.write_async(update)
 
         return {"success": True, "message": "사용자 정보가 수정되었습니다."}
     except Exception as e:
@@ -2542,7 +2470,7 @@ async def update_user(user_id: int, user_data: dict):
 async def get_user_permissions(user_id: int):
     """사용자의 사업장 권한 조회"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -2568,7 +2496,7 @@ async def get_user_permissions(user_id: int):
 async def update_admin_user(user_id: int, user_data: dict):
     """관리자 페이지용 사용자 정보 수정"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
         # 사용자 존재 확인
@@ -2632,6 +2560,8 @@ async def update_admin_user(user_id: int, user_data: dict):
         #     update_fields.append("notes = ?")
         #     params.append(user_data["notes"])
 
+        conn.close()
+
         # 업데이트 실행
         if update_fields:
             update_fields.append("updated_at = ?")
@@ -2644,10 +2574,8 @@ async def update_admin_user(user_id: int, user_data: dict):
                 WHERE id = ?
             """
 
-            cursor.execute(query, params)
-            conn.commit()
+            await db_writer.write_async(lambda cursor: cursor.execute(query, params))
 
-        conn.close()
         return {"success": True, "message": "사용자 정보가 수정되었습니다."}
 
     except HTTPException as he:
@@ -2660,7 +2588,7 @@ async def update_admin_user(user_id: int, user_data: dict):
 async def create_admin_user(user_data: dict):
     """관리자 페이지용 새 사용자 추가"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
         # 중복 사용자명 확인
@@ -2674,33 +2602,35 @@ async def create_admin_user(user_data: dict):
             conn.close()
             return {"success": False, "message": "사용자명은 필수입니다."}
 
-        # 새 사용자 추가
-        cursor.execute("""
-            INSERT INTO users (
-                username, password_hash, contact_info,
-                department, position, role,
-                operator, semi_operator, managed_site,
-                is_active, created_at, updated_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            user_data.get("username"),
-            f"hashed_{user_data.get('password', '1234')}",  # 실제로는 bcrypt 사용
-            user_data.get("contact_info", ""),
-            user_data.get("department", ""),
-            user_data.get("position", ""),
-            user_data.get("role", "viewer"),
-            1 if user_data.get("operator", False) else 0,
-            1 if user_data.get("semi_operator", False) else 0,
-            user_data.get("managed_site", ""),
-            1 if user_data.get("is_active", True) else 0,
-            datetime.datetime.now().isoformat(),
-            datetime.datetime.now().isoformat()
-        ))
-
-        conn.commit()
-        new_user_id = cursor.lastrowid
         conn.close()
 
+        # 새 사용자 추가
+        def insert(cursor):
+            cursor.execute("""
+                INSERT INTO users (
+                    username, password_hash, contact_info,
+                    department, position, role,
+                    operator, semi_operator, managed_site,
+                    is_active, created_at, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                user_data.get("username"),
+                f"hashed_{user_data.get('password', '1234')}",  # 실제로는 bcrypt 사용
+                user_data.get("contact_info", ""),
+                user_data.get("department", ""),
+                user_data.get("position", ""),
+                user_data.get("role", "viewer"),
+                1 if user_data.get("operator", False) else 0,
+                1 if user_data.get("semi_operator", False) else 0,
+                user_data.get("managed_site", ""),
+                1 if user_data.get("is_active", True) else 0,
+                datetime.datetime.now().isoformat(),
+                datetime.datetime.now().isoformat()
+            ))
+            return cursor.lastrowid
+
+        new_user_id = await db_writer.write_async(insert)
+
         return {
             "success": True,
             "message": "사용자가 추가되었습니다.",
@@ -2715,20 +2645,14 @@ async def create_admin_user(user_data: dict):
 async def reset_admin_user_password(user_id: int, data: dict):
     """관리자 페이지용 비밀번호 초기화"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-
         new_password = data.get("new_password", "1234")
         hashed_password = f"hashed_{new_password}"  # 실제로는 bcrypt 등을 사용해야 함
 
-        cursor.execute("""
+        await db_writer.write_async(lambda cursor: cursor.execute("""
             UPDATE users
             SET password = ?
             WHERE id = ?
-        """, (hashed_password, user_id))
-
-        conn.commit()
-        conn.close()
+        """, (hashed_password, user_id)))
 
         return {"success": True, "message": "비밀번호가 초기화되었습니다."}
     except Exception as e:
@@ -2738,20 +2662,14 @@ async def reset_admin_user_password(user_id: int, data: dict):
 async def reset_user_password(user_id: int, data: dict):
     """사용자 비밀번호 초기화"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-
         new_password = data.get("new_password", "1234")
         hashed_password = f"hashed_{new_password}"  # 실제로는 bcrypt 등을 사용해야 함
 
-        cursor.execute("""
+        await db_writer.write_async(lambda cursor: cursor.execute("""
             UPDATE users
             SET password = ?
             WHERE id = ?
-        """, (hashed_password, user_id))
-
-        conn.commit()
-        conn.close()
+        """, (hashed_password, user_id)))
 
         return {"success": True, "message": "비밀번호가 초기화되었습니다."}
     except Exception as e:
@@ -2761,7 +2679,7 @@ async def reset_user_password(user_id: int, data: dict):
 async def get_users(page: int = 1, per_page: int = 10, search: str = "", role: str = ""):
     """사용자 목록 반환 (페이지네이션 지원)"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
         # 기본 쿼리
@@ -2834,7 +2752,7 @@ async def get_users(page: int = 1, per_page: int = 10, search: str = "", role: s
 async def get_supplier_stats():
     """협력업체 통계 조회"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
         # 총 협력업체 수
@@ -2859,7 +2777,7 @@ async def get_supplier_stats():
 async def get_suppliers(page: int = 1, per_page: int = 10, search: str = "", status: str = ""):
     """협력업체 목록 조회 (페이지네이션, 검색, 필터링)"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
         # WHERE 조건 구성
@@ -2937,7 +2855,7 @@ async def get_suppliers(page: int = 1, per_page: int = 10, search: str = "", sta
 async def create_supplier(supplier: SupplierCreate):
     """협력업체 생성"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
         # 중복 이름 확인
@@ -2951,28 +2869,30 @@ async def create_supplier(supplier: SupplierCreate):
             if cursor.fetchone():
                 raise HTTPException(status_code=400, detail="이미 존재하는 사업자번호입니다.")
 
-        # 협력업체 추가
-        cursor.execute("""
-            INSERT INTO suppliers (
-                name, parent_code, business_number, representative,
-                headquarters_address, headquarters_phone, email, notes,
-                is_active, created_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1, datetime('now'))
-        """, (
-            supplier.name,
-            supplier.parent_code if supplier.parent_code else None,
-            supplier.business_number if supplier.business_number else None,
-            supplier.representative if supplier.representative else None,
-            supplier.headquarters_address if supplier.headquarters_address else None,
-            supplier.headquarters_phone if supplier.headquarters_phone else None,
-            supplier.email if supplier.email else None,
-            supplier.notes if supplier.notes else None
-        ))
-
-        supplier_id = cursor.lastrowid
-        conn.commit()
         conn.close()
 
+        # 협력업체 추가
+        def insert(cursor):
+            cursor.execute("""
+                INSERT INTO suppliers (
+                    name, parent_code, business_number, representative,
+                    headquarters_address, headquarters_phone, email, notes,
+                    is_active, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1, datetime('now'))
+            """, (
+                supplier.name,
+                supplier.parent_code if supplier.parent_code else None,
+                supplier.business_number if supplier.business_number else None,
+                supplier.representative if supplier.representative else None,
+                supplier.headquarters_address if supplier.headquarters_address else None,
+                supplier.headquarters_phone if supplier.headquarters_phone else None,
+                supplier.email if supplier.email else None,
+                supplier.notes if supplier.notes else None
+            ))
+            return cursor.lastrowid
+
+        supplier_id = await db_writer.write_async(insert)
+
         return {
             "success": True,
             "message": "협력업체가 생성되었습니다.",
@@ -2987,7 +2907,7 @@ async def create_supplier(supplier: SupplierCreate):
 async def get_supplier_detail(supplier_id: int):
     """협력업체 상세 조회"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -3030,7 +2950,7 @@ async def update_supplier(supplier_id: int, supplier: SupplierUpdate):
     try:
         print(f"[UPDATE SUPPLIER {supplier_id}] Received data:", supplier.dict())
 
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
         # 협력업체 존재 확인
@@ -3064,6 +2984,8 @@ async def update_supplier(supplier_id: int, supplier: SupplierUpdate):
         if not update_fields:
             raise HTTPException(status_code=400, detail="수정할 데이터가 없습니다.")
 
+        conn.close()
+
         # 업데이트 실행
         params.append(supplier_id)
         update_query = f"""
@@ -3075,17 +2997,12 @@ async def update_supplier(supplier_id: int, supplier: SupplierUpdate):
         print(f"[UPDATE SUPPLIER {supplier_id}] Query:", update_query)
         print(f"[UPDATE SUPPLIER {supplier_id}] Params:", params)
 
-        cursor.execute(update_query, params)
-        affected = cursor.rowcount
-        conn.commit()
+        def update(cursor):
+            cursor.execute(update_query, params)
+            return cursor.rowcount
 
-        # 업데이트 확인
-        cursor.execute("SELECT name, parent_code FROM suppliers WHERE id = ?", (supplier_id,))
-        updated_data = cursor.fetchone()
+        affected = await db_writer.write_async(update)
         print(f"[UPDATE SUPPLIER {supplier_id}] Affected rows: {affected}")
-        print(f"[UPDATE SUPPLIER {supplier_id}] Updated data: {updated_data}")
-
-        conn.close()
 
         return {
             "success": True,
@@ -3101,21 +3018,19 @@ async def update_supplier(supplier_id: int, supplier: SupplierUpdate):
 async def activate_supplier(supplier_id: int):
     """협력업체 활성화"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
         cursor.execute("SELECT id FROM suppliers WHERE id = ?", (supplier_id,))
         if not cursor.fetchone():
             raise HTTPException(status_code=404, detail="협력업체를 찾을 수 없습니다.")
+        conn.close()
 
-        cursor.execute("""
+        await db_writer.write_async(lambda cursor: cursor.execute("""
             UPDATE suppliers
             SET is_active = 1, updated_at = datetime('now')
             WHERE id = ?
-        """, (supplier_id,))
-
-        conn.commit()
-        conn.close()
+        """, (supplier_id,)))
 
         return {
             "success": True,
@@ -3131,21 +3046,19 @@ async def activate_supplier(supplier_id: int):
 async def deactivate_supplier(supplier_id: int):
     """협력업체 비활성화"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
         cursor.execute("SELECT id FROM suppliers WHERE id = ?", (supplier_id,))
         if not cursor.fetchone():
             raise HTTPException(status_code=404, detail="협력업체를 찾을 수 없습니다.")
+        conn.close()
 
-        cursor.execute("""
+        await db_writer.write_async(lambda cursor: cursor.execute("""
             UPDATE suppliers
             SET is_active = 0, updated_at = datetime('now')
             WHERE id = ?
-        """, (supplier_id,))
-
-        conn.commit()
-        conn.close()
+        """, (supplier_id,)))
 
         return {
             "success": True,
@@ -3350,25 +3263,27 @@ async def get_meal_pricing_management():
 
 # 식단 관리 페이지를 위한 API 엔드포인트
 @app.get("/api/recipes")
-async def get_recipes():
+@db_endpoint
+def get_recipes():
     """레시피(메뉴) 목록 조회"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
-        # recipes 테이블 확인 및 데이터 조회
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='menu_recipes'")
-        table_exists = cursor.fetchone()
-
-        if table_exists:
+        # menu_recipes 데이터 조회 (테이블이 없으면 조회 실패 → 임시 데이터)
+        try:
             cursor.execute("SELECT COUNT(*) FROM menu_recipes")
             count = cursor.fetchone()[0]
-
-            if count > 0:
-                cursor.execute("SELECT * FROM menu_recipes")
-                recipes = cursor.fetchall()
-                conn.close()
-                return {"success": True, "recipes": recipes}
+        except sqlite3.OperationalError as e:
+            if not is_missing_table(e):
+                raise
+            count = 0
+
+        if count > 0:
+            cursor.execute("SELECT * FROM menu_recipes")
+            recipes = cursor.fetchall()
+            conn.close()
+            return {"success": True, "recipes": recipes}
 
         # 테이블이 없거나 비어있으면 임시 데이터 반환
         mock_recipes = [
@@ -3386,42 +3301,67 @@ async def get_recipes():
     except Exception as e:
         return {"success": False, "error": str(e), "recipes": []}
 
+# 메뉴 검색 응답 필드 (별칭: 기존 화면 호환용으로 같은 값을 다른 이름으로 한 번 더 보냄)
+RECIPE_SEARCH_FIELDS = ["id", "name", "menu_name", "recipe_name", "category", "created_by", "creator_organization",
+                        "total_cost", "photo_path", "image_path", "has_photo", "created_at"]
+RECIPE_SEARCH_ALIASES = ("menu_name", "recipe_name", "image_path")
+
 @app.post("/api/search_recipes")
 async def search_recipes(request: Request):
-    """메뉴 검색 API"""
+    """메뉴 검색 API
+
+    fields: 응답할 필드 목록 (문자열 "id,name" 또는 배열)
+    layout: "columns"면 열 이름은 columns에 한 번만, data는 값 배열로 응답
+            (별칭 필드 menu_name/recipe_name/image_path와 recipes 중복 목록은 생략)
+    """
     try:
         body = await request.json()
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "error": f"메뉴 검색 오류: {str(e)}"}
+        )
+    # 요청 본문만 이벤트 루프에서 읽고 조회는 DB 스레드에서
+    return await run_db(search_recipes_in_db, request, body)
+
+def search_recipes_in_db(request: Request, body: dict):
+    """메뉴 검색 조회 (DB 스레드에서 실행)"""
+    try:
         keyword = body.get('keyword', '').strip()
         limit = body.get('limit', 1000)
+        layout = check_layout(body.get('layout') or 'rows')
+        names = select_fields(RECIPE_SEARCH_FIELDS, body.get('fields'),
+                              default=[name for name in RECIPE_SEARCH_FIELDS if name not in RECIPE_SEARCH_ALIASES]
+                              if layout == 'columns' else None)
 
         # 데이터베이스 연결
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
-        # 메뉴 테이블이 있는지 확인
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='menu_recipes'")
-        if not cursor.fetchone():
+        # 키워드가 있으면 검색, 없으면 전체 조회 (메뉴 테이블이 없으면 조회 실패 → 빈 결과)
+        try:
+            if keyword:
+                cursor.execute("""
+                    SELECT id, menu_name, category, created_by, total_cost, photo_path, created_at
+                    FROM menu_recipes
+                    WHERE menu_name LIKE ? AND is_active = 1
+                    ORDER BY id DESC
+                    LIMIT ?
+                """, (f'%{keyword}%', limit))
+            else:
+                cursor.execute("""
+                    SELECT id, menu_name, category, created_by, total_cost, photo_path, created_at
+                    FROM menu_recipes
+                    WHERE is_active = 1
+                    ORDER BY id DESC
+                    LIMIT ?
+                """, (limit,))
+        except sqlite3.OperationalError as e:
+            if not is_missing_table(e):
+                raise
             conn.close()
             return {"success": True, "data": [], "recipes": [], "total": 0, "message": "메뉴 테이블이 없습니다"}
 
-        # 키워드가 있으면 검색, 없으면 전체 조회
-        if keyword:
-            cursor.execute("""
-                SELECT id, menu_name, category, created_by, total_cost, photo_path, created_at
-                FROM menu_recipes
-                WHERE menu_name LIKE ? AND is_active = 1
-                ORDER BY id DESC
-                LIMIT ?
-            """, (f'%{keyword}%', limit))
-        else:
-            cursor.execute("""
-                SELECT id, menu_name, category, created_by, total_cost, photo_path, created_at
-                FROM menu_recipes
-                WHERE is_active = 1
-                ORDER BY id DESC
-                LIMIT ?
-            """, (limit,))
-
         menus = []
         for row in cursor.fetchall():
             menu_data = {
@@ -3438,21 +3378,27 @@ async def search_recipes(request: Request):
                 "has_photo": bool(row[5]),
                 "created_at": row[6]
             }
-            menus.append(menu_data)
+            menus.append([menu_data[name] for name in names])
 
         conn.close()
 
+        menus = grid_rows(names, menus, layout)
         response_data = {
             "success": True,
             "data": menus,  # JavaScript에서 찾는 필드명
-            "recipes": menus,  # 기존 필드명도 유지
             "total": len(menus),
             "message": f"{len(menus)}개 메뉴 검색됨"
         }
-        print(f"[DEBUG] 응답 데이터: {response_data}")
+        if layout == "columns":
+            response_data["columns"] = names
+        else:
+            response_data["recipes"] = menus  # 기존 필드명도 유지
+        print(f"[DEBUG] 메뉴 검색 응답: {len(menus)}개")
 
-        return JSONResponse(content=response_data)
+        return grid_response(request, response_data)
 
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"success": False, "error": str(e)})
     except Exception as e:
         return JSONResponse(
             status_code=500,
@@ -3494,15 +3440,11 @@ async def report_calculation_issue(request: Request):
 
                 # 계산 성공 시 데이터베이스에 업데이트
                 try:
-                    conn = sqlite3.connect(DATABASE_PATH)
-                    cursor = conn.cursor()
-                    cursor.execute('''
+                    await db_writer.write_async(lambda cursor: cursor.execute('''
                         UPDATE ingredients
                         SET price_per_unit = ?
                         WHERE id = ?
-                    ''', (result['unit_price'], ingredient_id))
-                    conn.commit()
-                    conn.close()
+                    ''', (result['unit_price'], ingredient_id)))
                 except Exception as db_error:
                     print(f"DB 업데이트 실패: {db_error}")
             else:
@@ -3529,7 +3471,8 @@ async def report_calculation_issue(request: Request):
         return {"success": False, "error": str(e)}
 
 @app.get("/api/admin/meal-counts")
-async def get_meal_counts():
+@db_endpoint
+def get_meal_counts():
     """식수 데이터 조회"""
     try:
         # 임시 데이터 반환
@@ -3778,7 +3721,7 @@ async def save_recipe_direct(request: Request, current_user: dict = Depends(requ
             )
 
         # 식자재 코드 유효성 검사
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
         for ingredient in ingredients:
@@ -3802,77 +3745,67 @@ async def save_recipe_direct(request: Request, current_user: dict = Depends(requ
         # 총 비용 계산
         total_cost = sum(ingredient.get('amount', 0) for ingredient in ingredients)
 
+        # 중복 메뉴명 체크 (수정이면 자기 자신 제외)
         if recipe_id:
-            # 기존 메뉴 수정
             print(f"[DEBUG] 기존 메뉴 수정: ID {recipe_id}")
-
-            # 중복 메뉴명 체크 (자기 자신 제외)
             cursor.execute("""
                 SELECT COUNT(*) FROM menu_recipes
                 WHERE recipe_name = ? AND is_active = 1 AND id != ?
             """, (recipe_name, recipe_id))
-
-            if cursor.fetchone()[0] > 0:
-                conn.close()
-                return JSONResponse(
-                    status_code=400,
-                    content={"success": False, "error": f'"{recipe_name}" 메뉴명이 이미 존재합니다.'}
-                )
-
-            # 메뉴 정보 업데이트
-            cursor.execute("""
-                UPDATE menu_recipes SET
-                    recipe_name = ?, category = ?, cooking_note = ?,
-                    total_cost = ?, updated_at = datetime('now')
-                WHERE id = ?
-            """, (recipe_name, category, cooking_note, total_cost, recipe_id))
-
-            # 기존 재료 삭제
-            cursor.execute("DELETE FROM menu_recipe_ingredients WHERE recipe_id = ?", (recipe_id,))
-
-            result_recipe_id = int(recipe_id)
-
         else:
-            # 새 메뉴 생성
             print(f"[DEBUG] 새 메뉴 생성")
-
-            # 중복 메뉴명 체크
             cursor.execute("""
                 SELECT COUNT(*) FROM menu_recipes
                 WHERE recipe_name = ? AND is_active = 1
             """, (recipe_name,))
 
-            if cursor.fetchone()[0] > 0:
-                conn.close()
-                return JSONResponse(
-                    status_code=400,
-                    content={"success": False, "error": f'"{recipe_name}" 메뉴명이 이미 존재합니다.'}
-                )
+        if cursor.fetchone()[0] > 0:
+            conn.close()
+            return JSONResponse(
+                status_code=400,
+                content={"success": False, "error": f'"{recipe_name}" 메뉴명이 이미 존재합니다.'}
+            )
+        conn.close()
+
+        # 레시피 코드 생성
+        import time
+        recipe_code = f"RECIPE_{int(time.time())}"
 
-            # 레시피 코드 생성
-            import time
-            recipe_code = f"RECIPE_{int(time.time())}"
+        def save(cursor):
+            if recipe_id:
+                # 메뉴 정보 업데이트
+                cursor.execute("""
+                    UPDATE menu_recipes SET
+                        recipe_name = ?, category = ?, cooking_note = ?,
+                        total_cost = ?, updated_at = datetime('now')
+                    WHERE id = ?
+                """, (recipe_name, category, cooking_note, total_cost, recipe_id))
 
-            # 메뉴 생성
-            cursor.execute("""
-                INSERT INTO menu_recipes (
-                    recipe_code, recipe_name, category, cooking_note,
-                    total_cost, serving_size, is_active, created_by, created_at, updated_at
-                ) VALUES (?, ?, ?, ?, ?, 1, 1, ?, datetime('now'), datetime('now'))
-            """, (recipe_code, recipe_name, category, cooking_note, total_cost, current_user['username']))
+                # 기존 재료 삭제
+                cursor.execute("DELETE FROM menu_recipe_ingredients WHERE recipe_id = ?", (recipe_id,))
 
-            result_recipe_id = cursor.lastrowid
+                saved_recipe_id = int(recipe_id)
 
-        # 재료 정보 저장
-        print(f"[DEBUG] 재료 {len(ingredients)}개 저장 시작")
-        for i, ingredient in enumerate(ingredients):
-            cursor.execute("""
+            else:
+                # 메뉴 생성
+                cursor.execute("""
+                    INSERT INTO menu_recipes (
+                        recipe_code, recipe_name, category, cooking_note,
+                        total_cost, serving_size, is_active, created_by, created_at, updated_at
+                    ) VALUES (?, ?, ?, ?, ?, 1, 1, ?, datetime('now'), datetime('now'))
+                """, (recipe_code, recipe_name, category, cooking_note, total_cost, current_user['username']))
+
+                saved_recipe_id = cursor.lastrowid
+
+            # 재료 정보 저장
+            print(f"[DEBUG] 재료 {len(ingredients)}개 저장 시작")
+            cursor.executemany("""
                 INSERT INTO menu_recipe_ingredients (
                     recipe_id, ingredient_code, ingredient_name, specification, unit,
                     delivery_days, selling_price, quantity, amount, supplier_name, sort_order
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                result_recipe_id,
+            """, [(
+                saved_recipe_id,
                 ingredient.get('ingredient_code', ''),
                 ingredient.get('ingredient_name', ''),
                 ingredient.get('specification', ''),
@@ -3883,18 +3816,12 @@ async def save_recipe_direct(request: Request, current_user: dict = Depends(requ
                 ingredient.get('amount', 0),
                 ingredient.get('supplier_name', ''),
                 i + 1
-            ))
+            ) for i, ingredient in enumerate(ingredients)])
+            return saved_recipe_id
 
-        conn.commit()
+        result_recipe_id = await db_writer.write_async(save)
         print(f"[DEBUG] 저장 완료: 메뉴 ID {result_recipe_id}")
 
-        # 저장 확인
-        cursor.execute("SELECT COUNT(*) FROM menu_recipe_ingredients WHERE recipe_id = ?", (result_recipe_id,))
-        ingredient_count = cursor.fetchone()[0]
-        print(f"[DEBUG] 저장된 재료 개수: {ingredient_count}")
-
-        conn.close()
-
         return JSONResponse(
             content={
                 "success": True,
@@ -3913,7 +3840,8 @@ async def save_recipe_direct(request: Request, current_user: dict = Depends(requ
         )
 
 @app.get("/api/recipe/list")
-async def get_recipe_list(
+@db_endpoint
+def get_recipe_list(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
     category: Optional[str] = None,
@@ -3921,7 +3849,7 @@ async def get_recipe_list(
 ):
     """레시피 목록 조회 API"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -3983,10 +3911,11 @@ async def get_recipe_list(
         conn.close()
 
 @app.get("/api/recipe/{recipe_id}")
-async def get_recipe_detail(recipe_id: int):
+@db_endpoint
+def get_recipe_detail(recipe_id: int):
     """레시피 상세 조회 API"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -4025,7 +3954,8 @@ async def get_recipe_detail(recipe_id: int):
 # =============================================================================
 
 @app.get("/api/admin/menu-recipes")
-async def get_admin_menu_recipes(
+@db_endpoint
+def get_admin_menu_recipes(
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
     search: Optional[str] = None,
@@ -4034,7 +3964,7 @@ async def get_admin_menu_recipes(
 ):
     """메뉴/레시피 목록 조회 (인증 필요)"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -4113,10 +4043,11 @@ async def get_admin_menu_recipes(
         conn.close()
 
 @app.get("/api/admin/menu-recipes/categories")
-async def get_menu_categories():
+@db_endpoint
+def get_menu_categories():
     """메뉴 카테고리 목록 조회"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
         categories = cursor.execute("""
@@ -4141,10 +4072,11 @@ async def get_menu_categories():
         conn.close()
 
 @app.get("/api/admin/menu-recipes/{recipe_id}")
-async def get_admin_menu_recipe_detail(recipe_id: int):
+@db_endpoint
+def get_admin_menu_recipe_detail(recipe_id: int):
     """관리자용 메뉴/레시피 상세 조회"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -4184,7 +4116,7 @@ async def get_admin_menu_recipe_detail(recipe_id: int):
 async def create_admin_menu_recipe(recipe_data: dict):
     """관리자용 메뉴/레시피 생성"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
         # 중복 메뉴명 체크
@@ -4206,32 +4138,7 @@ async def create_admin_menu_recipe(recipe_data: dict):
                 'error': f'"{menu_name}" 메뉴명이 이미 존재합니다. 다른 이름을 사용해주세요.'
             }
 
-        # 레시피 코드 생성
-        import datetime
-        recipe_code = f"RCP_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
-
-        # 레시피 기본 정보 삽입
-        recipe_insert = """
-            INSERT INTO menu_recipes (
-                recipe_code, recipe_name, category, cooking_note,
-                serving_size, total_cost, image_path,
-                created_at, updated_at, is_active
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, datetime('now'), datetime('now'), 1)
-        """
-
-        cursor.execute(recipe_insert, (
-            recipe_code,
-            recipe_data.get('name'),
-            recipe_data.get('category'),
-            recipe_data.get('description', ''),
-            recipe_data.get('servings', 1),
-            recipe_data.get('total_cost', 0),
-            recipe_data.get('image_path', '')
-        ))
-
-        recipe_id = cursor.lastrowid
-
-        # 재료 정보 삽입
+        # 재료 정보 검증
         ingredients = recipe_data.get('ingredients', [])
         if not ingredients:
             return {
@@ -4268,16 +4175,36 @@ async def create_admin_menu_recipe(recipe_data: dict):
                     'error': f'{i+1}번째 재료: 식자재 코드 "{ingredient_code}"가 시스템에 등록되지 않았습니다.'
                 }
 
-        # 재료 정보 삽입
-        ingredient_insert = """
-            INSERT INTO menu_recipe_ingredients (
-                recipe_id, ingredient_code, ingredient_name, quantity, unit,
-                amount, supplier_name, specification, sort_order
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """
+        # 레시피 코드 생성
+        import datetime
+        recipe_code = f"RCP_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
-        for i, ingredient in enumerate(ingredients):
-            cursor.execute(ingredient_insert, (
+        def insert(cursor):
+            # 레시피 기본 정보 삽입
+            cursor.execute("""
+                INSERT INTO menu_recipes (
+                    recipe_code, recipe_name, category, cooking_note,
+                    serving_size, total_cost, image_path,
+                    created_at, updated_at, is_active
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, datetime('now'), datetime('now'), 1)
+            """, (
+                recipe_code,
+                recipe_data.get('name'),
+                recipe_data.get('category'),
+                recipe_data.get('description', ''),
+                recipe_data.get('servings', 1),
+                recipe_data.get('total_cost', 0),
+                recipe_data.get('image_path', '')
+            ))
+            recipe_id = cursor.lastrowid
+
+            # 재료 정보 삽입
+            cursor.executemany("""
+                INSERT INTO menu_recipe_ingredients (
+                    recipe_id, ingredient_code, ingredient_name, quantity, unit,
+                    amount, supplier_name, specification, sort_order
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [(
                 recipe_id,
                 ingredient.get('ingredient_code', ''),
                 ingredient.get('ingredient_name', ''),
@@ -4287,9 +4214,10 @@ async def create_admin_menu_recipe(recipe_data: dict):
                 ingredient.get('supplier_name', ''),
                 ingredient.get('specification', ''),
                 i + 1
-            ))
+            ) for i, ingredient in enumerate(ingredients)])
+            return recipe_id
 
-        conn.commit()
+        recipe_id = await db_writer.write_async(insert)
 
         return {
             'success': True,
@@ -4298,7 +4226,6 @@ async def create_admin_menu_recipe(recipe_data: dict):
         }
 
     except Exception as e:
-        conn.rollback()
         print(f"관리자 메뉴/레시피 생성 오류: {str(e)}")
         raise HTTPException(status_code=500, detail=f"메뉴/레시피 생성 실패: {str(e)}")
     finally:
@@ -4308,7 +4235,7 @@ async def create_admin_menu_recipe(recipe_data: dict):
 async def update_admin_menu_recipe(recipe_id: int, recipe_data: dict):
     """관리자용 메뉴/레시피 수정"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
         # 레시피 존재 확인
@@ -4330,28 +4257,6 @@ async def update_admin_menu_recipe(recipe_id: int, recipe_data: dict):
                     'error': f'"{menu_name}" 메뉴명이 이미 존재합니다. 다른 이름을 사용해주세요.'
                 }
 
-        # 레시피 기본 정보 수정
-        recipe_update = """
-            UPDATE menu_recipes SET
-                recipe_name = ?, category = ?, cooking_note = ?,
-                serving_size = ?, total_cost = ?, image_path = ?,
-                updated_at = datetime('now')
-            WHERE id = ?
-        """
-
-        cursor.execute(recipe_update, (
-            recipe_data.get('name'),
-            recipe_data.get('category'),
-            recipe_data.get('description', ''),
-            recipe_data.get('servings', 1),
-            recipe_data.get('total_cost', 0),
-            recipe_data.get('image_path', ''),
-            recipe_id
-        ))
-
-        # 기존 재료 삭제
-        cursor.execute("DELETE FROM menu_recipe_ingredients WHERE recipe_id = ?", (recipe_id,))
-
         # 재료 유효성 검사
         ingredients = recipe_data.get('ingredients', [])
         if not ingredients:
@@ -4380,29 +4285,44 @@ async def update_admin_menu_recipe(recipe_id: int, recipe_data: dict):
                     'error': f'식자재 코드 "{ingredient_code}"를 찾을 수 없습니다. 올바른 식자재를 선택해주세요.'
                 }
 
-        # 새 재료 정보 삽입
-        if ingredients:
-            ingredient_insert = """
+        def update(cursor):
+            # 레시피 기본 정보 수정
+            cursor.execute("""
+                UPDATE menu_recipes SET
+                    recipe_name = ?, category = ?, cooking_note = ?,
+                    serving_size = ?, total_cost = ?, image_path = ?,
+                    updated_at = datetime('now')
+                WHERE id = ?
+            """, (
+                recipe_data.get('name'),
+                recipe_data.get('category'),
+                recipe_data.get('description', ''),
+                recipe_data.get('servings', 1),
+                recipe_data.get('total_cost', 0),
+                recipe_data.get('image_path', ''),
+                recipe_id
+            ))
+
+            # 기존 재료 삭제 후 새 재료 정보 삽입
+            cursor.execute("DELETE FROM menu_recipe_ingredients WHERE recipe_id = ?", (recipe_id,))
+            cursor.executemany("""
                 INSERT INTO menu_recipe_ingredients (
                     recipe_id, ingredient_name, quantity, unit,
                     amount, supplier_name, specification, sort_order, ingredient_code
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """
+            """, [(
+                recipe_id,
+                ingredient.get('ingredient_name', ''),
+                ingredient.get('quantity', 0),
+                ingredient.get('unit', ''),
+                ingredient.get('amount', 0),
+                ingredient.get('supplier_name', ''),
+                ingredient.get('specification', ''),
+                i + 1,
+                ingredient.get('ingredient_code', '')
+            ) for i, ingredient in enumerate(ingredients)])
 
-            for i, ingredient in enumerate(ingredients):
-                cursor.execute(ingredient_insert, (
-                    recipe_id,
-                    ingredient.get('ingredient_name', ''),
-                    ingredient.get('quantity', 0),
-                    ingredient.get('unit', ''),
-                    ingredient.get('amount', 0),
-                    ingredient.get('supplier_name', ''),
-                    ingredient.get('specification', ''),
-                    i + 1,
-                    ingredient.get('ingredient_code', '')
-                ))
-
-        conn.commit()
+        await db_writer.write_async(update)
 
         return {
             'success': True,
@@ -4412,7 +4332,6 @@ async def update_admin_menu_recipe(recipe_id: int, recipe_data: dict):
     except HTTPException:
         raise
     except Exception as e:
-        conn.rollback()
         print(f"관리자 메뉴/레시피 수정 오류: {str(e)}")
         raise HTTPException(status_code=500, detail=f"메뉴/레시피 수정 실패: {str(e)}")
     finally:
@@ -4422,7 +4341,7 @@ async def update_admin_menu_recipe(recipe_id: int, recipe_data: dict):
 async def delete_admin_menu_recipe(recipe_id: int):
     """관리자용 메뉴/레시피 삭제 (소프트 삭제)"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_pool.connect()
         cursor = conn.cursor()
 
         # 레시피 존재 확인
@@ -4431,13 +4350,11 @@ async def delete_admin_menu_recipe(recipe_id: int):
             raise HTTPException(status_code=404, detail="레시피를 찾을 수 없습니다.")
 
         # 소프트 삭제 (is_active = 0)
-        cursor.execute("""
+        await db_writer.write_async(lambda cursor: cursor.execute("""
             UPDATE menu_recipes
             SET is_active = 0, updated_at = datetime('now')
             WHERE id = ?
-        """, (recipe_id,))
-
-        conn.commit()
+        """, (recipe_id,)))
 
         return {
             'success': True,
@@ -4447,7 +4364,6 @@ async def delete_admin_menu_recipe(recipe_id: int):
     except HTTPException:
         raise
     except Exception as e:
-        conn.rollback()
         print(f"관리자 메뉴/레시피 삭제 오류: {str(e)}")
         raise HTTPException(status_code=500, detail=f"메뉴/레시피 삭제 실패: {str(e)}")
     finally:
@@ -4646,44 +4562,98 @@ async def get_price_calculation_stats():
         return {"success": False, "error": str(e)}
 
 @app.post("/api/admin/price-calculation/retrain")
-async def retrain_calculation_patterns():
-    """전체 식자재 대상으로 계산 패턴 재학습"""
+async def retrain_calculation_patterns(restart: bool = False):
+    """전체 식자재 대상으로 계산 패턴 재학습 (백그라운드 작업, 중단된 작업은 이어서 실행)"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-
-        # 전체 식자재에 대해 재계산 및 학습
-        cursor.execute("""
-            SELECT id, specification, unit, purchase_price, price_per_unit
-            FROM ingredients
-            WHERE purchase_price > 0 AND specification IS NOT NULL
-            LIMIT 1000  -- 처음 1000개만 재학습
-        """)
-
-        ingredients = cursor.fetchall()
-        retrained_count = 0
-
-        for ing_id, spec, unit, price, existing_price in ingredients:
-            # 새로운 계산 실행
-            new_price = calculate_unit_price_with_learning(price, spec, unit, ing_id)
-
-            if new_price and existing_price and abs(new_price - existing_price) > 0.001:
-                # 기존값과 다르면 수동 수정으로 간주하여 학습
-                record_manual_correction(ing_id, spec, unit, price, new_price, existing_price)
-                retrained_count += 1
-
-        conn.close()
-
+        job = start_retrain_job(DATABASE_PATH, restart=restart)
         return {
             "success": True,
-            "message": f"{retrained_count}개 식자재에 대해 패턴 재학습이 완료되었습니다.",
-            "retrained_count": retrained_count
+            "message": "패턴 재학습 작업이 시작되었습니다.",
+            "job": job
         }
 
     except Exception as e:
         print(f"재학습 오류: {e}")
         return {"success": False, "error": str(e)}
 
+@app.get("/api/admin/price-calculation/retrain/status")
+async def get_retrain_status(job_id: str = None):
+    """패턴 재학습 작업 진행 상태 조회 (job_id가 없으면 가장 최근 작업)"""
+    job = get_retrain_job(job_id, DATABASE_PATH)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다")
+    return {"success": True, "job": job}
+
+@app.on_event("startup")
+async def resume_interrupted_retrain():
+    """서버 재시작 전에 중단된 패턴 재학습 작업 재개"""
+    resume_retrain_job(DATABASE_PATH)
+
+@app.on_event("startup")
+async def load_catalog_snapshot():
+    """식자재 목록 열 단위 스냅샷 미리 생성/로드 (다른 워커가 만든 같은 버전은 메모리 맵으로 공유)"""
+    try:
+        snapshot = refresh_catalog_snapshot(DATABASE_PATH)
+        if snapshot is not None:
+            print(f"식자재 스냅샷 로드 완료: {snapshot.size:,}행 (버전 {snapshot.version})")
+    except Exception as e:
+        print(f"식자재 스냅샷 로드 실패: {e}")
+
+@app.on_event("startup")
+async def load_typeahead_index():
+    """자동완성 인덱스 미리 로드 (첫 입력부터 DB 조회 없이 응답)"""
+    try:
+        index = get_typeahead_index(DATABASE_PATH)
+        print(f"자동완성 인덱스 로드 완료: {index.stats()['entries']:,}개 이름")
+    except Exception as e:
+        print(f"자동완성 인덱스 로드 실패: {e}")
+
+@app.on_event("shutdown")
+async def close_db_pool():
+    """남은 쓰기 작업을 커밋하고 보관 중인 풀 연결 닫기"""
+    db_writer.close()
+    db_pool.close_all()
+
+@app.get("/api/admin/db-pool/stats")
+async def get_db_pool_stats():
+    """DB 연결 풀/DB 스레드 풀/쓰기 스레드 지표 (빌린 횟수, 재사용/생성 수, 대기·실행 시간, 그룹 커밋 크기)"""
+    return {"success": True, "pool": db_pool.stats(), "executor": db_executor_stats(), "writer": db_writer.stats()}
+
+@app.get("/api/admin/query-stats")
+async def get_query_stats(sort: str = "total_ms", limit: int = 50, slow_limit: int = 50,
+                          current_user: dict = Depends(require_admin)):
+    """문장별 실행 시간 집계와 최근 느린 쿼리 (실행 계획, 전체 스캔 여부, 호출 라우트)
+
+    sort: total_ms, max_ms, avg_ms, count, slow_count
+    """
+    if sort not in ("total_ms", "max_ms", "avg_ms", "count", "slow_count"):
+        raise HTTPException(status_code=400, detail="sort는 total_ms, max_ms, avg_ms, count, slow_count 중 하나입니다")
+    statements = query_stats(sort, limit)
+    return {
+        "success": True,
+        "slow_threshold_ms": SLOW_QUERY_MS,
+        "statements": statements,
+        "full_scans": [entry["statement"] for entry in statements if entry["full_scan"]],
+        "slow_queries": slow_queries(slow_limit)
+    }
+
+@app.post("/api/admin/query-stats/reset")
+async def reset_query_stats_endpoint(current_user: dict = Depends(require_admin)):
+    """쿼리 통계/느린 쿼리 기록 초기화"""
+    reset_query_stats()
+    return {"success": True}
+
+@app.get("/api/search/typeahead")
+async def search_typeahead(q: str = "", limit: int = TYPEAHEAD_DEFAULT_LIMIT, source: str = None):
+    """식자재명/메뉴명 자동완성 (초성 'ㄷㅈㄱㄱ', 입력 중인 글자 '돼지곡' 지원)"""
+    if source and source not in TYPEAHEAD_SOURCES:
+        raise HTTPException(status_code=400, detail=f"source는 {', '.join(TYPEAHEAD_SOURCES)} 중 하나여야 합니다")
+    try:
+        results = get_typeahead_index(DATABASE_PATH).search(q, limit, source)
+        return {"success": True, "query": q, "results": results}
+    except Exception as e:
+        return {"success": False, "error": str(e), "results": []}
+
 if __name__ == "__main__":
     import uvicorn
     import os